@@ -10,10 +10,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Import pipeline functions
 from src.config.settings import settings
+from src.ingestion.manifest import IngestionManifest
 from src.ingestion.multimodal_loader import MultimodalLoader
 from src.processing.factory import StrategyFactory
 from src.embedding.embedder import get_embedder
 from src.storage.manager import get_storage_manager
+from src.pipeline.streaming import prepare_run
 
 # DAG configuration
 default_args = {
@@ -37,10 +39,15 @@ with DAG(
 
     def load_documents(**context):
         print(f"Loading documents from: {settings.DATA_DIR}")
-        loader = MultimodalLoader(settings.DATA_DIR)
-        documents = loader.load_documents()
+        # Only new or modified files, parsed across INGESTION_WORKERS processes
+        loader = MultimodalLoader(settings.DATA_DIR, workers=settings.INGESTION_WORKERS, manifest=IngestionManifest())
+        files = loader.pending_files()
+        if not files:
+            print("No new or modified documents. Nothing to load.")
+            return "No documents to load."
+        documents = list(loader.iter_documents(files))
         if not documents:
-            raise ValueError("No documents found. Failing pipeline.")
+            raise ValueError("None of the pending documents could be loaded. Failing pipeline.")
         # In a real Airflow setup, we'd pass data via S3/XCom or save state.
         # For this local demo, we'll return the object references via XCom
         # (Warning: Airflow 2.x supports passing Pydantic objects if pickled, but saving to local intermediate is better)
@@ -48,9 +55,24 @@ with DAG(
         return "Documents loaded."
 
     def process_and_store(**context):
-        # 1. Ingestion
-        loader = MultimodalLoader(settings.DATA_DIR)
-        documents = loader.load_documents()
+        # Trigger with {"full_rebuild": true} to ignore the ingestion manifest
+        dag_run = context.get("dag_run")
+        full_rebuild = bool(dag_run and dag_run.conf and dag_run.conf.get("full_rebuild"))
+
+        storage = get_storage_manager(settings.STORAGE_TYPE)
+
+        # 1. Ingestion (parallel across INGESTION_WORKERS processes, new/modified files only;
+        # deleted files and stale chunks of the pending ones are removed from storage first)
+        loader, manifest, files = prepare_run(storage, settings.INGESTION_WORKERS, full_rebuild)
+        if not files:
+            print("No new or modified documents. Nothing to do.")
+            return
+
+        documents = list(loader.iter_documents(files))
+        if not documents:
+            manifest.save()
+            print("None of the pending documents could be loaded. Nothing to store.")
+            return
 
         # 2. Chunking
         chunker = StrategyFactory.get_strategy(settings.CHUNKING_STRATEGY)
@@ -62,8 +84,12 @@ with DAG(
         embeddings = embedder.embed_documents(texts)
 
         # 4. Storage
-        storage = get_storage_manager(settings.STORAGE_TYPE)
+        sources = [doc.metadata["source"] for doc in documents]
         storage.save_embeddings(chunks, embeddings)
+
+        for source in sources:
+            manifest.record(source)
+        manifest.save()
         print("Pipeline execution complete.")
 
     run_etl_task = PythonOperator(
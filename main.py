@@ -4,10 +4,11 @@ import sys
 import time
 
 from src.config.settings import settings
-from src.ingestion.multimodal_loader import MultimodalLoader
 from src.processing.factory import StrategyFactory
 from src.embedding.embedder import get_embedder
 from src.storage.manager import get_storage_manager
+from src.pipeline.streaming import prepare_run, run_streaming_pipeline
+from src.pipeline.staged import run_staged_pipeline
 
 # Configure Logging
 logging.basicConfig(
@@ -20,16 +21,23 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def run_pipeline():
+def run_pipeline(workers: int = settings.INGESTION_WORKERS, full_rebuild: bool = False):
     start_time = time.time()
     logger.info("Starting Unstructured Data Ingestion Pipeline...")
-    
+
+    storage = get_storage_manager(settings.STORAGE_TYPE)
+
+    # 0. Incremental planning: only new/modified files flow through the pipeline
+    loader, manifest, files = prepare_run(storage, workers, full_rebuild)
+    if not files:
+        return
+
     # 1. Ingestion
-    logger.info("Phase 1: Ingestion")
-    loader = MultimodalLoader(settings.DATA_DIR)
-    documents = loader.load_documents()
+    logger.info(f"Phase 1: Ingestion ({workers} worker(s), {len(files)} file(s))")
+    documents = list(loader.iter_documents(files))
     if not documents:
-        logger.error("No documents found. Exiting.")
+        manifest.save()
+        logger.error("None of the pending documents could be loaded. Exiting.")
         return
 
     # 2. Processing (Chunking) Strategy Pattern
@@ -48,10 +56,15 @@ def run_pipeline():
     texts = [c.content for c in chunks]
     embeddings = embedder.embed_documents(texts)
     
-    # 4. Storage
+    # 4. Storage (prepare_run already removed chunks from earlier versions of these files)
     logger.info("Phase 4: Storage")
-    storage = get_storage_manager(settings.STORAGE_TYPE)
+    sources = [doc.metadata["source"] for doc in documents]
     storage.save_embeddings(chunks, embeddings)
+
+    # 5. Only files that reached storage are recorded as ingested
+    for source in sources:
+        manifest.record(source)
+    manifest.save()
     
     duration = time.time() - start_time
     logger.info(f"Pipeline finished successfully in {duration:.2f} seconds.")
@@ -59,10 +72,34 @@ def run_pipeline():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the RAG Data Ingestion Pipeline")
     parser.add_argument("--run", action="store_true", help="Execute the full pipeline")
+    parser.add_argument(
+        "--workers", type=int, default=settings.INGESTION_WORKERS,
+        help="Number of processes used to parse PDFs in parallel (default: INGESTION_WORKERS)"
+    )
+    parser.add_argument(
+        "--full-rebuild", action="store_true",
+        help="Ignore the ingestion manifest and re-process every file"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Memory-bounded mode: chunk, embed and store in micro-batches"
+    )
+    parser.add_argument(
+        "--staged", action="store_true",
+        help="Like --stream, but ingestion, chunking, embedding and storage run concurrently"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.PIPELINE_BATCH_SIZE,
+        help="Chunks per micro-batch in --stream/--staged mode (default: PIPELINE_BATCH_SIZE)"
+    )
     
     args = parser.parse_args()
     
-    if args.run:
-        run_pipeline()
+    if args.run and args.staged:
+        run_staged_pipeline(workers=args.workers, full_rebuild=args.full_rebuild, batch_size=args.batch_size)
+    elif args.run and args.stream:
+        run_streaming_pipeline(workers=args.workers, full_rebuild=args.full_rebuild, batch_size=args.batch_size)
+    elif args.run:
+        run_pipeline(workers=args.workers, full_rebuild=args.full_rebuild)
     else:
         parser.print_help()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, Security, Request
+from fastapi import FastAPI, HTTPException, Security, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security.api_key import APIKeyHeader
 from pydantic import BaseModel, Field
@@ -7,11 +7,20 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from prometheus_fastapi_instrumentator import Instrumentator
-from typing import List
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from typing import Any, List, Optional, Tuple
 import logging
+import math
 import os
+import numpy as np
 from starlette.responses import Response
-from src.embedding.embedder import get_embedder
+from starlette.concurrency import run_in_threadpool
+from src.embedding.embedder import Embeddings, HybridEmbeddings, as_dense_matrix, get_embedder
+from src.embedding.cache import QueryCachedEmbedder
+from src.api.batching import MicroBatcher
+from src.api.response_cache import SearchResponseCache
+from src.storage.manager import read_collection_version
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
@@ -45,17 +54,44 @@ def verify_api_key(api_key: str = Security(api_key_header)) -> str:
 async def lifespan(app: FastAPI):
     logger.info("Starting up FastAPI application...")
     if settings.STORAGE_TYPE == "qdrant":
-        from qdrant_client import QdrantClient
+        from qdrant_client import QdrantClient, AsyncQdrantClient
         app.state.qdrant_client = QdrantClient(
             host=settings.QDRANT_HOST, port=settings.QDRANT_PORT, timeout=10
         )
+        app.state.async_qdrant_client = AsyncQdrantClient(
+            host=settings.QDRANT_HOST, port=settings.QDRANT_PORT, timeout=10
+        )
+    elif settings.STORAGE_TYPE == "parquet":
+        # Edge / air-gapped mode: exact search over the memory-mapped parquet vectors
+        from src.storage.local_search import LocalVectorIndex
+        app.state.local_index = LocalVectorIndex.load_or_build()
     else:
-        logger.warning("STORAGE_TYPE is not qdrant. Live search is disabled.")
+        logger.warning(f"STORAGE_TYPE '{settings.STORAGE_TYPE}' has no search backend. Live search is disabled.")
 
     logger.info(f"Initializing Embedder: {settings.EMBEDDING_TYPE}")
-    app.state.embedder = get_embedder(settings.EMBEDDING_TYPE)
+    embedder = get_embedder(settings.EMBEDDING_TYPE)
+    if settings.QUERY_CACHE_SIZE > 0:
+        embedder = QueryCachedEmbedder(embedder)
+    app.state.embedder = embedder
+
+    if settings.SEARCH_CACHE_SIZE > 0:
+        if settings.STORAGE_TYPE == "qdrant":
+            client = app.state.qdrant_client
+            app.state.response_cache = SearchResponseCache(
+                lambda: read_collection_version(client, settings.QDRANT_COLLECTION_NAME)
+            )
+        elif getattr(app.state, "local_index", None) is not None:
+            # The local index is fixed for the lifetime of the process
+            signature = app.state.local_index.meta.get("dataset_signature")
+            app.state.response_cache = SearchResponseCache(lambda: signature)
     yield
 
+    batcher = getattr(app.state, "batcher", None)
+    if batcher is not None:
+        await batcher.stop()
+    if getattr(app.state, "async_qdrant_client", None) is not None:
+        await app.state.async_qdrant_client.close()
+
 
 # ---------------------------------------------------------------------------
 # App Construction
@@ -92,6 +128,34 @@ app.add_exception_handler(RateLimitExceeded, rate_limit_exception_handler)
 Instrumentator().instrument(app).expose(app)
 
 
+class QueryCacheCollector:
+    """Publishes the query-embedding cache counters on /metrics at scrape time."""
+    def collect(self):
+        cache = getattr(app.state, "embedder", None)
+        if not isinstance(cache, QueryCachedEmbedder):
+            return
+        yield CounterMetricFamily("query_embedding_cache_hits", "Queries served from the embedding cache", value=cache.stats["hits"])
+        yield CounterMetricFamily("query_embedding_cache_misses", "Queries sent to the embedding model", value=cache.stats["misses"])
+        yield GaugeMetricFamily("query_embedding_cache_size", "Cached query embeddings", value=len(cache))
+        yield GaugeMetricFamily("query_embedding_cache_hit_ratio", "Cache hits / lookups since startup", value=cache.hit_rate)
+
+
+class ResponseCacheCollector:
+    """Publishes the search response cache counters on /metrics at scrape time."""
+    def collect(self):
+        cache = getattr(app.state, "response_cache", None)
+        if cache is None:
+            return
+        yield CounterMetricFamily("search_response_cache_hits", "Searches answered from the response cache", value=cache.stats["hits"])
+        yield CounterMetricFamily("search_response_cache_misses", "Searches computed end to end", value=cache.stats["misses"])
+        yield CounterMetricFamily("search_response_cache_invalidations", "Cache flushes after collection writes", value=cache.stats["invalidations"])
+        yield GaugeMetricFamily("search_response_cache_size", "Cached search responses", value=len(cache))
+
+
+REGISTRY.register(QueryCacheCollector())
+REGISTRY.register(ResponseCacheCollector())
+
+
 # ---------------------------------------------------------------------------
 # Models
 # ---------------------------------------------------------------------------
@@ -100,6 +164,10 @@ class QueryRequest(BaseModel):
     top_k: int = Field(default=3, ge=1, le=100)
 
 
+class BatchQueryRequest(BaseModel):
+    queries: List[QueryRequest] = Field(..., min_length=1, max_length=settings.SEARCH_BATCH_MAX_QUERIES)
+
+
 class SearchResult(BaseModel):
     chunk_id: str
     text: str
@@ -115,6 +183,87 @@ def health_check():
     return {"status": "ok", "version": "2.0.0"}
 
 
+def _ensure_search_backend():
+    if settings.STORAGE_TYPE == "parquet":
+        if getattr(app.state, "local_index", None) is None:
+            raise HTTPException(status_code=503, detail="No local index available. Ingest documents with parquet storage first.")
+    elif settings.STORAGE_TYPE != "qdrant":
+        raise HTTPException(status_code=503, detail="Live search requires the Qdrant or parquet storage backend.")
+
+
+def _qdrant_query(embeddings: Embeddings, i: int, top_k: int) -> dict:
+    """query_points arguments for row i of an embedded batch: dense, or hybrid dense+sparse fused with RRF."""
+    if isinstance(embeddings, HybridEmbeddings):
+        from qdrant_client import models
+        prefetch_limit = max(20, top_k * 5)
+        sparse_indices, sparse_values = embeddings.sparse(i)
+        return {
+            "prefetch": [
+                models.Prefetch(query=embeddings.dense[i].tolist(), using="", limit=prefetch_limit),
+                models.Prefetch(
+                    query=models.SparseVector(
+                        indices=sparse_indices.tolist(),
+                        values=sparse_values.tolist(),
+                    ),
+                    using="text-sparse",
+                    limit=prefetch_limit,
+                ),
+            ],
+            "query": models.FusionQuery(fusion=models.Fusion.RRF),
+            "limit": top_k,
+        }
+    # query_points accepts the float32 row directly
+    return {"query": as_dense_matrix(embeddings)[i], "limit": top_k}
+
+
+def _to_results(points) -> List[SearchResult]:
+    return [
+        SearchResult(
+            chunk_id=str(p.id),
+            text=p.payload.get("text", ""),
+            score=p.score,
+            metadata={k: v for k, v in p.payload.items() if k != "text"},
+        )
+        for p in points
+    ]
+
+
+def _cache_lookup(queries: List[QueryRequest]) -> Tuple[List[str], List[Optional[List[SearchResult]]], Any]:
+    """
+    (cache keys, cached results or None per query, collection version of the lookup).
+    May read the collection version over the network: call it from a worker thread on async routes.
+    """
+    keys = [SearchResponseCache.key(app.state.embedder.model_id, q.query, q.top_k) for q in queries]
+    cache = getattr(app.state, "response_cache", None)
+    if cache is None:
+        return keys, [None] * len(keys), None
+    cached, version = cache.get_many(keys)
+    return keys, cached, version
+
+
+def _cache_store(key: str, results: List[SearchResult], version: Any):
+    cache = getattr(app.state, "response_cache", None)
+    if cache is not None:
+        cache.put(key, results, version)
+
+
+async def _get_batcher() -> MicroBatcher:
+    """
+    The shared micro-batcher, created inside the running event loop on first use.
+
+    If the embedder has been swapped, the old batcher answers the queries already queued on it
+    with the old model and is then stopped, so neither its worker task nor its callers are left behind.
+    """
+    batcher = getattr(app.state, "batcher", None)
+    if batcher is None or batcher.embed != app.state.embedder.embed_documents:
+        old = batcher
+        batcher = MicroBatcher(app.state.embedder.embed_documents)
+        app.state.batcher = batcher
+        if old is not None:
+            await old.close()
+    return batcher
+
+
 @app.post("/search", response_model=List[SearchResult])
 @limiter.limit("30/minute")
 def search(
@@ -122,52 +271,145 @@ def search(
     body: QueryRequest,
     _: str = Security(verify_api_key),
 ) -> list:
-    if settings.STORAGE_TYPE != "qdrant":
-        raise HTTPException(status_code=503, detail="Live search requires Qdrant storage backend.")
+    _ensure_search_backend()
 
     try:
+        # Popular queries skip both the embedder and the vector store
+        keys, cached, version = _cache_lookup([body])
+        if cached[0] is not None:
+            return cached[0]
+
         embedder = app.state.embedder
-        query_vector = embedder.embed_documents([body.query])[0]
+        query_embeddings = embedder.embed_documents([body.query])
 
-        client = app.state.qdrant_client
-        if isinstance(query_vector, dict) and "sparse_indices" in query_vector:
-            from qdrant_client import models
-            prefetch_limit = max(20, body.top_k * 5)
-            search_result = client.query_points(
+        if settings.STORAGE_TYPE == "parquet":
+            # Dense-only cosine search (sparse vectors are not used by the local backend)
+            query_vector = as_dense_matrix(query_embeddings)[0]
+            results = [SearchResult(**hit) for hit in app.state.local_index.search(query_vector, body.top_k)]
+        else:
+            search_result = app.state.qdrant_client.query_points(
                 collection_name=settings.QDRANT_COLLECTION_NAME,
-                prefetch=[
-                    models.Prefetch(query=query_vector["dense"], using="", limit=prefetch_limit),
-                    models.Prefetch(
-                        query=models.SparseVector(
-                            indices=query_vector["sparse_indices"],
-                            values=query_vector["sparse_values"],
-                        ),
-                        using="text-sparse",
-                        limit=prefetch_limit,
-                    ),
-                ],
-                query=models.FusionQuery(fusion=models.Fusion.RRF),
-                limit=body.top_k,
+                **_qdrant_query(query_embeddings, 0, body.top_k),
             )
+            results = _to_results(search_result.points)
+
+        _cache_store(keys[0], results, version)
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Search failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/search/async", response_model=List[SearchResult])
+@limiter.limit("30/minute")
+async def search_async(
+    request: Request,
+    body: QueryRequest,
+    _: str = Security(verify_api_key),
+) -> list:
+    """
+    Same results as /search, served on the event loop: concurrent queries are embedded
+    together by the micro-batcher and Qdrant is queried through the async client.
+    """
+    _ensure_search_backend()
+
+    try:
+        # The version read may hit Qdrant: keep it off the event loop
+        keys, cached, version = await run_in_threadpool(_cache_lookup, [body])
+        if cached[0] is not None:
+            return cached[0]
+
+        query_embeddings, i = await (await _get_batcher()).submit(body.query)
+
+        if settings.STORAGE_TYPE == "parquet":
+            query_vector = as_dense_matrix(query_embeddings)[i]
+            hits = await run_in_threadpool(app.state.local_index.search, query_vector, body.top_k)
+            results = [SearchResult(**hit) for hit in hits]
         else:
-            search_result = client.query_points(
+            search_result = await app.state.async_qdrant_client.query_points(
                 collection_name=settings.QDRANT_COLLECTION_NAME,
-                query=query_vector,
-                limit=body.top_k,
+                **_qdrant_query(query_embeddings, i, body.top_k),
             )
+            results = _to_results(search_result.points)
+
+        _cache_store(keys[0], results, version)
+        return results
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Async search failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return [
-            SearchResult(
-                chunk_id=str(p.id),
-                text=p.payload.get("text", ""),
-                score=p.score,
-                metadata={k: v for k, v in p.payload.items() if k != "text"},
+
+def _batch_size(request: Request, body: BatchQueryRequest) -> int:
+    # Resolved before the rate limiter runs, so the limit can be charged by batch size
+    request.state.batch_size = len(body.queries)
+    return request.state.batch_size
+
+
+def _batch_cost(request: Request) -> int:
+    """Rate-limit cost of a batch: one hit per SEARCH_BATCH_QUERIES_PER_COST queries (rounded up)."""
+    return max(1, math.ceil(getattr(request.state, "batch_size", 1) / settings.SEARCH_BATCH_QUERIES_PER_COST))
+
+
+@app.post("/search/batch", response_model=List[List[SearchResult]])
+@limiter.limit("30/minute", cost=_batch_cost)
+def search_batch(
+    request: Request,
+    body: BatchQueryRequest,
+    _: str = Security(verify_api_key),
+    __: int = Depends(_batch_size),
+) -> list:
+    """
+    Many queries in one round trip: one embedding call for all of them and a single
+    query_batch_points request (dense or hybrid RRF). Results are returned in query order.
+    """
+    _ensure_search_backend()
+
+    try:
+        keys, results, version = _cache_lookup(body.queries)
+        # Only the queries missing from the response cache are embedded and searched
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if not misses:
+            return results
+        queries = [body.queries[i] for i in misses]
+
+        query_embeddings = app.state.embedder.embed_documents([q.query for q in queries])
+
+        if settings.STORAGE_TYPE == "parquet":
+            # One blocked scan scores every query; each then keeps its own top_k
+            index = app.state.local_index
+            rows, scores = index.top_k(as_dense_matrix(query_embeddings), max(q.top_k for q in queries))
+            computed = [
+                [SearchResult(**index.payload(int(r)), score=float(sc)) for r, sc in zip(rows[j, :q.top_k], scores[j, :q.top_k]) if r >= 0]
+                for j, q in enumerate(queries)
+            ]
+        else:
+            from qdrant_client import models
+            requests = []
+            for j, q in enumerate(queries):
+                query_args = _qdrant_query(query_embeddings, j, q.top_k)
+                if isinstance(query_args["query"], np.ndarray):
+                    query_args["query"] = query_args["query"].tolist()
+                requests.append(models.QueryRequest(**query_args, with_payload=True))
+
+            responses = app.state.qdrant_client.query_batch_points(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                requests=requests,
             )
-            for p in search_result.points
-        ]
+            computed = [_to_results(response.points) for response in responses]
+
+        for i, query_results in zip(misses, computed):
+            _cache_store(keys[i], query_results, version)
+            results[i] = query_results
+        return results
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Search failed: {e}")
+        logger.error(f"Batch search failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
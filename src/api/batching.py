@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+from src.config.settings import settings
+from src.embedding.embedder import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent query embeddings into single model calls.
+
+    Queries submitted within max_wait_ms of the first one in a batch (up to max_batch_size)
+    are encoded together in a worker thread, so the event loop keeps accepting requests while
+    the model runs and the next batch fills. Each caller gets back (batch, index) pointing at
+    its own row of the shared result, without copying it. The wait bound plus one model call
+    on max_batch_size queries bounds the latency a request can pick up from batching.
+    """
+    def __init__(
+        self,
+        embed: Callable[[List[str]], Embeddings],
+        max_batch_size: int = settings.SEARCH_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.SEARCH_BATCH_MAX_WAIT_MS,
+    ):
+        self.embed = embed
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.queries = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def close(self):
+        """Stops the worker once every query already submitted has been answered."""
+        if self._worker is not None:
+            await self._queue.join()
+        await self.stop()
+
+    async def submit(self, text: str) -> Tuple[Embeddings, int]:
+        """Embeds one query as part of the next batch; returns (batch embeddings, row index)."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._embed_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _embed_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        texts = [text for text, _ in batch]
+        try:
+            embeddings: Any = await asyncio.get_running_loop().run_in_executor(None, self.embed, texts)
+        except Exception as e:
+            logger.error(f"Batched query embedding failed for {len(texts)} queries: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.queries += len(texts)
+        for i, (_, future) in enumerate(batch):
+            # Callers that timed out / disconnected have cancelled futures
+            if not future.done():
+                future.set_result((embeddings, i))
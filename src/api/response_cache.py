@@ -0,0 +1,94 @@
+import time
+import logging
+import threading
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+from src.config.settings import settings
+from src.embedding.cache import LRUCache, QueryCachedEmbedder
+
+logger = logging.getLogger(__name__)
+
+
+class SearchResponseCache:
+    """
+    Size-bounded LRU cache of complete search responses, keyed on (model id, normalized
+    query, top_k) and tied to the collection's data version.
+
+    One read of the version through `read_version` is shared by all lookups for
+    refresh_seconds, so a hit costs no round trip to the store; a response may be served for
+    at most that long after a write has landed. refresh_seconds = 0 re-reads the version on
+    every lookup (never stale, but every hit pays the read). When the version moves (new
+    documents were written or sources deleted) the whole cache is dropped. If the version
+    cannot be read, lookups miss and nothing is stored.
+
+    read_version may do network I/O: it runs outside the lock (concurrent lookups never
+    queue behind it), and callers on an event loop must call get() from a worker thread.
+    """
+    def __init__(
+        self,
+        read_version: Callable[[], Any],
+        max_items: int = settings.SEARCH_CACHE_SIZE,
+        refresh_seconds: float = settings.SEARCH_CACHE_VERSION_REFRESH_SECONDS,
+    ):
+        self.read_version = read_version
+        self.refresh_seconds = refresh_seconds
+        self.cache = LRUCache(max_items)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._version: Optional[Any] = None
+        self._checked_at = float("-inf")
+        # Reads are numbered so a slow read never overwrites the result of a newer one
+        self._reads_started = 0
+        self._read_applied = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def version(self) -> Optional[Any]:
+        with self._lock:
+            if self.refresh_seconds > 0 and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return self._version
+            self._reads_started += 1
+            read_number = self._reads_started
+        try:
+            version = self.read_version()
+        except Exception as e:
+            logger.warning(f"Could not read collection version, bypassing response cache: {e}")
+            version = None
+        with self._lock:
+            if read_number < self._read_applied:
+                return version
+            self._read_applied = read_number
+            self._checked_at = time.monotonic()
+            if version != self._version:
+                if self._version is not None:
+                    self.stats["invalidations"] += 1
+                    logger.info(f"Collection version changed ({self._version} -> {version}); clearing response cache.")
+                self.cache.clear()
+                self._version = version
+        return version
+
+    @staticmethod
+    def key(model_id: str, query: str, top_k: int) -> str:
+        return f"{model_id}:{top_k}:{QueryCachedEmbedder.normalize(query)}"
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], Optional[Any]]:
+        """Returns (cached value or None, version the lookup was made against)."""
+        values, version = self.get_many([key])
+        return values[0], version
+
+    def get_many(self, keys: List[Hashable]) -> Tuple[List[Optional[Any]], Optional[Any]]:
+        """Looks up several keys against a single version read."""
+        version = self.version()
+        values = [self.cache.get(f"{version}:{key}") if version is not None else None for key in keys]
+        with self._lock:
+            hits = sum(value is not None for value in values)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(values) - hits
+        return values, version
+
+    def put(self, key: Hashable, value: Any, version: Optional[Any]) -> None:
+        """Stores a response computed at `version`; dropped if the collection has moved on since."""
+        with self._lock:
+            current = self._version
+        if version is not None and version == current:
+            self.cache.put(f"{version}:{key}", value)
@@ -9,12 +9,70 @@ class Settings:
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 200))
     EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", 768))
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+    # Ingestion Configuration
+    # Number of worker processes used to parse PDFs in parallel (1 = serial)
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 1))
+
+    # Chunks per micro-batch in streaming pipeline mode (bounds peak memory)
+    PIPELINE_BATCH_SIZE = int(os.getenv("PIPELINE_BATCH_SIZE", 256))
+    # Max items buffered between two stages in staged mode (backpressure bound)
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 4))
+    # Worker processes for the chunking stage in staged mode (1 = in-thread)
+    CHUNKING_WORKERS = int(os.getenv("CHUNKING_WORKERS", 1))
+
+    # Persistent record of already-ingested files (enables incremental runs)
+    MANIFEST_PATH = os.getenv("MANIFEST_PATH", os.path.join("output", "ingestion_manifest.json"))
+
+    # OCR Configuration
+    # Pages with fewer extracted characters than this are sent to Tesseract
+    OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", 25))
+    # Concurrent tesseract processes per document (0 = the cores divided among the
+    # processes of the ingestion pool it runs in, so N workers never start N x cores)
+    OCR_WORKERS = int(os.getenv("OCR_WORKERS", 0))
+    # Max pages rasterized to disk at once
+    OCR_WINDOW_SIZE = int(os.getenv("OCR_WINDOW_SIZE", 16))
+    OCR_DPI = int(os.getenv("OCR_DPI", 200))
     
     # Embedding Configuration
     # Options: "mock", "huggingface"
     EMBEDDING_TYPE = os.getenv("EMBEDDING_TYPE", "mock")
     # Model name for HuggingFace (e.g., "all-mpnet-base-v2")
     EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-mpnet-base-v2")
+
+    # MockEmbedder: 0 = unclustered unit vectors; > 0 = vectors jittered around N centroids
+    MOCK_EMBEDDING_CLUSTERS = int(os.getenv("MOCK_EMBEDDING_CLUSTERS", 0))
+    MOCK_EMBEDDING_CLUSTER_SPREAD = float(os.getenv("MOCK_EMBEDDING_CLUSTER_SPREAD", 0.5))
+    MOCK_EMBEDDING_SEED = int(os.getenv("MOCK_EMBEDDING_SEED", 42))
+
+    # Content-addressed embedding cache (skips re-embedding repeated/unchanged text)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "false").lower() == "true"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("output", "cache", "embeddings.sqlite"))
+    EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", 10000))
+    EMBEDDING_CACHE_MAX_ITEMS = int(os.getenv("EMBEDDING_CACHE_MAX_ITEMS", 1000000))
+
+    # HyDE summarization: model, chunks per summarizer call, texts shorter than
+    # HYDE_MIN_CHARS are used as their own summary, and inputs are cut at HYDE_MAX_INPUT_CHARS
+    HYDE_MODEL_NAME = os.getenv("HYDE_MODEL_NAME", "sshleifer/distilbart-cnn-12-6")
+    # Options: "abstractive" (HYDE_MODEL_NAME), "textrank", "tfidf" (CPU-cheap extractive
+    # summaries of HYDE_EXTRACTIVE_SENTENCES sentences, no model download)
+    HYDE_ENGINE = os.getenv("HYDE_ENGINE", "abstractive")
+    HYDE_EXTRACTIVE_SENTENCES = int(os.getenv("HYDE_EXTRACTIVE_SENTENCES", 2))
+    HYDE_BATCH_SIZE = int(os.getenv("HYDE_BATCH_SIZE", 16))
+    HYDE_MIN_CHARS = int(os.getenv("HYDE_MIN_CHARS", 100))
+    HYDE_MAX_INPUT_CHARS = int(os.getenv("HYDE_MAX_INPUT_CHARS", 1024))
+    # Summaries cached on disk by (model, text hash) so re-ingests only summarize new text
+    HYDE_CACHE_ENABLED = os.getenv("HYDE_CACHE_ENABLED", "true").lower() == "true"
+    HYDE_CACHE_PATH = os.getenv("HYDE_CACHE_PATH", os.path.join("output", "cache", "summaries.sqlite"))
+    HYDE_CACHE_MAX_ITEMS = int(os.getenv("HYDE_CACHE_MAX_ITEMS", 1000000))
+    # Deferred HyDE: stored chunks summarized and re-embedded per pass, and the idle
+    # wait before looking for new pending chunks again
+    HYDE_DEFERRED_BATCH_SIZE = int(os.getenv("HYDE_DEFERRED_BATCH_SIZE", 64))
+    HYDE_DEFERRED_POLL_SECONDS = float(os.getenv("HYDE_DEFERRED_POLL_SECONDS", 5.0))
+    # Passes a pending chunk may fail before it is given up on (kept on its raw vector);
+    # failed passes back off exponentially from the poll interval up to HYDE_DEFERRED_MAX_BACKOFF_SECONDS
+    HYDE_DEFERRED_MAX_ATTEMPTS = int(os.getenv("HYDE_DEFERRED_MAX_ATTEMPTS", 3))
+    HYDE_DEFERRED_MAX_BACKOFF_SECONDS = float(os.getenv("HYDE_DEFERRED_MAX_BACKOFF_SECONDS", 300.0))
     
     # Chunking Configuration
     # Options: "fixed", "sliding", "structural"
@@ -24,22 +82,104 @@ class Settings:
     # Options: "parquet", "qdrant"
     STORAGE_TYPE = os.getenv("STORAGE_TYPE", "qdrant")
     
-    # Path where processed parquet files (silver layer) will be saved (used if STORAGE_TYPE='parquet')
-    OUTPUT_PATH = os.path.join("output", "embeddings.parquet")
+    # Root of the partitioned parquet dataset (silver layer), used if STORAGE_TYPE='parquet'.
+    # Files land in OUTPUT_PATH/ingest_date=YYYY-MM-DD/source=<file>/part-*.parquet
+    OUTPUT_PATH = os.getenv("OUTPUT_PATH", os.path.join("output", "embeddings"))
+    PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", 16384))
+    # Any pyarrow codec: "zstd", "snappy", "gzip", "lz4", "none"
+    PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+    # Max partition files held open at once within a write session
+    PARQUET_MAX_OPEN_FILES = int(os.getenv("PARQUET_MAX_OPEN_FILES", 32))
+
+    # Local (no Qdrant) search over the parquet dataset: memory-mapped index directory
+    # and rows scored per matrix-product block
+    LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", os.path.join("output", "local_index"))
+    LOCAL_SEARCH_BLOCK_SIZE = int(os.getenv("LOCAL_SEARCH_BLOCK_SIZE", 65536))
+    # Keep the local index updated as parquet batches are written (instead of rebuilding on API start)
+    LOCAL_INDEX_INCREMENTAL = os.getenv("LOCAL_INDEX_INCREMENTAL", "true").lower() == "true"
+    # Options: "auto" (IVF once trained, exact before), "exact", "ivf"
+    LOCAL_SEARCH_MODE = os.getenv("LOCAL_SEARCH_MODE", "auto")
+
+    # IVF approximate search for the local index.
+    # Build: lists (0 = ~4*sqrt(n)), k-means sample/iterations, rows needed before training.
+    # Search: lists probed per query (higher = better recall, slower).
+    ANN_NLIST = int(os.getenv("ANN_NLIST", 0))
+    ANN_NPROBE = int(os.getenv("ANN_NPROBE", 8))
+    ANN_TRAIN_MIN_ROWS = int(os.getenv("ANN_TRAIN_MIN_ROWS", 50000))
+    ANN_TRAIN_SAMPLE = int(os.getenv("ANN_TRAIN_SAMPLE", 100000))
+    ANN_KMEANS_ITERATIONS = int(os.getenv("ANN_KMEANS_ITERATIONS", 20))
+
+    # Data quality checks before storage
+    # Options: "native" (vectorized, every batch), "great_expectations" (full GX audit, every batch),
+    # "sampled" (native on every batch + GX audit on DATA_QUALITY_SAMPLE_RATE of batches), "off"
+    DATA_QUALITY_MODE = os.getenv("DATA_QUALITY_MODE", "native")
+    DATA_QUALITY_SAMPLE_RATE = float(os.getenv("DATA_QUALITY_SAMPLE_RATE", 0.05))
 
     # Qdrant Config
     QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
     QDRANT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME", "dark_data")
+    # Bulk upload: points per request, parallel requests, and whether to wait for indexing
+    QDRANT_UPLOAD_BATCH_SIZE = int(os.getenv("QDRANT_UPLOAD_BATCH_SIZE", 256))
+    QDRANT_UPLOAD_WORKERS = int(os.getenv("QDRANT_UPLOAD_WORKERS", 4))
+    QDRANT_UPLOAD_WAIT = os.getenv("QDRANT_UPLOAD_WAIT", "true").lower() == "true"
+
+    # Streaming transport: "kafka" (Redpanda broker) or "sqlite" (local durable queue file,
+    # no broker), with the queue's default partitions per topic and group session timeout.
+    # Local members heartbeat from a background thread every STREAMING_HEARTBEAT_INTERVAL_MS;
+    # the timeout stays above the longest per-message processing time (OCR can take minutes)
+    STREAMING_TRANSPORT = os.getenv("STREAMING_TRANSPORT", "kafka")
+    STREAMING_QUEUE_PATH = os.getenv("STREAMING_QUEUE_PATH", os.path.join("output", "stream_queue.db"))
+    STREAMING_QUEUE_PARTITIONS = int(os.getenv("STREAMING_QUEUE_PARTITIONS", 4))
+    STREAMING_SESSION_TIMEOUT_MS = int(os.getenv("STREAMING_SESSION_TIMEOUT_MS", 300000))
+    STREAMING_HEARTBEAT_INTERVAL_MS = int(os.getenv("STREAMING_HEARTBEAT_INTERVAL_MS", 3000))
 
     # Kafka Config
     KAFKA_BROKER = os.getenv("KAFKA_BROKER", "localhost:39092")
     KAFKA_TOPIC_NAME = os.getenv("KAFKA_TOPIC_NAME", "raw_documents")
     KAFKA_GROUP_ID = os.getenv("KAFKA_GROUP_ID", "rag_pipeline_group")
+    # DLQ producer batching: how long sends wait to fill a batch, and batch compression
+    # (gzip needs no extra library; snappy/lz4/zstd need their python packages)
+    KAFKA_DLQ_LINGER_MS = int(os.getenv("KAFKA_DLQ_LINGER_MS", 50))
+    KAFKA_DLQ_COMPRESSION = os.getenv("KAFKA_DLQ_COMPRESSION", "gzip")
+    # Watchdog producer: event batching, and how long a new file's size/mtime must stay
+    # unchanged before it is published (so files still being copied are not ingested)
+    KAFKA_PRODUCER_LINGER_MS = int(os.getenv("KAFKA_PRODUCER_LINGER_MS", 50))
+    KAFKA_PRODUCER_COMPRESSION = os.getenv("KAFKA_PRODUCER_COMPRESSION", "gzip")
+    WATCH_STABLE_SECONDS = float(os.getenv("WATCH_STABLE_SECONDS", 2.0))
+    WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", 0.5))
+    # Offsets of processed messages are committed asynchronously at most this often
+    KAFKA_COMMIT_INTERVAL_MS = int(os.getenv("KAFKA_COMMIT_INTERVAL_MS", 1000))
+    # Batch consumer mode: max events per batch, max time spent filling one,
+    # and worker processes ingesting the batch's files in parallel
+    KAFKA_BATCH_MAX_RECORDS = int(os.getenv("KAFKA_BATCH_MAX_RECORDS", 64))
+    KAFKA_BATCH_TIMEOUT_MS = int(os.getenv("KAFKA_BATCH_TIMEOUT_MS", 1000))
+    KAFKA_BATCH_INGEST_WORKERS = int(os.getenv("KAFKA_BATCH_INGEST_WORKERS", 4))
+    # Supervisor mode: worker processes (each loads its own models) and max messages
+    # dispatched but not yet finished (0 = 2 x workers)
+    KAFKA_CONSUMER_WORKERS = int(os.getenv("KAFKA_CONSUMER_WORKERS", 4))
+    KAFKA_MAX_IN_FLIGHT = int(os.getenv("KAFKA_MAX_IN_FLIGHT", 0))
+    # Times a message may take down a worker process (the pool is rebuilt and the message
+    # resubmitted) before it is dead-lettered instead
+    KAFKA_MAX_WORKER_CRASHES = int(os.getenv("KAFKA_MAX_WORKER_CRASHES", 2))
 
     # API Config
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", 8888))
     API_URL = os.getenv("API_URL", f"http://localhost:{API_PORT}")
+    # /search query-embedding cache: max entries (0 = disabled) and expiry (0 = never)
+    QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1024))
+    QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", 0))
+    # Search response cache: max entries (0 = disabled) and how long one read of the collection
+    # data version is reused. Within that window a hit makes no storage call at all; results
+    # older than the latest write are served for at most this long (0 = re-read on every lookup)
+    SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 2048))
+    SEARCH_CACHE_VERSION_REFRESH_SECONDS = float(os.getenv("SEARCH_CACHE_VERSION_REFRESH_SECONDS", 2.0))
+    # /search/async micro-batching: queries per model call and max wait for a batch to fill
+    SEARCH_BATCH_MAX_SIZE = int(os.getenv("SEARCH_BATCH_MAX_SIZE", 32))
+    SEARCH_BATCH_MAX_WAIT_MS = float(os.getenv("SEARCH_BATCH_MAX_WAIT_MS", 5))
+    # /search/batch: max queries per request, and queries charged as one rate-limit hit
+    SEARCH_BATCH_MAX_QUERIES = int(os.getenv("SEARCH_BATCH_MAX_QUERIES", 64))
+    SEARCH_BATCH_QUERIES_PER_COST = int(os.getenv("SEARCH_BATCH_QUERIES_PER_COST", 10))
 
 settings = Settings()
@@ -10,24 +10,27 @@ from src.config.settings import settings
 def inspect_output():
     file_path = settings.OUTPUT_PATH
     
-    if not os.path.exists(file_path):
-        print(f"❌ No output file found at {file_path}. Run 'make run' first.")
+    if not os.path.isdir(file_path):
+        print(f"❌ No output dataset found at {file_path}. Run 'make run' first.")
         return
 
     print(f"🔍 Inspecting Pipeline Output: {file_path}")
     print("-" * 60)
     
     try:
+        # Partitioned dataset: ingest_date and source come back as columns
         df = pd.read_parquet(file_path)
         
         # 1. High Level Stats
         total_chunks = len(df)
         unique_docs = df['parent_id'].nunique()
         
-        print("✅ SUCCESSFULLY LOADED PARQUET FILE")
+        print("✅ SUCCESSFULLY LOADED PARQUET DATASET")
         print("📊 STATISTICS:")
         print(f"   • Total Processed Chunks:  {total_chunks}")
         print(f"   • Unique Input Documents:  {unique_docs}")
+        if not df.empty:
+            print(f"   • Ingest Dates:            {sorted(df['ingest_date'].astype(str).unique())}")
         if not df.empty:
             print(f"   • Vector Dimension:        {len(df.iloc[0]['vector'])}")
             print(f"   • Output Schema:           {list(df.columns)}")
@@ -0,0 +1,281 @@
+import os
+import time
+import unicodedata
+import pickle
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.embedding.embedder import BaseEmbedder, Embeddings, HybridEmbeddings, as_dense_matrix
+
+logger = logging.getLogger(__name__)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe, size-bounded in-memory LRU map, with optional per-entry expiry (ttl_seconds > 0)."""
+    def __init__(self, max_items: int, ttl_seconds: float = 0):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        if self.max_items <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Local on-disk key/value store (single SQLite file) with bounded size.
+    When the entry count exceeds max_items, the least recently used ~10% are evicted.
+    Values are pickled; the file is a private local cache, never shared input.
+    """
+    def __init__(self, path: str, max_items: int):
+        self.path = path
+        self.max_items = max_items
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache(last_used)")
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        if not keys:
+            return found
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM cache WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, value in rows:
+                    found[key] = pickle.loads(value)
+                if rows:
+                    self._conn.executemany(
+                        "UPDATE cache SET last_used = ? WHERE key = ?",
+                        [(time.time(), key) for key, _ in rows],
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = time.time()
+        rows = [(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now) for key, value in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO cache (key, value, last_used) VALUES (?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count <= self.max_items:
+            return
+        to_remove = count - int(self.max_items * 0.9)
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY last_used ASC LIMIT ?)", (to_remove,)
+        )
+        logger.info(f"Evicted {to_remove} entries from cache {self.path}.")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbedder(BaseEmbedder):
+    """
+    Content-addressed cache in front of any BaseEmbedder.
+
+    Vectors are keyed by (model id, sha256(text)) and looked up in an in-memory LRU tier,
+    then in a local SQLite store. Only the remaining misses (deduplicated) are sent to the
+    wrapped model in a single call, and results are returned in input order.
+    """
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        path: str = settings.EMBEDDING_CACHE_PATH,
+        memory_items: int = settings.EMBEDDING_CACHE_MEMORY_ITEMS,
+        disk_items: int = settings.EMBEDDING_CACHE_MAX_ITEMS,
+    ):
+        self.embedder = embedder
+        self.memory = LRUCache(memory_items)
+        self.disk = SQLiteCache(path, disk_items)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        logger.info(f"Embedding cache enabled for '{embedder.model_id}' at {path}.")
+
+    @property
+    def model_id(self) -> str:
+        return self.embedder.model_id
+
+    @property
+    def hit_rate(self) -> float:
+        total = sum(self.stats.values())
+        return (self.stats["memory_hits"] + self.stats["disk_hits"]) / total if total else 0.0
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_id}:{text_hash(text)}"
+
+    @staticmethod
+    def _split(embeddings: Embeddings) -> List[Any]:
+        """Splits a batch into standalone per-text rows (copies, so no batch stays pinned)."""
+        if isinstance(embeddings, HybridEmbeddings):
+            return embeddings.rows()
+        return [row.copy() for row in as_dense_matrix(embeddings)]
+
+    @staticmethod
+    def _assemble(rows: List[Any]) -> Embeddings:
+        if rows and isinstance(rows[0], tuple):
+            return HybridEmbeddings.from_rows(rows)
+        if not rows:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.ascontiguousarray(np.stack(rows), dtype=np.float32)
+
+    def embed_documents(self, texts: List[str]) -> Embeddings:
+        keys = [self._key(t) for t in texts]
+        vectors: Dict[str, Any] = {}
+
+        # 1. In-memory tier
+        for key in set(keys):
+            value = self.memory.get(key)
+            if value is not None:
+                vectors[key] = value
+        memory_hits = len(vectors)
+
+        # 2. On-disk tier
+        remaining = [k for k in set(keys) if k not in vectors]
+        for key, value in self.disk.get_many(remaining).items():
+            vectors[key] = value
+            self.memory.put(key, value)
+        disk_hits = len(vectors) - memory_hits
+
+        # 3. Misses go to the model in one batch, each distinct text only once
+        miss_texts: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in miss_texts:
+                miss_texts[key] = text
+        if miss_texts:
+            computed = self._split(self.embedder.embed_documents(list(miss_texts.values())))
+            new_items = list(zip(miss_texts.keys(), computed))
+            for key, value in new_items:
+                vectors[key] = value
+                self.memory.put(key, value)
+            self.disk.put_many(new_items)
+
+        with self._stats_lock:
+            self.stats["memory_hits"] += memory_hits
+            self.stats["disk_hits"] += disk_hits
+            self.stats["misses"] += len(miss_texts)
+
+        logger.info(
+            f"Embedding cache: {memory_hits} memory hit(s), {disk_hits} disk hit(s), "
+            f"{len(miss_texts)} miss(es) for {len(texts)} text(s)."
+        )
+        return self._assemble([vectors[k] for k in keys])
+
+
+class QueryCachedEmbedder(BaseEmbedder):
+    """
+    In-memory cache of query embeddings (dense and sparse) for the search API.
+
+    Queries are keyed by the embedder's model id and their normalized text (Unicode NFKC,
+    trimmed, runs of whitespace collapsed), so repeated dashboard/UI queries skip the model.
+    Misses within one call are embedded together in a single batch.
+    """
+    def __init__(
+        self,
+        embedder: BaseEmbedder,
+        max_items: int = settings.QUERY_CACHE_SIZE,
+        ttl_seconds: float = settings.QUERY_CACHE_TTL_SECONDS,
+    ):
+        self.embedder = embedder
+        self.cache = LRUCache(max_items, ttl_seconds)
+        self.stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        return self.embedder.model_id
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", query).split())
+
+    def embed_documents(self, texts: List[str]) -> Embeddings:
+        keys = [f"{self.model_id}:{self.normalize(t)}" for t in texts]
+        rows: Dict[str, Any] = {}
+        for key in keys:
+            value = self.cache.get(key)
+            if value is not None:
+                rows[key] = value
+
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in rows and key not in misses:
+                misses[key] = self.normalize(text)
+        if misses:
+            computed = CachedEmbedder._split(self.embedder.embed_documents(list(misses.values())))
+            for key, value in zip(misses, computed):
+                rows[key] = value
+                self.cache.put(key, value)
+
+        with self._stats_lock:
+            self.stats["hits"] += len(texts) - len(misses)
+            self.stats["misses"] += len(misses)
+        return CachedEmbedder._assemble([rows[k] for k in keys])
@@ -1,34 +1,161 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from dataclasses import dataclass
+import hashlib
+from typing import List, Any, Sequence, Tuple, Union
 import numpy as np
 import logging
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class HybridEmbeddings:
+    """
+    Dense + sparse embeddings for a batch of texts.
+    `dense` is a contiguous (n, dim) float32 matrix; the sparse BM25 vectors are stored
+    in CSR form: row i owns indices/values[indptr[i]:indptr[i + 1]].
+    """
+    dense: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    values: np.ndarray
+
+    def __len__(self) -> int:
+        return self.dense.shape[0]
+
+    def sparse(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return self.indices[start:end], self.values[start:end]
+
+    def rows(self) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Splits the batch into independent (dense, indices, values) rows."""
+        return [(self.dense[i].copy(), *(a.copy() for a in self.sparse(i))) for i in range(len(self))]
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple[np.ndarray, np.ndarray, np.ndarray]], dimension: int = 0) -> "HybridEmbeddings":
+        dense = np.ascontiguousarray(np.stack([r[0] for r in rows]), dtype=np.float32) if rows \
+            else np.empty((0, dimension), dtype=np.float32)
+        lengths = np.fromiter((len(r[1]) for r in rows), dtype=np.int64, count=len(rows))
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        indices = np.concatenate([r[1] for r in rows]).astype(np.int64) if rows else np.empty(0, dtype=np.int64)
+        values = np.concatenate([r[2] for r in rows]).astype(np.float32) if rows else np.empty(0, dtype=np.float32)
+        return cls(dense=dense, indptr=indptr, indices=indices, values=values)
+
+
+# Dense embedders return an (n, dim) float32 matrix; HybridEmbedder returns HybridEmbeddings
+Embeddings = Union[np.ndarray, HybridEmbeddings]
+
+
+def as_dense_matrix(embeddings: Any) -> np.ndarray:
+    """
+    Returns the dense part of any embeddings batch as a 2-D float32 array.
+    Arrays pass through without copying; plain lists (legacy callers) are converted once.
+    """
+    if isinstance(embeddings, HybridEmbeddings):
+        return embeddings.dense
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        matrix = matrix.reshape(len(embeddings), -1)
+    return matrix
+
+
 class BaseEmbedder(ABC):
     @abstractmethod
-    def embed_documents(self, texts: List[str]) -> List[Any]:
+    def embed_documents(self, texts: List[str]) -> Embeddings:
+        """Returns a contiguous (len(texts), dim) float32 matrix (or HybridEmbeddings)."""
         pass
 
+    @property
+    def model_id(self) -> str:
+        """Identifies the model and its config; vectors from different ids are not interchangeable."""
+        return type(self).__name__
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Vectorized SplitMix64 finalizer: maps uint64 counters to well-mixed uint64 values."""
+    with np.errstate(over="ignore"):
+        z = x + _GOLDEN
+        z = (z ^ (z >> np.uint64(30))) * _MIX_1
+        z = (z ^ (z >> np.uint64(27))) * _MIX_2
+    return z ^ (z >> np.uint64(31))
+
+
+def _text_seeds(texts: List[str], seed: int) -> np.ndarray:
+    """One 64-bit seed per text, derived from its content (not its length)."""
+    salt = int(_splitmix64(np.array([seed], dtype=np.uint64))[0])
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode("utf-8"), digest_size=8).digest(), "little") ^ salt for t in texts),
+        dtype=np.uint64,
+        count=len(texts),
+    )
+
+
 class MockEmbedder(BaseEmbedder):
     """
-    A mock embedder for development and testing pipelines without GPU/API dependency.
-    Generates deterministic random vectors based on text length to simulate consistency.
+    A mock embedder for development, testing and load-testing pipelines without GPU/API dependency.
+
+    Vectors are unit-length and derived from a hash of each text's content, so they are
+    deterministic across runs and processes, distinct for distinct texts, and a whole batch
+    is generated with vectorized NumPy ops (counter-based SplitMix64 hashing, no global RNG
+    state, so it is thread-safe). With n_clusters > 0 every text is assigned to one of n_clusters
+    centroids (drawn once from a local Generator) and jittered around it, which gives ANN
+    recall/latency benchmarks a realistic, non-uniform distribution.
     """
-    def __init__(self, dimension: int = settings.EMBEDDING_DIMENSION):
+    # Rows generated per vectorized block (bounds temporary memory on huge batches)
+    BLOCK_SIZE = 4096
+
+    def __init__(
+        self,
+        dimension: int = settings.EMBEDDING_DIMENSION,
+        n_clusters: int = settings.MOCK_EMBEDDING_CLUSTERS,
+        cluster_spread: float = settings.MOCK_EMBEDDING_CLUSTER_SPREAD,
+        seed: int = settings.MOCK_EMBEDDING_SEED,
+    ):
         self.dimension = dimension
+        self.n_clusters = n_clusters
+        self.cluster_spread = cluster_spread
+        self.seed = seed
+        self._centroids: np.ndarray | None = None
+        if n_clusters > 0:
+            rng = np.random.default_rng(seed)
+            centroids = rng.standard_normal((n_clusters, dimension)).astype(np.float32)
+            self._centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
         logger.warning(f"Initialized MockEmbedder. This will generate RANDOM vectors of dimension {dimension}.")
 
-    def embed_documents(self, texts: List[str]) -> List[Any]:
+    @property
+    def model_id(self) -> str:
+        if self.n_clusters:
+            return f"mock-{self.dimension}-c{self.n_clusters}-s{self.cluster_spread}-{self.seed}"
+        return f"mock-{self.dimension}-{self.seed}"
+
+    def _random_block(self, seeds: np.ndarray) -> np.ndarray:
+        """(len(seeds), dimension) block of zero-mean noise: each hashed uint64 yields four int16 components."""
+        words = (self.dimension + 3) // 4
+        counters = np.arange(words, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            bits = _splitmix64(seeds[:, None] * _GOLDEN + counters[None, :])
+        return bits.view(np.int16)[:, :self.dimension].astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         logger.info(f"Generating vectors for {len(texts)} chunks using MockEmbedder.")
-        embeddings = []
-        for text in texts:
-            # We seed random with the length of text to get deterministic "fake" embeddings 
-            # (useful for testing pipeline consistency)
-            np.random.seed(len(text))
-            vector = np.random.rand(self.dimension).tolist()
-            embeddings.append(vector)
+        seeds = _text_seeds(texts, self.seed)
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+
+        for start in range(0, len(texts), self.BLOCK_SIZE):
+            block_seeds = seeds[start:start + self.BLOCK_SIZE]
+            block = self._random_block(block_seeds)
+            block /= np.linalg.norm(block, axis=1, keepdims=True)
+            if self._centroids is not None:
+                labels = (block_seeds % np.uint64(self.n_clusters)).astype(np.intp)
+                block = self._centroids[labels] + self.cluster_spread * block
+                block /= np.linalg.norm(block, axis=1, keepdims=True)
+            embeddings[start:start + len(block_seeds)] = block
+
         return embeddings
 
 class HuggingFaceEmbedder(BaseEmbedder):
@@ -37,6 +164,7 @@ class HuggingFaceEmbedder(BaseEmbedder):
     Downloads the model once and runs locally.
     """
     def __init__(self, model_name: str = settings.EMBEDDING_MODEL_NAME):
+        self.model_name = model_name
         try:
             from sentence_transformers import SentenceTransformer
             logger.info(f"Loading local embedding model: {model_name}...")
@@ -46,11 +174,15 @@ class HuggingFaceEmbedder(BaseEmbedder):
             logger.error("sentence-transformers not installed. Please run: pip install sentence-transformers")
             raise
 
-    def embed_documents(self, texts: List[str]) -> List[Any]:
+    @property
+    def model_id(self) -> str:
+        return f"huggingface:{self.model_name}"
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
         logger.info(f"Generating semantic vectors for {len(texts)} chunks using HuggingFace.")
-        # encode returns numpy array, convert to list
-        embeddings = self.model.encode(texts, show_progress_bar=True)
-        return embeddings.tolist()
+        # encode already returns a numpy array; keep it as contiguous float32
+        embeddings = self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
 
 class HybridEmbedder(BaseEmbedder):
     """
@@ -58,6 +190,7 @@ class HybridEmbedder(BaseEmbedder):
     and sparse (BM25 via fastembed) embeddings for Hybrid Search.
     """
     def __init__(self, dense_model_name: str = settings.EMBEDDING_MODEL_NAME):
+        self.dense_model_name = dense_model_name
         try:
             from sentence_transformers import SentenceTransformer
             from fastembed import SparseTextEmbedding
@@ -72,29 +205,42 @@ class HybridEmbedder(BaseEmbedder):
             logger.error("Dependencies missing. Run: pip install sentence-transformers fastembed")
             raise
 
-    def embed_documents(self, texts: List[str]) -> List[Any]:
+    @property
+    def model_id(self) -> str:
+        return f"hybrid:{self.dense_model_name}+Qdrant/bm25"
+
+    def embed_documents(self, texts: List[str]) -> HybridEmbeddings:
         logger.info(f"Generating dense and sparse vectors for {len(texts)} chunks.")
         # Dense
-        dense_embeddings = self.dense_model.encode(texts, show_progress_bar=True).tolist()
+        dense_embeddings = np.ascontiguousarray(
+            self.dense_model.encode(texts, show_progress_bar=True, convert_to_numpy=True), dtype=np.float32
+        )
         
-        # Sparse
-        sparse_embeddings = list(self.sparse_model.embed(texts)) # Returns list of SparseEmbedding
-        
-        results = []
-        for d, s in zip(dense_embeddings, sparse_embeddings):
-            results.append({
-                "dense": d,
-                "sparse_indices": s.indices.tolist(),
-                "sparse_values": s.values.tolist()
-            })
-        return results
-
-def get_embedder(type: str = settings.EMBEDDING_TYPE) -> BaseEmbedder:
+        # Sparse (list of SparseEmbedding), packed into CSR arrays
+        sparse_embeddings = list(self.sparse_model.embed(texts))
+        lengths = np.fromiter((len(s.indices) for s in sparse_embeddings), dtype=np.int64, count=len(sparse_embeddings))
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        if sparse_embeddings:
+            indices = np.concatenate([s.indices for s in sparse_embeddings]).astype(np.int64)
+            values = np.concatenate([s.values for s in sparse_embeddings]).astype(np.float32)
+        else:
+            indices = np.empty(0, dtype=np.int64)
+            values = np.empty(0, dtype=np.float32)
+
+        return HybridEmbeddings(dense=dense_embeddings, indptr=indptr, indices=indices, values=values)
+
+def get_embedder(type: str = settings.EMBEDDING_TYPE, use_cache: bool = settings.EMBEDDING_CACHE_ENABLED) -> BaseEmbedder:
+    embedder: BaseEmbedder
     if type == "mock":
-        return MockEmbedder()
+        embedder = MockEmbedder()
     elif type == "huggingface":
-        return HuggingFaceEmbedder()
+        embedder = HuggingFaceEmbedder()
     elif type == "hybrid":
-        return HybridEmbedder()
+        embedder = HybridEmbedder()
     else:
         raise ValueError(f"Unknown embedder type: {type}")
+
+    if use_cache:
+        from src.embedding.cache import CachedEmbedder
+        return CachedEmbedder(embedder)
+    return embedder
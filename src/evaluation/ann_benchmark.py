@@ -0,0 +1,106 @@
+"""
+Local ANN Benchmark — IVF recall vs. latency
+=============================================
+Measures, for a range of nprobe values, how much recall@K the IVF index of the
+local (parquet) search backend gives up against exact search on the same data,
+and what it buys in per-query latency (mean / p50 / p99).
+
+Data
+----
+* Default: the persisted local index (LOCAL_INDEX_PATH, built from the parquet
+  dataset if needed). Queries are stored vectors with a little noise added.
+* --synthetic N: N clustered MockEmbedder vectors written to a temporary index,
+  so the trade-off can be explored without ingesting anything.
+
+Usage
+-----
+    PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/ann_benchmark.py
+    PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/ann_benchmark.py --synthetic 1000000 --nlist 4096
+    # or
+    make ann-bench
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from src.config.settings import settings
+from src.storage.local_search import LocalIndexWriter, LocalVectorIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("AnnBenchmark")
+
+
+def build_synthetic_index(index_path: str, rows: int, dimension: int, clusters: int, nlist: Optional[int]) -> LocalVectorIndex:
+    from src.embedding.embedder import MockEmbedder
+
+    embedder = MockEmbedder(dimension=dimension, n_clusters=clusters)
+    writer = LocalIndexWriter.create(index_path, dimension)
+    for start in range(0, rows, 65536):
+        ids = [f"{i:036d}" for i in range(start, min(rows, start + 65536))]
+        writer.append(ids, [""] * len(ids), ["{}"] * len(ids), embedder.embed_documents(ids))
+    writer.train(nlist)
+    writer.commit("synthetic")
+    return LocalVectorIndex(index_path, mode="ivf")
+
+
+def _timed_top_k(index: LocalVectorIndex, queries: np.ndarray, k: int, nprobe: Optional[int] = None):
+    rows, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found, _ = index.top_k(query, k, nprobe=nprobe)
+        latencies.append((time.perf_counter() - start) * 1000)
+        rows.append(found[0])
+    return rows, np.array(latencies)
+
+
+def run_benchmark(index: LocalVectorIndex, n_queries: int = 200, k: int = 10, seed: int = 0) -> List[Dict[str, float]]:
+    if index.centroids is None:
+        raise RuntimeError("The local index has no IVF lists yet (see ANN_TRAIN_MIN_ROWS).")
+
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(index), min(n_queries, len(index)), replace=False)
+    queries = np.asarray(index.vectors[np.sort(sample)]) + rng.normal(0, 0.05, (len(sample), index.dimension)).astype(np.float32)
+
+    exact = LocalVectorIndex(index.index_path, mode="exact")
+    truth, exact_ms = _timed_top_k(exact, queries, k)
+    report = [{"nprobe": 0, "recall": 1.0, "mean_ms": exact_ms.mean(), "p50_ms": np.percentile(exact_ms, 50), "p99_ms": np.percentile(exact_ms, 99)}]
+
+    nlist = len(index.centroids)
+    nprobes = sorted({p for p in (1, 2, 4, 8, 16, 32, 64, 128, 256) if p < nlist} | {nlist})
+    for nprobe in nprobes:
+        found, ms = _timed_top_k(index, queries, k, nprobe=nprobe)
+        recall = np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)])
+        report.append({"nprobe": nprobe, "recall": recall, "mean_ms": ms.mean(), "p50_ms": np.percentile(ms, 50), "p99_ms": np.percentile(ms, 99)})
+
+    logger.info("=" * 60)
+    logger.info(f"IVF RECALL@{k} vs LATENCY  ({len(index)} vectors, dim={index.dimension}, nlist={nlist}, {len(queries)} queries)")
+    logger.info(f"  {'nprobe':>8}  {'recall':>7}  {'mean ms':>8}  {'p50 ms':>8}  {'p99 ms':>8}")
+    for row in report:
+        label = "exact" if row["nprobe"] == 0 else str(row["nprobe"])
+        logger.info(f"  {label:>8}  {row['recall']:>7.3f}  {row['mean_ms']:>8.2f}  {row['p50_ms']:>8.2f}  {row['p99_ms']:>8.2f}")
+    logger.info("=" * 60)
+    logger.info("TIP: set ANN_NPROBE to the smallest nprobe that meets your recall target.")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="IVF recall vs latency for the local search backend")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark N synthetic clustered vectors instead of the local index")
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIMENSION, help="Synthetic vector dimension")
+    parser.add_argument("--clusters", type=int, default=100, help="Synthetic data clusters")
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists for the synthetic index (default: ANN_NLIST or ~4*sqrt(N))")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Top-k used for recall")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            run_benchmark(build_synthetic_index(tmp_dir + "/index", args.synthetic, args.dim, args.clusters, args.nlist), args.queries, args.k)
+    else:
+        local_index = LocalVectorIndex.load_or_build()
+        if local_index is None:
+            raise SystemExit("No local index. Ingest with STORAGE_TYPE=parquet or use --synthetic N.")
+        run_benchmark(local_index, args.queries, args.k)
@@ -11,17 +11,25 @@ Modes
   keyword heuristics so the script still produces useful smoke-check numbers
   even without labelled data.
 
+Backends
+--------
+* api (default): queries the running /search endpoint.
+* local: searches the parquet dataset in-process (LocalVectorIndex), no
+  API server or Qdrant needed.
+
 Usage
 -----
     PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/retrieval_eval.py
+    PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/retrieval_eval.py --local
     # or
     make eval
 """
 
+import sys
 import math
 import logging
 import requests
-from typing import Any, Dict, List, Sequence, Set, TypedDict
+from typing import Any, Callable, Dict, List, Sequence, Set, TypedDict
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("RetrievalEval")
@@ -129,8 +137,35 @@ def ndcg_at_k(results: List[Dict[str, Any]], item: BenchmarkItem, k: int) -> flo
 # Runner
 # =============================================================================
 
-def run_evaluation(top_k: int = EVAL_TOP_K, api_url: str = API_URL) -> Dict[str, float]:
-    logger.info(f"Retrieval Evaluation  →  {api_url}  (top_k={top_k})")
+def _api_search(api_url: str) -> Callable[[str, int], List[Dict[str, Any]]]:
+    def search(query: str, top_k: int) -> List[Dict[str, Any]]:
+        resp = requests.post(api_url, json={"query": query, "top_k": top_k}, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+    return search
+
+
+def _local_search() -> Callable[[str, int], List[Dict[str, Any]]]:
+    from src.embedding.embedder import as_dense_matrix, get_embedder
+    from src.storage.local_search import LocalVectorIndex
+
+    index = LocalVectorIndex.load_or_build()
+    if index is None:
+        raise RuntimeError("No parquet dataset to evaluate. Run the pipeline with STORAGE_TYPE=parquet first.")
+    embedder = get_embedder()
+
+    def search(query: str, top_k: int) -> List[Dict[str, Any]]:
+        return index.search(as_dense_matrix(embedder.embed_documents([query]))[0], top_k)
+    return search
+
+
+def run_evaluation(top_k: int = EVAL_TOP_K, api_url: str = API_URL, backend: str = "api") -> Dict[str, float]:
+    if backend == "local":
+        logger.info(f"Retrieval Evaluation  →  local parquet index  (top_k={top_k})")
+        search = _local_search()
+    else:
+        logger.info(f"Retrieval Evaluation  →  {api_url}  (top_k={top_k})")
+        search = _api_search(api_url)
     mode = "label" if any(b["expected_chunk_ids"] for b in BENCHMARK) else "keyword-heuristic"
     logger.info(f"Relevance mode: {mode}")
 
@@ -142,9 +177,7 @@ def run_evaluation(top_k: int = EVAL_TOP_K, api_url: str = API_URL) -> Dict[str,
     for item in BENCHMARK:
         query = item["query"]
         try:
-            resp = requests.post(api_url, json={"query": query, "top_k": top_k}, timeout=10)
-            resp.raise_for_status()
-            results: List[Dict[str, Any]] = resp.json()
+            results: List[Dict[str, Any]] = search(query, top_k)
         except Exception as exc:
             logger.warning(f"Query failed: '{query}'  →  {exc}")
             all_mrr.append(0.0)
@@ -190,4 +223,4 @@ def run_evaluation(top_k: int = EVAL_TOP_K, api_url: str = API_URL) -> Dict[str,
 
 
 if __name__ == "__main__":
-    run_evaluation()
+    run_evaluation(backend="local" if "--local" in sys.argv[1:] else "api")
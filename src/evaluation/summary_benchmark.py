@@ -0,0 +1,140 @@
+"""
+HyDE Summary Benchmark — extractive vs. abstractive engines
+============================================================
+Summarizes the same chunks with every HyDE engine (HYDE_ENGINE) and reports, per
+engine, summarization throughput (chunks/sec, cache disabled) and the retrieval
+quality of embedding the summaries on the retrieval_eval BENCHMARK queries
+(MRR, P@3, nDCG@3). Raw chunk text is included as a no-HyDE baseline.
+
+Chunks are ranked in memory by cosine similarity, so no vector store or API is
+needed; relevance is judged on the original chunk text, exactly as retrieval_eval
+does for the indexed data.
+
+Data
+----
+* Default: chunk texts of the persisted local index (LOCAL_INDEX_PATH, built from
+  the parquet dataset if needed), up to --limit.
+* --data-dir DIR: PDFs from DIR loaded and chunked with the configured strategy.
+
+The abstractive engine (HYDE_MODEL_NAME) is skipped when transformers is not
+installed.
+
+Usage
+-----
+    PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/summary_benchmark.py
+    PYTHONPATH=. rag_pipeline_env/bin/python src/evaluation/summary_benchmark.py --data-dir Data --limit 500
+    # or
+    make hyde-bench
+"""
+
+import argparse
+import importlib.util
+import logging
+import time
+from typing import Any, Dict, List, Sequence
+import numpy as np
+from src.config.settings import settings
+from src.embedding.embedder import as_dense_matrix, get_embedder
+from src.evaluation.retrieval_eval import BENCHMARK, EVAL_TOP_K, ndcg_at_k, precision_at_k, reciprocal_rank
+from src.ingestion.models import ProcessedChunk
+from src.processing.enricher import SummaryEnricher
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("SummaryBenchmark")
+
+ENGINES = ("tfidf", "textrank", "abstractive")
+
+
+def load_index_chunks(limit: int) -> List[ProcessedChunk]:
+    from src.storage.local_search import LocalVectorIndex
+
+    index = LocalVectorIndex.load_or_build()
+    if index is None:
+        raise SystemExit("No local index. Ingest with STORAGE_TYPE=parquet or use --data-dir.")
+    chunks = []
+    for row in range(min(limit, len(index))):
+        payload = index.payload(row)
+        chunks.append(ProcessedChunk(chunk_id=payload["chunk_id"], parent_doc_id="", content=payload["text"], chunk_index=row))
+    return chunks
+
+
+def load_directory_chunks(data_dir: str, limit: int) -> List[ProcessedChunk]:
+    from src.ingestion.multimodal_loader import MultimodalLoader
+    from src.processing.factory import StrategyFactory
+
+    chunker = StrategyFactory.get_strategy(settings.CHUNKING_STRATEGY)
+    chunks: List[ProcessedChunk] = []
+    for document in MultimodalLoader(data_dir).iter_documents():
+        chunks.extend(chunker.split([document]))
+        if len(chunks) >= limit:
+            break
+    return chunks[:limit]
+
+
+def _summaries(engine: str, chunks: Sequence[ProcessedChunk]) -> Dict[str, Any]:
+    """Summarizes copies of chunks with one engine; returns the elapsed seconds and the summaries."""
+    enricher = SummaryEnricher(use_enrichment=True, use_cache=False, engine=engine)
+    if not enricher.use_enrichment:
+        raise RuntimeError(f"HyDE engine '{engine}' could not be loaded")
+    copies = [chunk.model_copy() for chunk in chunks]
+    start = time.perf_counter()
+    enricher.enrich(copies)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "summaries": [chunk.summary or chunk.content for chunk in copies]}
+
+
+def _retrieval_quality(embedder, texts: List[str], chunks: Sequence[ProcessedChunk], k: int) -> Dict[str, float]:
+    """Ranks chunks by their embedded (summary) texts; relevance is judged on the chunk text."""
+    matrix = as_dense_matrix(embedder.embed_documents(texts))
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    queries = as_dense_matrix(embedder.embed_documents([item["query"] for item in BENCHMARK]))
+    queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    mrr, p3, ndcg = [], [], []
+    for item, scores in zip(BENCHMARK, queries @ matrix.T):
+        top = np.argsort(-scores, kind="stable")[:k]
+        results = [{"chunk_id": chunks[i].chunk_id, "text": chunks[i].content} for i in top]
+        mrr.append(reciprocal_rank(results, item))
+        p3.append(precision_at_k(results, item, k=3))
+        ndcg.append(ndcg_at_k(results, item, k=3))
+    return {"MRR": float(np.mean(mrr)), "P@3": float(np.mean(p3)), "nDCG@3": float(np.mean(ndcg))}
+
+
+def run_benchmark(chunks: Sequence[ProcessedChunk], engines: Sequence[str] = ENGINES, k: int = EVAL_TOP_K) -> List[Dict[str, Any]]:
+    if not chunks:
+        raise RuntimeError("No chunks to benchmark.")
+    embedder = get_embedder(use_cache=False)
+
+    report = [{"engine": "raw text", "chunks_per_sec": float("nan"), **_retrieval_quality(embedder, [c.content for c in chunks], chunks, k)}]
+    for engine in engines:
+        if engine == "abstractive" and importlib.util.find_spec("transformers") is None:
+            logger.warning("transformers not installed; skipping the abstractive engine.")
+            continue
+        logger.info(f"Summarizing {len(chunks)} chunks with the '{engine}' engine...")
+        result = _summaries(engine, chunks)
+        report.append({
+            "engine": engine,
+            "chunks_per_sec": len(chunks) / max(result["seconds"], 1e-9),
+            **_retrieval_quality(embedder, result["summaries"], chunks, k),
+        })
+
+    logger.info("=" * 60)
+    logger.info(f"HyDE ENGINES  ({len(chunks)} chunks, {len(BENCHMARK)} queries, embedder={embedder.model_id})")
+    logger.info(f"  {'engine':>12}  {'chunks/s':>10}  {'MRR':>6}  {'P@3':>6}  {'nDCG@3':>7}")
+    for row in report:
+        logger.info(f"  {row['engine']:>12}  {row['chunks_per_sec']:>10.1f}  {row['MRR']:>6.3f}  {row['P@3']:>6.3f}  {row['nDCG@3']:>7.3f}")
+    logger.info("=" * 60)
+    logger.info("TIP: set HYDE_ENGINE to the cheapest engine whose quality is close enough to the abstractive one.")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput and retrieval quality of the HyDE summary engines")
+    parser.add_argument("--data-dir", default=None, help="Chunk PDFs from this directory instead of reading the local index")
+    parser.add_argument("--limit", type=int, default=1000, help="Maximum number of chunks")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="Comma-separated engines to compare")
+    parser.add_argument("--k", type=int, default=EVAL_TOP_K, help="Results retrieved per query")
+    args = parser.parse_args()
+
+    benchmark_chunks = load_directory_chunks(args.data_dir, args.limit) if args.data_dir else load_index_chunks(args.limit)
+    run_benchmark(benchmark_chunks, [e.strip() for e in args.engines.split(",") if e.strip()], args.k)
@@ -0,0 +1,156 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(values: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def config_fingerprint() -> Dict[str, str]:
+    """
+    Fingerprints every setting that changes what a file turns into downstream.
+    A change to any component invalidates all manifest entries recorded under it.
+    """
+    return {
+        "extractor": _digest({
+            "ocr_min_page_chars": settings.OCR_MIN_PAGE_CHARS,
+            "ocr_dpi": settings.OCR_DPI,
+        }),
+        "chunker": _digest({
+            "strategy": settings.CHUNKING_STRATEGY,
+            "chunk_size": settings.CHUNK_SIZE,
+            "chunk_overlap": settings.CHUNK_OVERLAP,
+        }),
+        "embedder": _digest({
+            "type": settings.EMBEDDING_TYPE,
+            "model": settings.EMBEDDING_MODEL_NAME,
+            "dimension": settings.EMBEDDING_DIMENSION,
+        }),
+        "storage": _digest({
+            "type": settings.STORAGE_TYPE,
+            "collection": settings.QDRANT_COLLECTION_NAME,
+        }),
+    }
+
+
+def source_key(file_path: str) -> str:
+    """
+    Canonical spelling of a source file path ("./Data/x.pdf" and "Data//x.pdf" -> "Data/x.pdf").
+    Used for the loader's "source" metadata and for manifest keys alike, so files removed
+    from the manifest can be deleted from storage by their key.
+    """
+    return os.path.normpath(file_path)
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Persistent record of every file that made it all the way into storage.
+
+    Each entry stores the content hash, size, mtime and the config fingerprint it was
+    processed under. A file is skipped when its fingerprint matches and either its
+    size+mtime are unchanged (no I/O) or, if only the mtime moved, its content hash
+    still matches.
+    """
+    def __init__(self, path: str = settings.MANIFEST_PATH, fingerprint: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.fingerprint = fingerprint or config_fingerprint()
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        # Hashes computed while checking, reused when recording the same file
+        self._hash_cache: Dict[str, str] = {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f).get("files", {})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _key(file_path: str) -> str:
+        return source_key(file_path)
+
+    def _hash(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        key = f"{self._key(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        if key not in self._hash_cache:
+            self._hash_cache[key] = file_sha256(file_path)
+        return self._hash_cache[key]
+
+    def is_unchanged(self, file_path: str) -> bool:
+        entry = self.entries.get(self._key(file_path))
+        if not entry or entry.get("fingerprint") != self.fingerprint:
+            return False
+
+        stat = os.stat(file_path)
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+
+        # Touched but possibly not modified: fall back to the content hash
+        if self._hash(file_path) == entry["sha256"]:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True
+        return False
+
+    def filter_changed(self, files: Iterable[str]) -> List[str]:
+        """Returns only the files that are new, modified, or processed under a different config."""
+        files = list(files)
+        changed = [f for f in files if not self.is_unchanged(f)]
+        logger.info(f"Ingestion manifest: {len(changed)} new/modified file(s), {len(files) - len(changed)} unchanged.")
+        return changed
+
+    def is_known(self, file_path: str) -> bool:
+        return self._key(file_path) in self.entries
+
+    def missing(self, files: Iterable[str]) -> List[str]:
+        """Returns recorded files that are no longer present in `files`."""
+        present = {self._key(f) for f in files}
+        return [path for path in self.entries if path not in present]
+
+    def record(self, file_path: str) -> None:
+        """Marks a file as fully processed under the current config."""
+        stat = os.stat(file_path)
+        self.entries[self._key(file_path)] = {
+            "sha256": self._hash(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": self.fingerprint,
+            "ingested_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def forget(self, file_path: str) -> None:
+        self.entries.pop(self._key(file_path), None)
+
+    def reset(self) -> None:
+        """Drops every entry (used for full rebuilds)."""
+        self.entries = {}
+
+    def save(self) -> None:
+        """Atomically persists the manifest so a crash never leaves a half-written file."""
+        output_dir = os.path.dirname(self.path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Ingestion manifest saved with {len(self.entries)} file(s) to {self.path}.")
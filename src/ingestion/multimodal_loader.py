@@ -1,32 +1,36 @@
 import os
 import glob
-from typing import List
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Optional
 from pypdf import PdfReader
 import logging
 from src.ingestion.models import IngestedDocument
-from pdf2image import convert_from_path
-import pytesseract
+from src.ingestion.manifest import IngestionManifest, source_key
+from src.ingestion.ocr import PageOCREngine, init_ocr_worker
+from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 class MultimodalLoader:
-    def __init__(self, directory_path: str):
+    def __init__(
+        self,
+        directory_path: str,
+        workers: int = settings.INGESTION_WORKERS,
+        manifest: Optional[IngestionManifest] = None,
+    ):
         self.directory_path = directory_path
+        # Number of worker processes for load_documents (1 = serial, in-process)
+        self.workers = max(1, workers)
+        # When set, files already recorded as ingested (and unchanged) are skipped
+        self.manifest = manifest
+        self.ocr_engine = PageOCREngine()
 
-    def _extract_text_ocr(self, pdf_path: str) -> str:
-        """Runs the document through Tesseract OCR using images."""
-        logger.info(f"Initiating OCR for Scanned PDF/Image: {pdf_path}")
-        text_content = ""
-        try:
-            # Convert PDF pages to PIL images
-            images = convert_from_path(pdf_path)
-            for i, image in enumerate(images):
-                logger.info(f"Running OCR on page {i+1} of {len(images)}...")
-                page_text = pytesseract.image_to_string(image)
-                text_content += page_text + "\n"
-        except Exception as e:
-            logger.error(f"OCR Failed for {pdf_path}: {e}")
-        return text_content
+    def __getstate__(self):
+        # Worker processes only need the extraction config, never the manifest
+        state = self.__dict__.copy()
+        state["manifest"] = None
+        return state
 
     def load_single_document(self, file_path: str) -> IngestedDocument | None:
         """Processes a single PDF file (useful for streaming)."""
@@ -36,29 +40,42 @@ class MultimodalLoader:
             
         try:
             reader = PdfReader(file_path)
-            text_content = ""
-            
-            # Check for standard text
-            for page in reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text_content += extracted + "\n"
-            
-            source_type = "digital_pdf"
-            
-            # If text_content is extremely short but there are many pages, it's a scanned PDF
-            if len(text_content.strip()) < 50 and len(reader.pages) > 0:
+
+            # Check for standard text, page by page
+            page_texts = [page.extract_text() or "" for page in reader.pages]
+
+            # Only pages without a usable text layer are OCR'd, so mixed
+            # digital/scanned PDFs keep their digital pages as-is
+            ocr_pages = [
+                i + 1 for i, text in enumerate(page_texts)
+                if len(text.strip()) < settings.OCR_MIN_PAGE_CHARS
+            ]
+            if ocr_pages:
+                logger.warning(
+                    f"No textual content detected on {len(ocr_pages)}/{len(page_texts)} page(s) of {file_path}. "
+                    "Applying Image OCR fallback."
+                )
+                for page_number, text in self.ocr_engine.ocr_pages(file_path, ocr_pages).items():
+                    if text.strip():
+                        page_texts[page_number - 1] = text
+
+            if not ocr_pages:
+                source_type = "digital_pdf"
+            elif len(ocr_pages) == len(page_texts):
                 source_type = "scanned_pdf"
-                logger.warning(f"No textual content detected in {file_path}. Applying Image OCR fallback.")
-                text_content = self._extract_text_ocr(file_path)
+            else:
+                source_type = "mixed_pdf"
+
+            text_content = "".join(text + "\n" for text in page_texts if text)
             
             doc = IngestedDocument(
                 filename=os.path.basename(file_path),
                 content=text_content,
                 metadata={
-                    "source": file_path, 
+                    "source": source_key(file_path),
                     "total_pages": len(reader.pages),
-                    "source_type": source_type
+                    "source_type": source_type,
+                    "ocr_pages": len(ocr_pages)
                 }
             )
             logger.info(f"Successfully ingested [{source_type}]: {doc.filename} ({len(text_content)} chars).")
@@ -67,17 +84,78 @@ class MultimodalLoader:
             logger.error(f"Failed to load {file_path}: {str(e)}")
             return None
 
-    def load_documents(self) -> List[IngestedDocument]:
-        """Scans the directory for PDFs. Uses PyPDF initially, falling back to OCR if scanned."""
-        documents = []
+    def list_files(self) -> List[str]:
+        """Returns the PDF paths found in the configured directory, spelled as source keys."""
         pattern = os.path.join(self.directory_path, "*.pdf")
-        files = glob.glob(pattern)
-        
+        return sorted(source_key(path) for path in glob.glob(pattern))
+
+    def pending_files(self) -> List[str]:
+        """Returns the PDFs that still need ingesting (all of them without a manifest)."""
+        files = self.list_files()
+        if self.manifest is not None:
+            files = self.manifest.filter_changed(files)
+        return files
+
+    def iter_documents(self, files: Optional[List[str]] = None, executor: Optional[Executor] = None) -> Iterator[IngestedDocument]:
+        """
+        Yields documents as soon as they are ingested.
+        With workers > 1, files are farmed out to a process pool (pypdf and tesseract
+        are CPU-bound) and yielded in completion order. In-flight submissions are capped
+        so results never pile up faster than the caller consumes them. Long-running callers
+        pass their own executor so one pool serves every call.
+        """
+        if files is None:
+            files = self.pending_files()
+
         logger.info(f"Found {len(files)} local files to ingest in {self.directory_path}")
 
-        for file_path in files:
-            doc = self.load_single_document(file_path)
-            if doc:
-                documents.append(doc)
-        
-        return documents
+        if executor is None and (self.workers == 1 or len(files) <= 1):
+            for file_path in files:
+                doc = self.load_single_document(file_path)
+                if doc:
+                    yield doc
+            return
+
+        if executor is not None:
+            yield from self._iter_pooled(files, executor)
+            return
+
+        logger.info(f"Ingesting with {self.workers} worker processes.")
+        with ProcessPoolExecutor(
+            max_workers=self.workers, initializer=init_ocr_worker, initargs=(self.workers,)
+        ) as pool:
+            yield from self._iter_pooled(files, pool)
+
+    def _iter_pooled(self, files: List[str], executor: Executor) -> Iterator[IngestedDocument]:
+        max_in_flight = self.workers * 2
+        pending_files = iter(files)
+        in_flight = {}
+        for file_path in pending_files:
+            in_flight[executor.submit(self.load_single_document, file_path)] = file_path
+            if len(in_flight) >= max_in_flight:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = in_flight.pop(future)
+                try:
+                    doc = future.result()
+                except BrokenProcessPool:
+                    # Every other submission fails too; the pool's owner decides how to recover
+                    raise
+                except Exception as e:
+                    # A crashed worker must not take the rest of the batch down with it
+                    logger.error(f"Worker failed to load {file_path}: {e}")
+                    doc = None
+
+                next_file = next(pending_files, None)
+                if next_file is not None:
+                    in_flight[executor.submit(self.load_single_document, next_file)] = next_file
+
+                if doc:
+                    yield doc
+
+    def load_documents(self) -> List[IngestedDocument]:
+        """Scans the directory for PDFs. Uses PyPDF initially, falling back to OCR if scanned."""
+        return list(self.iter_documents())
@@ -0,0 +1,110 @@
+import os
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Processes of the pool this process runs in (set by init_ocr_worker); they share the cores
+_pool_processes = 1
+
+
+def init_ocr_worker(processes: int) -> None:
+    """
+    Process pool initializer for workers that may OCR. Caps Tesseract's own OpenMP threads,
+    which fight with page-level parallelism, and records the pool size so each worker's
+    default OCR concurrency is its share of the cores rather than all of them.
+    """
+    global _pool_processes
+    _pool_processes = max(1, processes)
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def default_ocr_workers() -> int:
+    """OCR_WORKERS when set, otherwise the cores available to this process's share of its pool."""
+    if settings.OCR_WORKERS > 0:
+        return settings.OCR_WORKERS
+    return max(1, (os.cpu_count() or 1) // _pool_processes)
+
+
+class PageOCREngine:
+    """
+    Page-level Tesseract OCR for scanned (or partially scanned) PDFs.
+
+    Pages are rasterized in bounded windows straight to a temporary directory, so at
+    most `window_size` page images exist at any time and none of them are held in RAM.
+    Tesseract runs as a separate process per page, so a thread pool is enough to keep
+    every core busy without paying for a process pool.
+
+    Without explicit workers the concurrency is resolved where OCR actually runs (see
+    default_ocr_workers), so an engine pickled into a pool worker does not reuse the
+    parent's core count.
+    """
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        window_size: int = settings.OCR_WINDOW_SIZE,
+        dpi: int = settings.OCR_DPI,
+    ):
+        self._workers = None if workers is None else max(1, workers)
+        self.window_size = max(1, window_size)
+        self.dpi = dpi
+
+    @property
+    def workers(self) -> int:
+        return self._workers or default_ocr_workers()
+
+    def _windows(self, page_numbers: List[int]) -> List[List[int]]:
+        """Groups sorted page numbers into contiguous runs of at most window_size pages."""
+        windows: List[List[int]] = []
+        for page in sorted(set(page_numbers)):
+            if windows and page == windows[-1][-1] + 1 and len(windows[-1]) < self.window_size:
+                windows[-1].append(page)
+            else:
+                windows.append([page])
+        return windows
+
+    def _ocr_window(self, pdf_path: str, window: List[int]) -> Dict[int, str]:
+        from pdf2image import convert_from_path
+        import pytesseract
+
+        with tempfile.TemporaryDirectory(prefix="ocr_") as tmp_dir:
+            image_paths = convert_from_path(
+                pdf_path,
+                dpi=self.dpi,
+                first_page=window[0],
+                last_page=window[-1],
+                output_folder=tmp_dir,
+                paths_only=True,
+                fmt="png",
+                thread_count=min(self.workers, len(window)),
+            )
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                texts = list(executor.map(pytesseract.image_to_string, image_paths))
+
+        return dict(zip(window, texts))
+
+    def ocr_pages(self, pdf_path: str, page_numbers: Optional[List[int]] = None) -> Dict[int, str]:
+        """
+        Runs OCR on the given 1-based page numbers (all pages if None).
+        Returns a mapping of page number -> recognised text. Failed windows are logged
+        and left out of the result so the caller can keep whatever text it already has.
+        """
+        if page_numbers is None:
+            from pdf2image import pdfinfo_from_path
+            page_numbers = list(range(1, pdfinfo_from_path(pdf_path)["Pages"] + 1))
+
+        if not page_numbers:
+            return {}
+
+        logger.info(f"Initiating OCR for {len(page_numbers)} page(s) of {pdf_path} with {self.workers} worker(s).")
+        results: Dict[int, str] = {}
+        for window in self._windows(page_numbers):
+            try:
+                results.update(self._ocr_window(pdf_path, window))
+                logger.info(f"OCR completed for pages {window[0]}-{window[-1]} of {pdf_path}.")
+            except Exception as e:
+                logger.error(f"OCR Failed for pages {window[0]}-{window[-1]} of {pdf_path}: {e}")
+        return results
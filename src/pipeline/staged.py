@@ -0,0 +1,243 @@
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+from src.config.settings import settings
+from src.ingestion.models import IngestedDocument, ProcessedChunk
+from src.processing.factory import StrategyFactory
+from src.processing.strategies.base import ChunkingStrategy
+from src.embedding.embedder import Embeddings, get_embedder
+from src.storage.manager import get_storage_manager
+from src.pipeline.streaming import document_source, prepare_run, rebatch
+
+logger = logging.getLogger(__name__)
+
+# A stage transform consumes the upstream item stream and produces its own stream
+Transform = Callable[[Iterator[Any]], Iterable[Any]]
+
+_END = object()
+
+
+class _Cancelled(Exception):
+    """Raised inside a stage thread when another stage has failed."""
+
+
+@dataclass
+class StageStats:
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    # Starved: waiting for the upstream stage to produce
+    input_wait_seconds: float = 0.0
+    # Throttled: waiting for room in the downstream queue (backpressure)
+    output_wait_seconds: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        total = self.busy_seconds + self.input_wait_seconds + self.output_wait_seconds
+        return self.busy_seconds / total if total else 0.0
+
+
+@dataclass
+class Stage:
+    name: str
+    transform: Transform
+
+
+def process_map(fn: Callable[[Any], Any], workers: int) -> Transform:
+    """
+    Builds a transform that runs `fn` on each item in a process pool, for CPU-bound
+    stages. Output order matches input order and at most 2 x workers items are in flight.
+    """
+    def transform(items: Iterator[Any]) -> Iterator[Any]:
+        in_flight: Deque[Any] = deque()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for item in items:
+                in_flight.append(executor.submit(fn, item))
+                if len(in_flight) >= workers * 2:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+    return transform
+
+
+class StagedExecutor:
+    """
+    Runs pipeline stages concurrently, one thread per stage, connected by bounded queues.
+
+    A full queue blocks the producing stage, so the slowest stage throttles everything
+    upstream of it. Each stage records how long it was busy, starved and throttled; the
+    stage with the most busy time is the bottleneck.
+    """
+    def __init__(self, source: Iterable[Any], stages: List[Stage], queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+                 source_name: str = "ingest"):
+        self.stages = [Stage(source_name, lambda _: source)] + list(stages)
+        self.queues: List["queue.Queue[Any]"] = [queue.Queue(maxsize=queue_size) for _ in self.stages[:-1]]
+        self.stats = [StageStats(stage.name) for stage in self.stages]
+        self._stop = threading.Event()
+        self._errors: List[Tuple[str, BaseException]] = []
+
+    def _get(self, q: "queue.Queue[Any]") -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled()
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def _put(self, q: "queue.Queue[Any]", item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _Cancelled()
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _inputs(self, q: "queue.Queue[Any]", stats: StageStats) -> Iterator[Any]:
+        while True:
+            started = time.perf_counter()
+            item = self._get(q)
+            stats.input_wait_seconds += time.perf_counter() - started
+            if item is _END:
+                return
+            stats.items_in += 1
+            yield item
+
+    def _run_stage(self, index: int) -> None:
+        stage, stats = self.stages[index], self.stats[index]
+        in_q: Optional["queue.Queue[Any]"] = self.queues[index - 1] if index > 0 else None
+        out_q: Optional["queue.Queue[Any]"] = self.queues[index] if index < len(self.queues) else None
+        inputs: Iterator[Any] = self._inputs(in_q, stats) if in_q is not None else iter(())
+
+        started = time.perf_counter()
+        try:
+            for item in stage.transform(inputs):
+                stats.items_out += 1
+                if out_q is not None:
+                    put_started = time.perf_counter()
+                    self._put(out_q, item)
+                    stats.output_wait_seconds += time.perf_counter() - put_started
+            if out_q is not None:
+                self._put(out_q, _END)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            logger.error(f"Stage '{stage.name}' failed: {e}")
+            self._errors.append((stage.name, e))
+            self._stop.set()
+        finally:
+            elapsed = time.perf_counter() - started
+            stats.busy_seconds = max(0.0, elapsed - stats.input_wait_seconds - stats.output_wait_seconds)
+
+    def run(self) -> List[StageStats]:
+        threads = [
+            threading.Thread(target=self._run_stage, args=(i,), name=f"stage-{stage.name}", daemon=True)
+            for i, stage in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.log_report()
+        if self._errors:
+            name, error = self._errors[0]
+            raise RuntimeError(f"Pipeline stage '{name}' failed: {error}") from error
+        return self.stats
+
+    def log_report(self) -> None:
+        logger.info("=" * 86)
+        logger.info(f"{'stage':<10} {'in':>8} {'out':>8} {'busy(s)':>10} {'starved(s)':>11} {'throttled(s)':>13} {'util':>7}")
+        for s in self.stats:
+            logger.info(
+                f"{s.name:<10} {s.items_in:>8} {s.items_out:>8} {s.busy_seconds:>10.2f} "
+                f"{s.input_wait_seconds:>11.2f} {s.output_wait_seconds:>13.2f} {s.utilization:>7.1%}"
+            )
+        bottleneck = max(self.stats, key=lambda s: s.busy_seconds)
+        logger.info(f"Bottleneck stage: '{bottleneck.name}' ({bottleneck.busy_seconds:.2f}s busy)")
+        logger.info("=" * 86)
+
+
+def _chunk_document(chunker: ChunkingStrategy, doc: IngestedDocument) -> Tuple[str, List[ProcessedChunk]]:
+    """Module-level so it can run inside chunking worker processes."""
+    return document_source(doc), chunker.split([doc])
+
+
+def run_staged_pipeline(
+    workers: int = settings.INGESTION_WORKERS,
+    full_rebuild: bool = False,
+    batch_size: int = settings.PIPELINE_BATCH_SIZE,
+    chunk_workers: int = settings.CHUNKING_WORKERS,
+    queue_size: int = settings.PIPELINE_QUEUE_SIZE,
+) -> List[StageStats]:
+    """
+    Overlapped variant of the streaming pipeline: ingestion, chunking, embedding and
+    storage run concurrently, so the model encodes while Qdrant upserts and vice versa.
+    Ingestion and (optionally) chunking fan out to processes; embedding and storage run
+    in threads (model inference and network I/O release the GIL).
+    """
+    start_time = time.time()
+    logger.info(f"Starting Staged Ingestion Pipeline (batch size {batch_size}, queue size {queue_size})...")
+
+    storage = get_storage_manager(settings.STORAGE_TYPE)
+    loader, manifest, files = prepare_run(storage, workers, full_rebuild)
+    if not files:
+        return []
+
+    chunker = StrategyFactory.get_strategy(settings.CHUNKING_STRATEGY)
+    embedder = get_embedder(settings.EMBEDDING_TYPE)
+
+    def chunk(documents: Iterator[IngestedDocument]) -> Iterator[Any]:
+        chunk_fn = partial(_chunk_document, chunker)
+        if chunk_workers > 1:
+            chunked = process_map(chunk_fn, chunk_workers)(documents)
+        else:
+            chunked = (chunk_fn(doc) for doc in documents)
+        yield from rebatch(chunked, batch_size)
+
+    def embed(batches: Iterator[Any]) -> Iterator[Any]:
+        for chunks, completed_sources in batches:
+            # Batches that only complete sources carry no chunks to embed
+            embeddings: Optional[Embeddings] = embedder.embed_documents([c.content for c in chunks]) if chunks else None
+            yield chunks, embeddings, completed_sources
+
+    # Completed sources of storage that only publishes on close, recorded once it has
+    uncommitted: List[str] = []
+
+    def store(batches: Iterator[Any]) -> Iterator[int]:
+        for chunks, embeddings, completed_sources in batches:
+            if chunks:
+                storage.append(chunks, embeddings)
+            # A file is only recorded once every one of its chunks is durable
+            if storage.commits_on_close:
+                uncommitted.extend(completed_sources)
+            else:
+                for source in completed_sources:
+                    manifest.record(source)
+            yield len(chunks)
+
+    executor = StagedExecutor(
+        loader.iter_documents(files),
+        [Stage("chunk", chunk), Stage("embed", embed), Stage("store", store)],
+        queue_size=queue_size,
+    )
+    try:
+        with storage:
+            stats = executor.run()
+        for source in uncommitted:
+            manifest.record(source)
+    finally:
+        manifest.save()
+
+    duration = time.time() - start_time
+    logger.info(f"Staged pipeline processed {len(files)} file(s) in {duration:.2f} seconds.")
+    return stats
@@ -0,0 +1,165 @@
+import time
+import logging
+from collections import deque
+from typing import Deque, Iterable, Iterator, List, Tuple
+from src.config.settings import settings
+from src.ingestion.models import IngestedDocument, ProcessedChunk
+from src.ingestion.manifest import IngestionManifest
+from src.ingestion.multimodal_loader import MultimodalLoader
+from src.processing.factory import StrategyFactory
+from src.processing.strategies.base import ChunkingStrategy
+from src.embedding.embedder import BaseEmbedder, get_embedder
+from src.storage.manager import BaseStorageManager, get_storage_manager
+
+logger = logging.getLogger(__name__)
+
+
+def rebatch(
+    chunked_documents: Iterable[Tuple[str, List[ProcessedChunk]]],
+    batch_size: int = settings.PIPELINE_BATCH_SIZE,
+) -> Iterator[Tuple[List[ProcessedChunk], List[str]]]:
+    """
+    Regroups per-document chunk lists, given as (source, chunks), into fixed-size batches.
+
+    Each batch comes with the sources whose *last* chunk is part of it (or an earlier
+    batch), i.e. the files that are completely written once this batch is stored.
+    Only one document's chunks plus one batch are ever held in memory.
+    """
+    buffer: List[ProcessedChunk] = []
+    # (source, sequence number of the source's last chunk)
+    pending_sources: Deque[Tuple[str, int]] = deque()
+    emitted = 0
+    flushed = 0
+
+    def completed() -> List[str]:
+        done = []
+        while pending_sources and pending_sources[0][1] <= flushed:
+            done.append(pending_sources.popleft()[0])
+        return done
+
+    for source, chunks in chunked_documents:
+        buffer.extend(chunks)
+        emitted += len(chunks)
+        pending_sources.append((source, emitted))
+
+        while len(buffer) >= batch_size:
+            batch, buffer = buffer[:batch_size], buffer[batch_size:]
+            flushed += len(batch)
+            yield batch, completed()
+
+    if buffer or pending_sources:
+        flushed += len(buffer)
+        yield buffer, completed()
+
+
+def document_source(doc: IngestedDocument) -> str:
+    return doc.metadata.get("source", doc.filename)
+
+
+def iter_chunk_batches(
+    documents: Iterable[IngestedDocument],
+    chunker: ChunkingStrategy,
+    batch_size: int = settings.PIPELINE_BATCH_SIZE,
+) -> Iterator[Tuple[List[ProcessedChunk], List[str]]]:
+    """Chunks documents lazily and yields fixed-size micro-batches of chunks (see rebatch)."""
+    return rebatch(((document_source(doc), chunker.split([doc])) for doc in documents), batch_size)
+
+
+def stream_to_storage(
+    documents: Iterable[IngestedDocument],
+    chunker: ChunkingStrategy,
+    embedder: BaseEmbedder,
+    storage: BaseStorageManager,
+    manifest: IngestionManifest,
+    batch_size: int = settings.PIPELINE_BATCH_SIZE,
+) -> int:
+    """
+    Chunks, embeds and writes documents batch by batch. Returns the number of chunks stored.
+
+    A file is only recorded in the manifest once every one of its chunks is durable: right
+    after its last batch is appended, or, for storage that publishes on close (parquet),
+    only after the session has committed. A failed session records nothing it aborted.
+    """
+    total_chunks = 0
+    # Completed sources waiting for the session to commit
+    uncommitted: List[str] = []
+    with storage:
+        for batch_number, (chunks, completed_sources) in enumerate(iter_chunk_batches(documents, chunker, batch_size), 1):
+            if chunks:
+                embeddings = embedder.embed_documents([c.content for c in chunks])
+                storage.append(chunks, embeddings)
+                total_chunks += len(chunks)
+                logger.info(f"Batch {batch_number}: stored {len(chunks)} chunks ({total_chunks} total).")
+
+            if storage.commits_on_close:
+                uncommitted.extend(completed_sources)
+            else:
+                for source in completed_sources:
+                    manifest.record(source)
+    for source in uncommitted:
+        manifest.record(source)
+    return total_chunks
+
+
+def prepare_run(
+    storage: BaseStorageManager,
+    workers: int = settings.INGESTION_WORKERS,
+    full_rebuild: bool = False,
+) -> Tuple[MultimodalLoader, IngestionManifest, List[str]]:
+    """
+    Plans an (incremental) run: drops deleted files from storage, works out which files
+    need ingesting and clears their stale chunks. Returns the loader, manifest and files.
+    """
+    manifest = IngestionManifest()
+    loader = MultimodalLoader(settings.DATA_DIR, workers=workers, manifest=None if full_rebuild else manifest)
+
+    removed = manifest.missing(loader.list_files())
+    if removed:
+        logger.info(f"Removing {len(removed)} deleted file(s) from storage.")
+        storage.delete_sources(removed)
+        for path in removed:
+            manifest.forget(path)
+
+    if full_rebuild:
+        manifest.reset()
+
+    files = loader.pending_files()
+    if not files:
+        manifest.save()
+        logger.info("No new or modified documents. Nothing to do.")
+        return loader, manifest, files
+
+    # Replace chunks from earlier versions of the files about to be re-ingested
+    storage.delete_sources(files)
+    return loader, manifest, files
+
+
+def run_streaming_pipeline(
+    workers: int = settings.INGESTION_WORKERS,
+    full_rebuild: bool = False,
+    batch_size: int = settings.PIPELINE_BATCH_SIZE,
+):
+    """
+    Memory-bounded variant of main.run_pipeline: documents are loaded lazily and
+    chunked, embedded and stored in micro-batches of `batch_size` chunks, so peak
+    memory does not grow with corpus size.
+    """
+    start_time = time.time()
+    logger.info(f"Starting Streaming Ingestion Pipeline (batch size {batch_size})...")
+
+    storage = get_storage_manager(settings.STORAGE_TYPE)
+    loader, manifest, files = prepare_run(storage, workers, full_rebuild)
+    if not files:
+        return
+
+    chunker = StrategyFactory.get_strategy(settings.CHUNKING_STRATEGY)
+    embedder = get_embedder(settings.EMBEDDING_TYPE)
+
+    try:
+        total_chunks = stream_to_storage(loader.iter_documents(files), chunker, embedder, storage, manifest, batch_size)
+    finally:
+        # Whatever was durably stored before a failure is kept as ingested
+        manifest.save()
+
+    duration = time.time() - start_time
+    logger.info(f"Streaming pipeline stored {total_chunks} chunks from {len(files)} file(s) in {duration:.2f} seconds.")
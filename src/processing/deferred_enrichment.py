@@ -0,0 +1,163 @@
+import logging
+import argparse
+import threading
+from typing import Dict, List, Optional
+from src.config.settings import settings
+from src.ingestion.models import ProcessedChunk
+from src.embedding.embedder import BaseEmbedder, get_embedder
+from src.storage.manager import BaseStorageManager, get_storage_manager
+from src.processing.enricher import SummaryEnricher
+
+logger = logging.getLogger(__name__)
+
+
+def mark_pending(chunks: List[ProcessedChunk]) -> List[ProcessedChunk]:
+    """Flags chunks stored on their raw content as still waiting for a HyDE summary."""
+    for chunk in chunks:
+        chunk.metadata["has_summary"] = False
+        chunk.metadata["summary_pending"] = True
+    return chunks
+
+
+class DeferredEnricher:
+    """
+    Second phase of deferred HyDE: chunks were stored embedded on their raw content (and are
+    searchable right away) with summary_pending set. This worker picks them up in batches,
+    summarizes them, re-embeds the summaries and updates the stored points in place.
+    has_summary turns True once a chunk's summary vector is stored; chunks whose
+    summarization failed keep their raw vector and are not retried.
+
+    A pass that raises (embedder or storage errors) leaves its chunks pending; the next pass
+    waits with exponential backoff. A chunk taken max_attempts times without being updated
+    is given up on: it keeps its raw vector and is no longer pending.
+    """
+    def __init__(
+        self,
+        storage: BaseStorageManager,
+        embedder: BaseEmbedder,
+        enricher: SummaryEnricher,
+        batch_size: int = settings.HYDE_DEFERRED_BATCH_SIZE,
+        poll_seconds: float = settings.HYDE_DEFERRED_POLL_SECONDS,
+        max_attempts: int = settings.HYDE_DEFERRED_MAX_ATTEMPTS,
+        max_backoff_seconds: float = settings.HYDE_DEFERRED_MAX_BACKOFF_SECONDS,
+    ):
+        if not storage.supports_updates:
+            raise ValueError(f"Deferred HyDE needs a storage backend with in-place updates, not {type(storage).__name__}")
+        if not enricher.use_enrichment:
+            # Otherwise every pending chunk would be marked as failed
+            raise ValueError("Deferred HyDE needs a loaded summarizer")
+        self.storage = storage
+        self.embedder = embedder
+        self.enricher = enricher
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.max_backoff_seconds = max_backoff_seconds
+        self.enriched = 0
+        self.given_up = 0
+        # chunk_id -> passes that took the chunk without updating it
+        self._attempts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _give_up(self, chunks: List[ProcessedChunk]) -> None:
+        logger.warning(
+            f"Deferred HyDE: giving up on {len(chunks)} chunk(s) after {self.max_attempts} failed attempt(s); "
+            f"they keep their raw vectors."
+        )
+        for chunk in chunks:
+            chunk.metadata["summary_pending"] = False
+            chunk.metadata["has_summary"] = False
+            self._attempts.pop(chunk.chunk_id, None)
+        self.storage.update_metadata(chunks)
+        self.given_up += len(chunks)
+
+    def run_once(self) -> int:
+        """Enriches one batch of pending chunks. Returns how many were taken (0 = nothing pending)."""
+        chunks = self.storage.pending_enrichment(self.batch_size)
+        if not chunks:
+            return 0
+
+        exhausted = [c for c in chunks if self._attempts.get(c.chunk_id, 0) >= self.max_attempts]
+        if exhausted:
+            self._give_up(exhausted)
+            given_up = {c.chunk_id for c in exhausted}
+            chunks = [c for c in chunks if c.chunk_id not in given_up]
+            if not chunks:
+                return len(exhausted)
+        for chunk in chunks:
+            self._attempts[chunk.chunk_id] = self._attempts.get(chunk.chunk_id, 0) + 1
+
+        self.enricher.enrich(chunks)
+        for chunk in chunks:
+            chunk.metadata["summary_pending"] = False
+        done = [c for c in chunks if c.metadata.get("has_summary")]
+        failed = [c for c in chunks if not c.metadata.get("has_summary")]
+
+        # Chunks whose point is gone (deleted by a re-ingest) are skipped by the storage
+        not_updated: List[ProcessedChunk] = []
+        if done:
+            # has_summary implies a summary; the content fallback never applies in practice
+            embeddings = self.embedder.embed_documents([c.summary or c.content for c in done])
+            not_updated = self.storage.update_embeddings(done, embeddings)
+        if failed:
+            not_updated = not_updated + self.storage.update_metadata(failed)
+        skipped = {c.chunk_id for c in not_updated}
+        for chunk in chunks:
+            if chunk.chunk_id not in skipped:
+                self._attempts.pop(chunk.chunk_id, None)
+
+        enriched = len([c for c in done if c.chunk_id not in skipped])
+        self.enriched += enriched
+        logger.info(
+            f"Deferred HyDE: enriched {enriched} chunk(s), {len(failed)} failed, "
+            f"{len(skipped)} not updated ({self.enriched} total)."
+        )
+        return len(chunks) + len(exhausted)
+
+    def run(self) -> None:
+        """Drains pending chunks, then polls every poll_seconds until stop() is called."""
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                taken = self.run_once()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                backoff = min(self.poll_seconds * 2 ** min(failures, 16), self.max_backoff_seconds)
+                logger.error(f"Deferred HyDE pass failed ({failures} in a row), retrying in {backoff:.1f}s: {e}")
+                self._stop.wait(backoff)
+                continue
+            if not taken:
+                self._stop.wait(self.poll_seconds)
+
+    def start(self) -> "DeferredEnricher":
+        """Runs the worker in a background thread of the current process."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="deferred-hyde", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Background HyDE enrichment of chunks stored with --defer-hyde")
+    parser.add_argument("--batch-size", type=int, default=settings.HYDE_DEFERRED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    worker = DeferredEnricher(
+        get_storage_manager(settings.STORAGE_TYPE),
+        get_embedder(settings.EMBEDDING_TYPE),
+        SummaryEnricher(use_enrichment=True),
+        batch_size=args.batch_size,
+    )
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info("Stopping deferred HyDE worker.")
@@ -1,23 +1,61 @@
 import logging
-from typing import List
+from typing import Any, Callable, Dict, List, Optional
+from src.config.settings import settings
 from src.ingestion.models import ProcessedChunk
+from src.embedding.cache import SQLiteCache, text_hash
+from src.processing.extractive import ExtractiveSummarizer
 
 logger = logging.getLogger(__name__)
 
+# Generation settings; part of the cache key, so changing them invalidates cached summaries
+SUMMARY_MAX_LENGTH = 60
+SUMMARY_MIN_LENGTH = 10
+
 class SummaryEnricher:
     """
     Implements Hypothetical Document Embeddings (HyDE) by enriching each chunk 
     with an LLM-generated summary. This summary is embedded instead of the raw text
     to improve retrieval accuracy.
+
+    Texts are summarized in length-sorted batches of batch_size (similar lengths waste
+    little padding), and summaries are cached on disk by (model, text hash), so unchanged
+    chunks are not summarized again on re-ingest.
+
+    engine selects the summarizer: "abstractive" runs the HuggingFace model_name, while
+    "textrank" / "tfidf" pick the chunk's own most central sentences (see ExtractiveSummarizer),
+    which costs milliseconds per batch on CPU and needs no model.
     """
-    def __init__(self, use_enrichment: bool = False):
+    def __init__(
+        self,
+        use_enrichment: bool = False,
+        model_name: str = settings.HYDE_MODEL_NAME,
+        batch_size: int = settings.HYDE_BATCH_SIZE,
+        min_chars: int = settings.HYDE_MIN_CHARS,
+        max_input_chars: int = settings.HYDE_MAX_INPUT_CHARS,
+        use_cache: bool = settings.HYDE_CACHE_ENABLED,
+        cache_path: str = settings.HYDE_CACHE_PATH,
+        engine: str = settings.HYDE_ENGINE,
+        extractive_sentences: int = settings.HYDE_EXTRACTIVE_SENTENCES,
+    ):
         self.use_enrichment = use_enrichment
-        self.summarizer = None
-        if self.use_enrichment:
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.min_chars = min_chars
+        self.max_input_chars = max_input_chars
+        self.summarizer: Optional[Callable[..., Any]] = None
+        self.extractive: Optional[ExtractiveSummarizer] = None
+        self.cache: Optional[SQLiteCache] = None
+        self.stats = {"cached": 0, "summarized": 0, "short": 0, "failed": 0}
+        if self.use_enrichment and engine != "abstractive":
+            self.extractive = ExtractiveSummarizer(engine, extractive_sentences)
+            # Keeps cached extractive summaries apart from the model's
+            self.model_name = self.extractive.model_id
+            logger.info(f"Using extractive HyDE summaries ({self.model_name}).")
+        elif self.use_enrichment:
             try:
                 from transformers import pipeline
-                logger.info("Loading lightweight HuggingFace summarizer (distilbart-cnn)...")
-                self.summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
+                logger.info(f"Loading lightweight HuggingFace summarizer ({model_name})...")
+                self.summarizer = pipeline("summarization", model=model_name)
                 logger.info("Summarizer loaded successfully.")
             except ImportError:
                 logger.error("transformers not installed. pip install transformers torch")
@@ -25,32 +63,92 @@ class SummaryEnricher:
             except Exception as e:
                 logger.error(f"Failed to load summarizer: {e}")
                 self.use_enrichment = False
+        if self.use_enrichment and use_cache:
+            self.cache = SQLiteCache(cache_path, settings.HYDE_CACHE_MAX_ITEMS)
+
+    def _key(self, text: str) -> str:
+        return f"{self.model_name}:{SUMMARY_MAX_LENGTH}:{SUMMARY_MIN_LENGTH}:{text_hash(text)}"
+
+    def _summarize(self, texts: List[str]) -> List[Optional[str]]:
+        """Summaries for texts (None where summarization failed), one model call per batch."""
+        if self.extractive is not None:
+            return list(self.extractive.summarize(texts))
+        summarizer = self.summarizer
+        assert summarizer is not None, "abstractive engine used without a loaded summarizer"
+        summaries: List[Optional[str]] = [None] * len(texts)
+        # Longest first: each batch holds texts of similar length
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            inputs = [texts[i] for i in batch]
+            try:
+                results = summarizer(
+                    inputs, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH,
+                    do_sample=False, truncation=True, batch_size=len(inputs),
+                )
+                for i, res in zip(batch, results):
+                    summaries[i] = res['summary_text'].strip()
+            except Exception as e:
+                # Isolate the text that breaks the batch instead of losing all of them
+                logger.warning(f"Batched summarization of {len(inputs)} texts failed ({e}); retrying one by one.")
+                for i in batch:
+                    try:
+                        res = summarizer(
+                            texts[i], max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH,
+                            do_sample=False, truncation=True,
+                        )
+                        summaries[i] = res[0]['summary_text'].strip()
+                    except Exception as text_error:
+                        logger.warning(f"Summarization failed, skipping: {text_error}")
+        return summaries
 
     def enrich(self, chunks: List[ProcessedChunk]) -> List[ProcessedChunk]:
-        if not self.use_enrichment or not self.summarizer:
+        if not self.use_enrichment or not (self.summarizer or self.extractive):
             return chunks
         
         logger.info(f"Enriching {len(chunks)} chunks with HyDE summaries...")
-        
-        for i, chunk in enumerate(chunks):
-            text = chunk.content
-            # Truncate text to avoid model max length errors
-            truncated_text = text[:1024] 
-            
-            try:
-                # If text is too short, summarizer might fail
-                if len(truncated_text) > 100:
-                    res = self.summarizer(truncated_text, max_length=60, min_length=10, do_sample=False)
-                    summary_text = res[0]['summary_text'].strip()
-                else:
-                    summary_text = truncated_text
-                
-                chunk.summary = summary_text
+
+        # Truncate text to avoid model max length errors
+        truncated = [chunk.content[:self.max_input_chars] for chunk in chunks]
+        # If text is too short, summarizer might fail: it is its own summary
+        long_texts = {text for text in truncated if len(text) > self.min_chars}
+        short = sum(text not in long_texts for text in truncated)
+
+        found: Dict[str, str] = {}
+        if self.cache is not None and long_texts:
+            keys = {text: self._key(text) for text in long_texts}
+            cached = self.cache.get_many(list(keys.values()))
+            found = {text: cached[key] for text, key in keys.items() if key in cached}
+        from_cache = len(found)
+
+        # Identical chunks are summarized once
+        missing = [text for text in long_texts if text not in found]
+        new: Dict[str, str] = {}
+        if missing:
+            new = {text: summary for text, summary in zip(missing, self._summarize(missing)) if summary is not None}
+            if self.cache is not None and new:
+                self.cache.put_many((self._key(text), summary) for text, summary in new.items())
+            found.update(new)
+
+        self.stats["short"] += short
+        self.stats["cached"] += from_cache
+        self.stats["summarized"] += len(new)
+        self.stats["failed"] += len(missing) - len(new)
+
+        for chunk, text in zip(chunks, truncated):
+            if text not in long_texts:
+                chunk.summary = text
                 chunk.metadata["has_summary"] = True
-            except Exception as e:
-                logger.warning(f"Summarization failed for chunk {chunk.chunk_id}, skipping: {e}")
-                chunk.summary = truncated_text
+            elif text in found:
+                chunk.summary = found[text]
+                chunk.metadata["has_summary"] = True
+            else:
+                logger.warning(f"Summarization failed for chunk {chunk.chunk_id}, skipping.")
+                chunk.summary = text
                 chunk.metadata["has_summary"] = False
-                
-        logger.info("HyDE enrichment completed.")
+
+        logger.info(
+            f"HyDE enrichment completed: {len(new)} unique texts summarized, {from_cache} from cache, "
+            f"{short} short chunks kept as-is."
+        )
         return chunks
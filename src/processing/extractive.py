@@ -0,0 +1,134 @@
+import re
+import logging
+from typing import Dict, List, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+TOKEN = re.compile(r"[a-z0-9]{2,}")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers him
+his how i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out
+over own same she should so some such than that the their theirs them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your yours
+""".split())
+
+
+class ExtractiveSummarizer:
+    """
+    CPU-cheap HyDE summaries: each text's own highest-scoring sentences, in their original
+    order. All texts of a call are scored together with sparse matrix operations.
+
+    - "tfidf": cosine similarity between a sentence's TF-IDF vector and the TF-IDF
+      centroid of its text (IDF computed over the sentences of the same text), so the
+      sentences closest to what the whole chunk is about win.
+    - "textrank": PageRank over the cosine-similarity graph of a text's sentences
+      (TF-IDF vectors), run for all texts at once on a block-diagonal matrix.
+    """
+    def __init__(self, method: str = "textrank", sentences: int = 2, damping: float = 0.85, iterations: int = 30):
+        if method not in ("tfidf", "textrank"):
+            raise ValueError(f"Unknown extractive method: {method}")
+        self.method = method
+        self.sentences = sentences
+        self.damping = damping
+        self.iterations = iterations
+
+    @property
+    def model_id(self) -> str:
+        return f"extractive-{self.method}-{self.sentences}"
+
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        return [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()]
+
+    def _term_matrix(self, sentences: List[str]):
+        """(sentences x vocabulary) sparse term counts."""
+        from scipy import sparse
+
+        vocabulary: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for row, sentence in enumerate(sentences):
+            for token in TOKEN.findall(sentence.lower()):
+                if token not in STOP_WORDS:
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(token, len(vocabulary)))
+        data = np.ones(len(rows), dtype=np.float32)
+        counts = sparse.csr_matrix((data, (rows, cols)), shape=(len(sentences), max(1, len(vocabulary))))
+        counts.sum_duplicates()
+        return counts
+
+    @staticmethod
+    def _normalize_rows(matrix):
+        from scipy import sparse
+
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        return (sparse.diags(1.0 / np.maximum(norms, 1e-12)) @ matrix).tocsr()
+
+    def _scores(self, sentences: List[str], owner: np.ndarray, n_texts: int) -> np.ndarray:
+        from scipy import sparse
+
+        counts = self._term_matrix(sentences)
+        # owner_matrix[t, s] = 1 when sentence s belongs to text t
+        owner_matrix = sparse.csr_matrix(
+            (np.ones(len(owner), dtype=np.float32), (owner, np.arange(len(owner)))), shape=(n_texts, len(owner))
+        )
+        sentences_per_text = np.asarray(owner_matrix.sum(axis=1), dtype=np.float32).ravel()
+
+        # Per-text document frequency of every term, then smoothed IDF gathered back per sentence
+        presence = counts.copy()
+        presence.data[:] = 1.0
+        df = (owner_matrix @ presence).tocsr()
+        idf = df.copy()
+        text_of_entry = np.repeat(np.arange(n_texts), np.diff(df.indptr))
+        idf.data = np.log((1.0 + sentences_per_text[text_of_entry]) / (1.0 + df.data)) + 1.0
+        tfidf = counts.multiply(owner_matrix.T @ idf).tocsr()
+        tfidf.eliminate_zeros()
+        normalized = self._normalize_rows(tfidf)
+
+        if self.method == "tfidf":
+            centroids = self._normalize_rows((owner_matrix @ tfidf).tocsr())
+            return np.asarray(normalized.multiply(owner_matrix.T @ centroids).sum(axis=1)).ravel()
+
+        # TextRank: cosine similarity between sentences of the same text only
+        same_text = (owner_matrix.T @ owner_matrix).tocsr()
+        similarity = (normalized @ normalized.T).multiply(same_text).tocsr()
+        similarity.setdiag(0)
+        similarity.eliminate_zeros()
+
+        out_weight = np.asarray(similarity.sum(axis=1)).ravel()
+        transition = (sparse.diags(1.0 / np.maximum(out_weight, 1e-12)) @ similarity).T.tocsr()
+        teleport = 1.0 / sentences_per_text[owner]
+        # Sentences with no similar neighbour give their rank back to their own text uniformly
+        dangling = out_weight == 0
+        rank = teleport.copy()
+        for _ in range(self.iterations):
+            leaked = np.bincount(owner, weights=rank * dangling, minlength=n_texts)
+            rank = (1 - self.damping) * teleport + self.damping * (transition @ rank + leaked[owner] * teleport)
+        return rank
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        sentences: List[str] = []
+        spans: List[Tuple[int, int]] = []
+        for text in texts:
+            split = self.split_sentences(text)
+            spans.append((len(sentences), len(sentences) + len(split)))
+            sentences.extend(split)
+        if not sentences:
+            return [text.strip() for text in texts]
+
+        owner = np.repeat(np.arange(len(texts)), [end - start for start, end in spans])
+        scores = self._scores(sentences, owner, len(texts))
+
+        summaries = []
+        for text, (start, end) in zip(texts, spans):
+            if end - start <= self.sentences:
+                summaries.append(" ".join(sentences[start:end]) or text.strip())
+                continue
+            # Best sentences, kept in reading order (stable for ties)
+            best = np.sort(np.argsort(-scores[start:end], kind="stable")[:self.sentences])
+            summaries.append(" ".join(sentences[start + i] for i in best))
+        return summaries
@@ -0,0 +1,64 @@
+import logging
+from typing import Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Rows per matrix product when assigning vectors to centroids (bounds temporary memory)
+ASSIGN_BLOCK_SIZE = 65536
+
+
+def auto_nlist(rows: int) -> int:
+    """Default number of IVF lists: ~4 * sqrt(n), keeping at least ~39 training points per list."""
+    return int(max(1, min(4 * np.sqrt(rows), rows // 39)))
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for every (unit-length) row."""
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_SIZE):
+        block = np.asarray(vectors[start:start + ASSIGN_BLOCK_SIZE], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(sample: np.ndarray, nlist: int, iterations: int = 20, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means over unit-length rows (cosine similarity), in plain NumPy.
+    Empty clusters are re-seeded from random sample points.
+    """
+    rng = np.random.default_rng(seed)
+    sample = np.ascontiguousarray(sample, dtype=np.float32)
+    nlist = min(nlist, len(sample))
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = assign(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts[present])[:-1]])
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+
+        updated = centroids.copy()
+        updated[present] = sums
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            updated[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        norms = np.linalg.norm(updated, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        updated /= norms
+
+        shift = float(np.max(np.abs(updated - centroids)))
+        centroids = updated
+        if shift < 1e-4:
+            break
+
+    return centroids
+
+
+def inverted_lists(labels: np.ndarray, nlist: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Groups row ids by list: rows of list l are order[offsets[l]:offsets[l + 1]]."""
+    order = np.argsort(labels, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=nlist))]).astype(np.int64)
+    return order, offsets
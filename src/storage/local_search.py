@@ -0,0 +1,532 @@
+import os
+import json
+import fcntl
+import shutil
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+import numpy as np
+from src.config.settings import settings
+from src.storage.ann import assign, auto_nlist, inverted_lists, train_centroids
+
+logger = logging.getLogger(__name__)
+
+# Fixed-width chunk id column (UUIDs are 36 bytes)
+ID_DTYPE = np.dtype("S64")
+
+
+def _published_files(dataset_path: str, exclude: Iterable[str] = ()) -> List[str]:
+    excluded = {os.path.abspath(p) for p in exclude}
+    found = []
+    for root, dirs, files in os.walk(dataset_path):
+        # Hidden in-progress files are not part of the dataset yet
+        dirs[:] = sorted(d for d in dirs if not d.startswith((".", "_")))
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            if name.startswith((".", "_")) or not name.endswith(".parquet") or os.path.abspath(path) in excluded:
+                continue
+            found.append(path)
+    return found
+
+
+def _signature_entries(dataset_path: str) -> Dict[str, str]:
+    """Published file -> "relpath:size:mtime" entry, from one walk of the dataset."""
+    entries = {}
+    for path in _published_files(dataset_path):
+        stat = os.stat(path)
+        entries[os.path.abspath(path)] = f"{os.path.relpath(path, dataset_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return entries
+
+
+def _signature_of(entries: Dict[str, str], exclude: Iterable[str] = ()) -> str:
+    excluded = {os.path.abspath(p) for p in exclude}
+    lines = [entry for path, entry in entries.items() if path not in excluded]
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def dataset_signature(dataset_path: str, exclude: Iterable[str] = ()) -> str:
+    """Fingerprint of the Parquet dataset's published files (path, size, mtime)."""
+    return _signature_of(_signature_entries(dataset_path), exclude)
+
+
+def _extend_id_order(order: np.ndarray, ids: np.ndarray, base: int) -> np.ndarray:
+    """Stable id sort order of all rows, from the order of rows [0, base) and the new rows' ids."""
+    new_rows = base + np.argsort(ids[base:], kind="stable")
+    # side="right" keeps older rows first among equal ids, as a full stable sort would
+    positions = np.searchsorted(np.asarray(ids[order]), ids[new_rows], side="right")
+    return np.insert(order, positions, new_rows).astype(np.int64)
+
+
+def _extend_inverted_lists(
+    list_rows: np.ndarray, list_offsets: np.ndarray, new_lists: np.ndarray, base: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Appends rows base.. (assigned to new_lists) to the end of their IVF lists."""
+    order = np.argsort(new_lists, kind="stable")
+    grouped = np.asarray(new_lists)[order]
+    list_rows = np.insert(list_rows, list_offsets[grouped + 1], base + order).astype(np.int64)
+    counts = np.bincount(grouped, minlength=len(list_offsets) - 1)
+    list_offsets = list_offsets + np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return list_rows, list_offsets
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class _IndexLock:
+    """Advisory lock (next to the index directory) serializing index writers and rebuilds."""
+    def __init__(self, index_path: str):
+        self.path = f"{index_path}.lock"
+        self._file: Optional[TextIO] = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        lock_file = open(self.path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def _read_meta(index_path: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(index_path, "meta.json")
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_meta(index_path: str, meta: Dict[str, Any]):
+    tmp_path = os.path.join(index_path, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(index_path, "meta.json"))
+
+
+class LocalIndexWriter:
+    """
+    Appends rows to a local index directory. Data files are append-only and meta.json
+    (written last, atomically) holds the committed row count, so an interrupted write
+    is simply truncated away the next time a writer opens the index.
+
+    Once enough rows exist (ANN_TRAIN_MIN_ROWS) commit() trains the IVF centroids;
+    from then on every appended batch is assigned to its lists as it arrives. The id order
+    and IVF list lookups of the previous commit are extended with the appended rows only.
+    """
+    def __init__(self, index_path: str, dimension: int, lock: _IndexLock):
+        self.index_path = index_path
+        self._lock = lock
+        os.makedirs(index_path, exist_ok=True)
+        self.meta = _read_meta(index_path) or {"rows": 0, "dimension": dimension, "payload_bytes": 0, "nlist": 0}
+        if self.meta["rows"] and self.meta["dimension"] != dimension:
+            raise ValueError(f"Local index has dimension {self.meta['dimension']}, got vectors of dimension {dimension}")
+        self.meta["dimension"] = dimension
+        self._centroids = np.load(self._path("centroids.npy")) if self.meta["nlist"] else None
+        self._truncate()
+        self._rows = self.meta["rows"]
+        self._payload_bytes = self.meta["payload_bytes"]
+        # Rows covered by the lookup files on disk (None: recompute them in full at commit)
+        self._lookup_rows: Optional[int] = self._rows if self.meta.get("lookup_rows", 0) == self._rows else None
+        # Signature of the dataset this session started from (set by open_for)
+        self.base_signature: Optional[str] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.index_path, name)
+
+    def _truncate(self):
+        """Drops bytes past the committed row count (left behind by an aborted session)."""
+        rows = self.meta["rows"]
+        sizes = {
+            "vectors.f32": rows * self.meta["dimension"] * 4,
+            "ids.bin": rows * ID_DTYPE.itemsize,
+            "payload_ends.i64": rows * 8,
+            "payloads.bin": self.meta["payload_bytes"],
+            "lists.i32": rows * 4 if self.meta["nlist"] else 0,
+        }
+        for name, size in sizes.items():
+            with open(self._path(name), "ab") as f:
+                f.truncate(size)
+
+    @classmethod
+    def open_for(cls, dataset_path: str, dimension: int, index_path: str = settings.LOCAL_INDEX_PATH) -> Optional["LocalIndexWriter"]:
+        """
+        Writer for incremental maintenance, or None when the index cannot be kept in sync
+        (another writer holds it, or it does not match the dataset and needs a rebuild).
+        """
+        lock = _IndexLock(index_path)
+        if not lock.acquire(blocking=False):
+            logger.info("Local index is being written by another process; it will be rebuilt on next load.")
+            return None
+        meta = _read_meta(index_path)
+        entries = _signature_entries(dataset_path)
+        signature = _signature_of(entries)
+        in_sync = meta.get("dataset_signature") == signature if meta else not entries
+        if not in_sync:
+            lock.release()
+            logger.info("Local index is out of sync with the Parquet dataset; it will be rebuilt on next load.")
+            return None
+        writer = cls(index_path, dimension, lock)
+        writer.base_signature = signature
+        return writer
+
+    @classmethod
+    def create(cls, index_path: str, dimension: int) -> "LocalIndexWriter":
+        """Writer for a new, empty index directory (replacing any existing one)."""
+        lock = _IndexLock(index_path)
+        lock.acquire()
+        shutil.rmtree(index_path, ignore_errors=True)
+        return cls(index_path, dimension, lock)
+
+    def append(self, chunk_ids: Sequence[str], texts: Sequence[str], metadata_json: Sequence[str], vectors: np.ndarray):
+        if any(len(chunk_id) > ID_DTYPE.itemsize for chunk_id in chunk_ids):
+            raise ValueError(f"Local index supports chunk ids of up to {ID_DTYPE.itemsize} bytes")
+        vectors = normalize_rows(vectors)
+        ids = np.array(chunk_ids, dtype=ID_DTYPE)
+        payloads = [
+            f'{{"chunk_id": {json.dumps(chunk_id)}, "text": {json.dumps(text or "")}, "metadata": {metadata or "{}"}}}'.encode("utf-8")
+            for chunk_id, text, metadata in zip(chunk_ids, texts, metadata_json)
+        ]
+        ends = self._payload_bytes + np.cumsum([len(p) for p in payloads], dtype=np.int64)
+
+        with open(self._path("vectors.f32"), "ab") as f:
+            f.write(vectors.tobytes())
+        with open(self._path("ids.bin"), "ab") as f:
+            f.write(ids.tobytes())
+        with open(self._path("payloads.bin"), "ab") as f:
+            f.write(b"".join(payloads))
+        with open(self._path("payload_ends.i64"), "ab") as f:
+            f.write(ends.tobytes())
+        if self._centroids is not None:
+            with open(self._path("lists.i32"), "ab") as f:
+                f.write(assign(vectors, self._centroids).tobytes())
+
+        self._rows += len(vectors)
+        self._payload_bytes = int(ends[-1]) if len(ends) else self._payload_bytes
+
+    def train(self, nlist: Optional[int] = None):
+        """Trains IVF centroids on a sample of the written rows and (re)assigns every row."""
+        rows, dimension = self._rows, self.meta["dimension"]
+        vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r", shape=(rows, dimension))
+        nlist = nlist or settings.ANN_NLIST or auto_nlist(rows)
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(rows, min(rows, settings.ANN_TRAIN_SAMPLE), replace=False))
+        logger.info(f"Training IVF index: {nlist} lists on {len(sample_rows)} of {rows} vectors.")
+
+        centroids = train_centroids(vectors[sample_rows], nlist, settings.ANN_KMEANS_ITERATIONS)
+        np.save(self._path("centroids.npy"), centroids)
+        with open(self._path("lists.i32"), "wb") as f:
+            f.write(assign(vectors, centroids).tobytes())
+        self._centroids = centroids
+        self.meta["nlist"] = len(centroids)
+        # Every row moved to new lists
+        self._lookup_rows = None
+
+    def _write_array(self, name: str, array: np.ndarray):
+        tmp_path = self._path(f"{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(array).tobytes())
+        os.replace(tmp_path, self._path(name))
+
+    def _read_array(self, name: str, length: int) -> Optional[np.ndarray]:
+        path = self._path(name)
+        if not os.path.exists(path) or os.path.getsize(path) != length * 8:
+            return None
+        return np.fromfile(path, dtype=np.int64)
+
+    def _write_lookups(self):
+        """
+        Precomputes the sorted views readers need, so loading the index only memory-maps
+        files: the id sort order (id lookups) and the rows grouped by IVF list. Rows already
+        covered by the previous commit's lookups are merged, not sorted again.
+        """
+        rows, base = self._rows, self._lookup_rows
+        ids = np.memmap(self._path("ids.bin"), dtype=ID_DTYPE, mode="r", shape=(rows,)) if rows else np.empty(0, dtype=ID_DTYPE)
+        id_order = self._read_array("id_order.i64", base) if base is not None else None
+        if id_order is None:
+            id_order = np.argsort(ids, kind="stable").astype(np.int64)
+        elif base != rows:
+            id_order = _extend_id_order(id_order, ids, base)
+        self._write_array("id_order.i64", id_order)
+
+        if self._centroids is not None:
+            nlist = len(self._centroids)
+            lists = np.memmap(self._path("lists.i32"), dtype=np.int32, mode="r", shape=(rows,)) if rows else np.empty(0, dtype=np.int32)
+            list_rows = self._read_array("list_rows.i64", base) if base is not None else None
+            list_offsets = self._read_array("list_offsets.i64", nlist + 1) if base is not None else None
+            if list_rows is None or list_offsets is None:
+                list_rows, list_offsets = inverted_lists(np.asarray(lists), nlist)
+            elif base != rows:
+                list_rows, list_offsets = _extend_inverted_lists(list_rows, list_offsets, np.asarray(lists[base:]), base)
+            self._write_array("list_rows.i64", list_rows)
+            self._write_array("list_offsets.i64", list_offsets)
+        self._lookup_rows = rows
+
+    def commit(self, signature: str):
+        if self._centroids is None and self._rows >= settings.ANN_TRAIN_MIN_ROWS:
+            self.train()
+        self._write_lookups()
+        # lookup_rows tells readers the lookup files match this commit (written just before meta.json)
+        self.meta.update({
+            "rows": self._rows, "payload_bytes": self._payload_bytes, "dataset_signature": signature, "lookup_rows": self._rows,
+        })
+        _write_meta(self.index_path, self.meta)
+        self._lock.release()
+
+    def commit_published(self, dataset_path: str, published: Sequence[str]):
+        """
+        Commits after the storage session published `published` into the dataset. If anything
+        else changed the dataset meanwhile, the index is committed as out of sync (rebuilt on load).
+        """
+        entries = _signature_entries(dataset_path)
+        unchanged = _signature_of(entries, exclude=published) == self.base_signature
+        self.commit(_signature_of(entries) if unchanged else "")
+
+    def abort(self):
+        self._truncate()
+        self._lock.release()
+
+
+class LocalVectorIndex:
+    """
+    Top-k cosine search over the Parquet silver layer, without any external service.
+
+    The index directory holds row-aligned, memory-mapped files:
+      vectors.f32        (n, dim) pre-normalized float32 matrix
+      ids.bin            chunk ids (binary-search id lookup)
+      payloads.bin + payload_ends.i64   JSON payload (chunk_id, text, metadata) per row
+      centroids.npy + lists.i32         IVF coarse quantizer and list of every row (optional)
+      id_order.i64, list_rows.i64 + list_offsets.i64   sort order of ids and rows grouped by
+                         IVF list, precomputed at commit so loading does no O(n log n) work
+      meta.json          committed row count, dimension, nlist and the source dataset signature
+    It is maintained incrementally by ParquetStorageManager and rebuilt from the dataset
+    when out of sync (e.g. after sources were deleted).
+
+    Exact mode scores all rows with blocked matrix products and argpartition (memory per
+    query bounded by block_size rows). IVF mode scores only the rows in the nprobe lists
+    whose centroids are closest to the query, trading recall for latency.
+    """
+    def __init__(
+        self,
+        index_path: str = settings.LOCAL_INDEX_PATH,
+        block_size: int = settings.LOCAL_SEARCH_BLOCK_SIZE,
+        nprobe: int = settings.ANN_NPROBE,
+        mode: str = settings.LOCAL_SEARCH_MODE,
+    ):
+        if mode not in ("auto", "exact", "ivf"):
+            raise ValueError(f"Unknown local search mode: {mode}")
+        self.index_path = index_path
+        self.block_size = block_size
+        self.nprobe = nprobe
+        meta = _read_meta(index_path)
+        if meta is None:
+            raise FileNotFoundError(f"No local index at {index_path}")
+        self.meta: Dict[str, Any] = meta
+        rows, dimension = len(self), self.dimension
+
+        def mapped(name: str, dtype, shape):
+            if rows == 0 or (len(shape) > 1 and shape[1] == 0):
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(os.path.join(index_path, name), dtype=dtype, mode="r", shape=shape)
+
+        self.vectors = mapped("vectors.f32", np.float32, (rows, dimension))
+        # Lookup files are only trusted if they were written by the commit being loaded
+        lookups_current = self.meta.get("lookup_rows") == rows
+
+        def lookup(name: str, length: int) -> Optional[np.ndarray]:
+            path = os.path.join(index_path, name)
+            if not lookups_current or not os.path.exists(path) or os.path.getsize(path) != length * 8:
+                return None
+            return np.memmap(path, dtype=np.int64, mode="r", shape=(length,)) if length else np.empty(0, dtype=np.int64)
+
+        self.ids = mapped("ids.bin", ID_DTYPE, (rows,))
+        id_order = lookup("id_order.i64", rows)
+        if id_order is None:
+            logger.info("Local index has no precomputed id order (written by an older version); sorting ids.")
+            id_order = np.argsort(self.ids, kind="stable")
+        self.id_order = id_order
+        self.payload_ends = mapped("payload_ends.i64", np.int64, (rows,))
+        self.payloads = mapped("payloads.bin", np.uint8, (int(self.meta["payload_bytes"]),)) \
+            if self.meta["payload_bytes"] else np.empty(0, dtype=np.uint8)
+
+        self.centroids: Optional[np.ndarray] = None
+        if self.meta.get("nlist") and mode != "exact":
+            self.centroids = np.load(os.path.join(index_path, "centroids.npy"))
+            list_rows = lookup("list_rows.i64", rows)
+            list_offsets = lookup("list_offsets.i64", len(self.centroids) + 1)
+            if list_rows is None or list_offsets is None:
+                logger.info("Local index has no precomputed IVF lists (written by an older version); grouping rows.")
+                list_rows, list_offsets = inverted_lists(np.asarray(mapped("lists.i32", np.int32, (rows,))), len(self.centroids))
+            self._list_rows, self._list_offsets = list_rows, list_offsets
+        elif mode == "ivf":
+            raise ValueError("IVF search requested but the local index has no trained IVF lists.")
+
+        kind = f"IVF (nlist={len(self.centroids)}, nprobe={nprobe})" if self.centroids is not None else "exact"
+        logger.info(f"Loaded local vector index: {rows} vectors of dimension {dimension}, {kind} search.")
+
+    def __len__(self) -> int:
+        return int(self.meta["rows"])
+
+    @property
+    def dimension(self) -> int:
+        return int(self.meta["dimension"])
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, dataset_path: str = settings.OUTPUT_PATH, index_path: str = settings.LOCAL_INDEX_PATH, **kwargs) -> "LocalVectorIndex":
+        """Streams the Parquet dataset into a fresh index directory and swaps it in atomically."""
+        import pyarrow.dataset as ds
+
+        lock = _IndexLock(index_path)
+        lock.acquire()
+        try:
+            signature = dataset_signature(dataset_path)
+            files = _published_files(dataset_path)
+            batches: Iterable[Any] = []
+            dimension = 0
+            if files:
+                dataset = ds.dataset(files, format="parquet", partitioning=ds.partitioning(flavor="hive"), partition_base_dir=dataset_path)
+                dimension = dataset.schema.field("vector").type.list_size
+                batches = dataset.scanner(
+                    columns=["chunk_id", "text", "metadata", "vector"], batch_size=settings.LOCAL_SEARCH_BLOCK_SIZE
+                ).to_batches()
+            logger.info(f"Building local vector index from {dataset_path} ({len(files)} files).")
+
+            build_path = f"{index_path}.building"
+            shutil.rmtree(build_path, ignore_errors=True)
+            # The build writer works inside the lock we already hold
+            writer = LocalIndexWriter(build_path, dimension, _IndexLock(build_path))
+            for batch in batches:
+                n = batch.num_rows
+                if n == 0:
+                    continue
+                matrix = batch.column("vector").flatten().to_numpy(zero_copy_only=False).reshape(n, dimension)
+                writer.append(
+                    batch.column("chunk_id").to_pylist(),
+                    batch.column("text").to_pylist(),
+                    batch.column("metadata").to_pylist(),
+                    matrix,
+                )
+            writer.commit(signature)
+
+            # Swap the finished build in place of the previous index
+            old_path = f"{index_path}.old"
+            shutil.rmtree(old_path, ignore_errors=True)
+            if os.path.exists(index_path):
+                os.replace(index_path, old_path)
+            os.replace(build_path, index_path)
+            shutil.rmtree(old_path, ignore_errors=True)
+        finally:
+            lock.release()
+        return cls(index_path, **kwargs)
+
+    @classmethod
+    def load_or_build(cls, dataset_path: str = settings.OUTPUT_PATH, index_path: str = settings.LOCAL_INDEX_PATH, **kwargs) -> Optional["LocalVectorIndex"]:
+        """Opens the persisted index, rebuilding it first if the dataset changed. None if there is no data."""
+        if not os.path.isdir(dataset_path):
+            logger.warning(f"No Parquet dataset at {dataset_path}. Local search is unavailable.")
+            return None
+        meta = _read_meta(index_path)
+        if meta is not None:
+            if meta.get("dataset_signature") == dataset_signature(dataset_path):
+                return cls(index_path, **kwargs)
+            logger.info("Parquet dataset changed since the local index was built.")
+        return cls.build(dataset_path, index_path, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def top_k(self, queries: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k for a (q, dim) query matrix (or a single vector): IVF when the index has trained
+        lists (nprobe overrides the default), exhaustive otherwise.
+        Returns (rows, scores), each (q, min(k, n)), best first.
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty((len(queries), 0), dtype=np.int64), np.empty((len(queries), 0), dtype=np.float32)
+        if self.centroids is not None:
+            return self._ivf_top_k(queries, k, nprobe or self.nprobe)
+        return self._exact_top_k(queries, k)
+
+    def _exact_top_k(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_queries = queries.shape[0]
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+        best_scores = np.empty((n_queries, 0), dtype=np.float32)
+        for start in range(0, len(self), self.block_size):
+            block = self.vectors[start:start + self.block_size]
+            scores = queries @ block.T
+            if scores.shape[1] > k:
+                part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, part, axis=1)
+            else:
+                part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            # Merge this block's candidates with the running best
+            best_rows = np.concatenate([best_rows, part + start], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+    def _ivf_top_k(self, queries: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        assert self.centroids is not None
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        rows_out = np.full((len(queries), k), -1, dtype=np.int64)
+        scores_out = np.full((len(queries), k), -np.inf, dtype=np.float32)
+
+        for q, lists in enumerate(probes):
+            # Sorted candidate rows keep memory-mapped reads mostly sequential
+            candidates = np.sort(np.concatenate(
+                [self._list_rows[self._list_offsets[list_id]:self._list_offsets[list_id + 1]] for list_id in lists]
+            ))
+            if len(candidates) == 0:
+                continue
+            scores = self.vectors[candidates] @ queries[q]
+            top = min(k, len(candidates))
+            part = np.argpartition(-scores, top - 1)[:top] if len(candidates) > top else np.arange(top)
+            part = part[np.argsort(-scores[part], kind="stable")]
+            rows_out[q, :top] = candidates[part]
+            scores_out[q, :top] = scores[part]
+        return rows_out, scores_out
+
+    def payload(self, row: int) -> Dict[str, Any]:
+        start = self.payload_ends[row - 1] if row > 0 else 0
+        return json.loads(self.payloads[start:self.payload_ends[row]].tobytes())
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        key = chunk_id.encode("utf-8")
+        pos = int(np.searchsorted(self.ids, key, sorter=self.id_order))
+        if pos < len(self.id_order) and self.ids[self.id_order[pos]] == key:
+            return int(self.id_order[pos])
+        return None
+
+    def get(self, chunk_id: str) -> Optional[Dict[str, Any]]:
+        """Payload lookup by chunk id."""
+        row = self.row_of(chunk_id)
+        return None if row is None else self.payload(row)
+
+    def search(self, query: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Top-k results for one query vector, as chunk_id/text/score/metadata dicts."""
+        rows, scores = self.top_k(query, top_k)
+        return [{**self.payload(int(r)), "score": float(s)} for r, s in zip(rows[0], scores[0]) if r >= 0]
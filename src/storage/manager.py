@@ -1,46 +1,131 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+import time
+import random
+import numpy as np
 import pandas as pd
 import os
+import json
+import uuid
+import shutil
 import logging
 from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type
 from src.ingestion.models import ProcessedChunk
+from src.embedding.embedder import Embeddings, HybridEmbeddings, as_dense_matrix
 from src.config.settings import settings
+from src.storage.validation import DataQualityError, UUID4_REGEX, validate_batch
 
 logger = logging.getLogger(__name__)
 
 class BaseStorageManager(ABC):
+    # Whether appended rows only become durable when the write session closes
+    # (otherwise each append is durable as soon as it returns)
+    commits_on_close: bool = False
+
     @abstractmethod
-    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: List[Any]):
+    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
         """Saves chunks and embeddings to the underlying storage system."""
         pass
 
-    def validate_data_quality(self, chunks: List[ProcessedChunk], embeddings: List[Any]):
+    def delete_sources(self, sources: List[str]):
+        """Removes every chunk previously stored for the given source files."""
+        pass
+
+    # ------------------------------------------------------------------
+    # In-place updates, used by deferred HyDE enrichment
+    # ------------------------------------------------------------------
+    # Whether stored chunks can be re-embedded in place; without it the hooks below do nothing
+    supports_updates: bool = False
+
+    def pending_enrichment(self, limit: int) -> List[ProcessedChunk]:
+        """Stored chunks still waiting for a HyDE summary (summary_pending in their metadata)."""
+        return []
+
+    def update_embeddings(self, chunks: List[ProcessedChunk], embeddings: Embeddings) -> List[ProcessedChunk]:
+        """
+        Replaces the vectors of already stored chunks and writes their summary and metadata.
+        Returns the chunks that could not be updated (their stored point is left unchanged).
+        """
+        return list(chunks)
+
+    def update_metadata(self, chunks: List[ProcessedChunk]) -> List[ProcessedChunk]:
+        """Writes the metadata of already stored chunks, leaving their vectors as they are. Returns the failed ones."""
+        return list(chunks)
+
+    # ------------------------------------------------------------------
+    # Batched write sessions: open() -> append() x N -> close()
+    # Lets pipelines stream micro-batches instead of one giant save call.
+    # ------------------------------------------------------------------
+    def open(self):
+        """Starts a write session."""
+        pass
+
+    def append(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
+        """Writes one micro-batch within the current session."""
+        self.save_embeddings(chunks, embeddings)
+
+    def close(self):
+        """Commits the current write session."""
+        pass
+
+    def abort(self):
+        """Discards the current write session after a failure (best effort)."""
+        pass
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def validate_data_quality(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
         if len(chunks) != len(embeddings):
             raise ValueError(f"Mismatch: {len(chunks)} chunks vs {len(embeddings)} embeddings")
 
+        mode = settings.DATA_QUALITY_MODE
+        if mode == "off":
+            return
+        if mode not in ("native", "great_expectations", "sampled"):
+            raise ValueError(f"Unknown data quality mode: {mode}")
+
+        matrix = as_dense_matrix(embeddings)
+        if mode in ("native", "sampled"):
+            failures = validate_batch(
+                [chunk.chunk_id for chunk in chunks],
+                [chunk.content for chunk in chunks],
+                matrix,
+                settings.EMBEDDING_DIMENSION,
+            )
+            if failures:
+                logger.error("Data Quality Data Contract FAILED!")
+                raise DataQualityError(f"Data Quality Assertions Failed: {'; '.join(failures)}")
+            logger.info(f"Data Quality Rules Passed for {len(chunks)} chunks.")
+
+        if mode == "great_expectations" or (mode == "sampled" and random.random() < settings.DATA_QUALITY_SAMPLE_RATE):
+            self._validate_with_great_expectations(chunks, matrix)
+
+    def _validate_with_great_expectations(self, chunks: List[ProcessedChunk], matrix: np.ndarray):
+        """Deep audit of the same data contract through a Great Expectations suite."""
         import great_expectations as gx
         
         logger.info("Running Great Expectations Data Quality Checks...")
         
-        data = []
-        from typing import Dict, Any
-
-        for chunk, vector_data in zip(chunks, embeddings):
-            row: Dict[str, Any] = {
-                "chunk_id": chunk.chunk_id,
-                "parent_id": chunk.parent_doc_id,
-                "text": chunk.content,
-            }
-            if isinstance(vector_data, dict) and "dense" in vector_data:
-                row["vector_len"] = len(vector_data["dense"])
-            elif isinstance(vector_data, list):
-                row["vector_len"] = len(vector_data)
-            else:
-                row["vector_len"] = 0
-            data.append(row)
-            
-        df = pd.DataFrame(data)
+        # Vector length comes from the matrix shape; no per-row conversion needed
+        df = pd.DataFrame({
+            "chunk_id": [chunk.chunk_id for chunk in chunks],
+            "parent_id": [chunk.parent_doc_id for chunk in chunks],
+            "text": [chunk.content for chunk in chunks],
+            "vector_len": np.full(len(chunks), matrix.shape[1] if matrix.ndim == 2 else 0),
+        })
         context = gx.get_context(mode="ephemeral")
         
         # Connect to data
@@ -67,7 +152,7 @@ class BaseStorageManager(ABC):
         suite.add_expectation(
             gx.expectations.ExpectColumnValuesToMatchRegex(
                 column="chunk_id",
-                regex=r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
+                regex=UUID4_REGEX
             )
         )
         # 4. ID uniqueness
@@ -85,47 +170,211 @@ class BaseStorageManager(ABC):
         
         if not validation_result.success:
             logger.error("Data Quality Data Contract FAILED!")
-            raise Exception(f"Data Quality Assertions Failed: {validation_result}")
+            raise DataQualityError(f"Data Quality Assertions Failed: {validation_result}")
         logger.info("Data Quality Rules Passed Successfully!")
 
 class ParquetStorageManager(BaseStorageManager):
-    """Saves vectorized chunks to a Parquet file (Data Lake / Silver Layer)."""
-    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: List[Any]):
+    """
+    Appends vectorized chunks to a partitioned Parquet dataset (Data Lake / Silver Layer).
+
+    Layout: OUTPUT_PATH/ingest_date=YYYY-MM-DD/source=<url-encoded path>/part-<session>-<n>.parquet
+    (Hive-style, so pyarrow/pandas/Spark read the partition columns back). A session only ever adds
+    new files; each is written under a hidden temporary name and renamed on close(), so readers
+    never see partial output. Rows are buffered and written as row groups of PARQUET_ROW_GROUP_SIZE.
+    """
+    commits_on_close = True
+
+    def __init__(
+        self,
+        row_group_size: int = settings.PARQUET_ROW_GROUP_SIZE,
+        compression: str = settings.PARQUET_COMPRESSION,
+        max_open_files: int = settings.PARQUET_MAX_OPEN_FILES,
+    ):
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.max_open_files = max_open_files
+        self.open()
+
+    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
         if not chunks:
             logger.warning("No chunks to save.")
             return
 
+        with self:
+            self.append(chunks, embeddings)
+
+    def open(self):
+        self._root = settings.OUTPUT_PATH
+        self._ingest_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        self._session_id = uuid.uuid4().hex[:12]
+        self._schema = None
+        self._writers: "OrderedDict[str, Any]" = OrderedDict()
+        self._buffers: Dict[str, List[Any]] = {}
+        self._buffered_rows = 0
+        self._files: List[Tuple[str, str]] = []
+        self._rows_written = 0
+        # Local search index kept in step with this session (opened lazily on the first batch)
+        self._index_writer = None
+        self._index_checked = False
+
+    def _partition_dir(self, source: str, ingest_date: str) -> str:
+        return os.path.join(self._root, f"ingest_date={ingest_date}", f"source={quote(source, safe='')}")
+
+    @staticmethod
+    def _build_table(chunks: List[ProcessedChunk], embeddings: Embeddings):
+        import pyarrow as pa
+
+        # Vectors go in as a fixed_size_list<float32> built straight from the matrix buffer
+        matrix = np.ascontiguousarray(as_dense_matrix(embeddings), dtype=np.float32)
+        columns = {
+            "chunk_id": pa.array([chunk.chunk_id for chunk in chunks], type=pa.string()),
+            "parent_id": pa.array([chunk.parent_doc_id for chunk in chunks], type=pa.string()),
+            "text": pa.array([chunk.content for chunk in chunks], type=pa.string()),
+            "vector": pa.FixedSizeListArray.from_arrays(pa.array(matrix.reshape(-1)), matrix.shape[1]),
+        }
+        if isinstance(embeddings, HybridEmbeddings):
+            columns["sparse_indices"] = pa.ListArray.from_arrays(pa.array(embeddings.indptr), pa.array(embeddings.indices))
+            columns["sparse_values"] = pa.ListArray.from_arrays(pa.array(embeddings.indptr), pa.array(embeddings.values))
+        # JSON keeps one schema across files even when metadata keys differ between documents
+        columns["metadata"] = pa.array([json.dumps(chunk.metadata, default=str) for chunk in chunks], type=pa.string())
+        return pa.table(columns)
+
+    def append(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
+        if not chunks:
+            return
+
         self.validate_data_quality(chunks, embeddings)
-        
-        logger.info(f"Preparing to save {len(chunks)} vectors to Parquet Storage.")
-        
-        data = []
-        for chunk, vector in zip(chunks, embeddings):
-            row = {
-                "chunk_id": chunk.chunk_id,
-                "parent_id": chunk.parent_doc_id,
-                "text": chunk.content,
-                "vector": vector,
-                "metadata": chunk.metadata
-            }
-            data.append(row)
-            
-        df = pd.DataFrame(data)
-        
-        output_dir = os.path.dirname(settings.OUTPUT_PATH)
-        os.makedirs(output_dir, exist_ok=True)
-        
-        logger.info(f"Writing parquet file to {settings.OUTPUT_PATH}...")
+        logger.info(f"Appending {len(chunks)} vectors to Parquet dataset {self._root}.")
+
+        table = self._build_table(chunks, embeddings)
+        if self._schema is None:
+            self._schema = table.schema
+        elif table.schema != self._schema:
+            table = table.cast(self._schema)
+
+        self._append_to_local_index(table)
+
+        # Group rows by source partition (stable, so chunk order is kept within a source)
+        sources = np.array([chunk.metadata.get("source", chunk.parent_doc_id) for chunk in chunks], dtype=object)
+        order = np.argsort(sources, kind="stable")
+        boundaries = np.flatnonzero(sources[order][1:] != sources[order][:-1]) + 1
+        for group in np.split(order, boundaries):
+            partition = self._partition_dir(sources[group[0]], self._ingest_date)
+            self._buffers.setdefault(partition, []).append(table.take(group))
+            self._buffered_rows += len(group)
+
+        # Bound memory to about one row group: flush the fullest buffers first
+        while self._buffered_rows >= self.row_group_size:
+            self._flush(max(self._buffers, key=lambda p: sum(t.num_rows for t in self._buffers[p])))
+
+    def _append_to_local_index(self, table):
+        if not settings.LOCAL_INDEX_INCREMENTAL:
+            return
+        if not self._index_checked:
+            from src.storage.local_search import LocalIndexWriter
+            self._index_checked = True
+            self._index_writer = LocalIndexWriter.open_for(
+                self._root, self._schema.field("vector").type.list_size, settings.LOCAL_INDEX_PATH
+            )
+        if self._index_writer is not None:
+            n = table.num_rows
+            self._index_writer.append(
+                table.column("chunk_id").to_pylist(),
+                table.column("text").to_pylist(),
+                table.column("metadata").to_pylist(),
+                table.column("vector").combine_chunks().flatten().to_numpy().reshape(n, -1),
+            )
+
+    def _flush(self, partition: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = self._buffers.pop(partition, None)
+        if not tables:
+            return
+        table = pa.concat_tables(tables)
+        self._buffered_rows -= table.num_rows
+
+        writer = self._writers.get(partition)
+        if writer is None:
+            # Cap open file handles: finish the least recently used file (its partition can get another part)
+            while len(self._writers) >= self.max_open_files:
+                self._writers.popitem(last=False)[1].close()
+            os.makedirs(partition, exist_ok=True)
+            name = f"part-{self._session_id}-{len(self._files):05d}.parquet"
+            tmp_path = os.path.join(partition, f".{name}.inprogress")
+            self._files.append((tmp_path, os.path.join(partition, name)))
+            writer = pq.ParquetWriter(tmp_path, self._schema, compression=self.compression)
+            self._writers[partition] = writer
+        else:
+            self._writers.move_to_end(partition)
+
         try:
-            df.to_parquet(settings.OUTPUT_PATH, index=False)
-            logger.info("Successfully persisted vector data to Parquet.")
+            writer.write_table(table, row_group_size=self.row_group_size)
+            self._rows_written += table.num_rows
         except Exception as e:
-            logger.error(f"Failed to save parquet file: {e}")
+            logger.error(f"Failed to write parquet file in {partition}: {e}")
             raise
 
+    def close(self):
+        for partition in list(self._buffers):
+            self._flush(partition)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        # Publish the finished files; the leading '.' hid them from dataset readers until now
+        for tmp_path, final_path in self._files:
+            os.replace(tmp_path, final_path)
+        if self._index_writer is not None:
+            self._index_writer.commit_published(self._root, [final_path for _, final_path in self._files])
+            self._index_writer = None
+        if self._files:
+            logger.info(f"Successfully persisted {self._rows_written} vectors to {len(self._files)} Parquet file(s).")
+        self._files = []
+        self._index_checked = False
+
+    def abort(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        self._buffers.clear()
+        self._buffered_rows = 0
+        for tmp_path, _ in self._files:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._files = []
+        if self._index_writer is not None:
+            self._index_writer.abort()
+            self._index_writer = None
+        self._index_checked = False
+
+    def delete_sources(self, sources: List[str]):
+        """Drops the source partitions of re-ingested or removed files across all ingest dates."""
+        if not sources or not os.path.isdir(settings.OUTPUT_PATH):
+            return
+
+        self._root = settings.OUTPUT_PATH
+        removed = 0
+        for entry in os.scandir(self._root):
+            if not (entry.is_dir() and entry.name.startswith("ingest_date=")):
+                continue
+            ingest_date = entry.name.split("=", 1)[1]
+            for source in sources:
+                partition = self._partition_dir(source, ingest_date)
+                if os.path.isdir(partition):
+                    shutil.rmtree(partition)
+                    removed += 1
+            if not os.listdir(entry.path):
+                os.rmdir(entry.path)
+        logger.info(f"Deleted {removed} Parquet partition(s) for {len(sources)} source(s).")
+
 class QdrantStorageManager(BaseStorageManager):
     """Saves vectorized chunks to a live Qdrant Vector Database (Serving Layer)."""
+    supports_updates = True
+
     def __init__(self):
+        # Whether the summary_pending payload index was created by this process
+        self._pending_index_ready = False
         try:
             from qdrant_client import QdrantClient
             from qdrant_client.models import VectorParams, Distance, SparseVectorParams
@@ -148,6 +397,14 @@ class QdrantStorageManager(BaseStorageManager):
                 self.client.create_collection(**kwargs)
             else:
                 logger.info(f"Using existing Qdrant collection: '{settings.QDRANT_COLLECTION_NAME}'")
+
+            # Tiny side collection holding the data version that API response caches watch
+            version_collection = version_collection_name(settings.QDRANT_COLLECTION_NAME)
+            if version_collection not in collection_names:
+                self.client.create_collection(
+                    collection_name=version_collection,
+                    vectors_config=VectorParams(size=1, distance=Distance.DOT),
+                )
                 
         except ImportError:
             logger.error("qdrant-client not installed. Please run: pip install qdrant-client")
@@ -156,44 +413,237 @@ class QdrantStorageManager(BaseStorageManager):
             logger.error(f"Failed to connect to Qdrant: {e}")
             raise
 
-    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: List[Any]):
+    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: Embeddings):
         if not chunks:
             logger.warning("No chunks to save.")
             return
 
         self.validate_data_quality(chunks, embeddings)
 
-        from qdrant_client.models import PointStruct, SparseVector
-
         logger.info(f"Preparing to save {len(chunks)} vectors to Qdrant Vector DB.")
-        
-        points = []
-        for chunk, vector_data in zip(chunks, embeddings):
-            if isinstance(vector_data, dict) and "sparse_indices" in vector_data:
-                # Hybrid format
-                vector = {
-                    "": vector_data["dense"],
-                    "text-sparse": SparseVector(
-                        indices=vector_data["sparse_indices"],
-                        values=vector_data["sparse_values"]
-                    )
-                }
-            else:
-                vector = vector_data # List of floats
-                
-            point = PointStruct(
-                id=chunk.chunk_id,
-                vector=vector,
-                payload={
+        self.bulk_upload(chunks, embeddings)
+        self.bump_version()
+
+    def bump_version(self) -> int:
+        """
+        Advances the collection's data version after a successful write so API result caches
+        invalidate. Versions only grow (max of previous + 1 and the current time in ns).
+        """
+        from qdrant_client.models import PointStruct
+
+        try:
+            version = max(read_collection_version(self.client, settings.QDRANT_COLLECTION_NAME) + 1, time.time_ns())
+            self.client.upsert(
+                collection_name=version_collection_name(settings.QDRANT_COLLECTION_NAME),
+                points=[PointStruct(id=0, vector=[1.0], payload={"version": version})],
+                wait=True,
+            )
+            return version
+        except Exception as e:
+            # The data itself is stored; only cached search results may lag behind
+            logger.error(f"Failed to bump collection version for '{settings.QDRANT_COLLECTION_NAME}': {e}")
+            return 0
+
+    @staticmethod
+    def _vectors(embeddings: Embeddings, start: int, end: int) -> Any:
+        """Column-wise vectors of rows [start, end); the dense slice is converted in one bulk call."""
+        from qdrant_client.models import SparseVector
+
+        dense = as_dense_matrix(embeddings)[start:end].tolist()
+        if isinstance(embeddings, HybridEmbeddings):
+            sparse = []
+            for i in range(start, end):
+                indices, values = embeddings.sparse(i)
+                sparse.append(SparseVector(indices=indices.tolist(), values=values.tolist()))
+            return {"": dense, "text-sparse": sparse}
+        return dense
+
+    def _build_batch(self, chunks: List[ProcessedChunk], embeddings: Embeddings, start: int, end: int):
+        """Builds one columnar Batch for rows [start, end)."""
+        from qdrant_client.models import Batch
+
+        vectors = self._vectors(embeddings, start, end)
+        return Batch(
+            ids=[chunk.chunk_id for chunk in chunks[start:end]],
+            vectors=vectors,
+            payloads=[
+                {
                     "schema_version": 1,
                     "parent_id": chunk.parent_doc_id,
                     "text": chunk.content,
                     **chunk.metadata
                 }
+                for chunk in chunks[start:end]
+            ],
+        )
+
+    def bulk_upload(
+        self,
+        chunks: List[ProcessedChunk],
+        embeddings: Embeddings,
+        batch_size: int = settings.QDRANT_UPLOAD_BATCH_SIZE,
+        workers: int = settings.QDRANT_UPLOAD_WORKERS,
+        wait: bool = settings.QDRANT_UPLOAD_WAIT,
+    ) -> float:
+        """
+        Uploads points in batches of `batch_size` across `workers` parallel requests.
+        Each batch is retried on its own, so a transient error only re-sends that batch.
+        Batches are built lazily with at most 2 x workers in flight to bound memory.
+        With wait=False Qdrant acknowledges before indexing. Returns points/sec.
+        """
+        start_time = time.perf_counter()
+        ranges = [(i, min(i + batch_size, len(chunks))) for i in range(0, len(chunks), batch_size)]
+        failed: List[Tuple[int, int]] = []
+
+        def upload(start: int, end: int) -> None:
+            self._upsert_with_retry(self._build_batch(chunks, embeddings, start, end), wait=wait)
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            in_flight: Dict[Any, Tuple[int, int]] = {}
+            pending = iter(ranges)
+            while True:
+                for start, end in pending:
+                    in_flight[executor.submit(upload, start, end)] = (start, end)
+                    if len(in_flight) >= workers * 2:
+                        break
+                if not in_flight:
+                    break
+                done, _ = wait_futures(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows = in_flight.pop(future)
+                    if future.exception() is not None:
+                        logger.error(f"Qdrant batch rows {rows[0]}-{rows[1]} failed after retries: {future.exception()}")
+                        failed.append(rows)
+
+        elapsed = time.perf_counter() - start_time
+        uploaded = len(chunks) - sum(end - start for start, end in failed)
+        rate = uploaded / elapsed if elapsed > 0 else float("inf")
+        logger.info(
+            f"Uploaded {uploaded}/{len(chunks)} points to '{settings.QDRANT_COLLECTION_NAME}' in "
+            f"{len(ranges)} batch(es) with {workers} worker(s): {elapsed:.2f}s ({rate:,.0f} points/sec)."
+        )
+        if failed:
+            raise RuntimeError(f"{len(failed)} of {len(ranges)} Qdrant upload batches failed: rows {failed}")
+        return rate
+
+    def delete_sources(self, sources: List[str]):
+        """Deletes stale points of re-ingested or removed files so they are not duplicated."""
+        if not sources:
+            return
+
+        from qdrant_client.models import Filter, FieldCondition, MatchAny, FilterSelector
+
+        self.client.delete(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            points_selector=FilterSelector(
+                filter=Filter(must=[FieldCondition(key="source", match=MatchAny(any=list(sources)))])
+            ),
+        )
+        logger.info(f"Deleted existing points for {len(sources)} source file(s) from '{settings.QDRANT_COLLECTION_NAME}'.")
+        self.bump_version()
+
+    def pending_enrichment(self, limit: int) -> List[ProcessedChunk]:
+        from qdrant_client.models import Filter, FieldCondition, MatchValue, PayloadSchemaType
+
+        if not self._pending_index_ready:
+            try:
+                self.client.create_payload_index(
+                    collection_name=settings.QDRANT_COLLECTION_NAME,
+                    field_name="summary_pending",
+                    field_schema=PayloadSchemaType.BOOL,
+                )
+            except Exception as e:
+                logger.warning(f"Could not index 'summary_pending' (scans will be slower): {e}")
+            self._pending_index_ready = True
+
+        points, _ = self.client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            scroll_filter=Filter(must=[FieldCondition(key="summary_pending", match=MatchValue(value=True))]),
+            limit=limit,
+            with_payload=True,
+            with_vectors=False,
+        )
+        chunks = []
+        for point in points:
+            payload = dict(point.payload or {})
+            payload.pop("schema_version", None)
+            chunks.append(ProcessedChunk(
+                chunk_id=str(point.id),
+                parent_doc_id=payload.pop("parent_id", ""),
+                content=payload.pop("text", ""),
+                summary=payload.pop("summary", None),
+                chunk_index=payload.get("chunk_index", 0),
+                metadata=payload,
+            ))
+        return chunks
+
+    def _apply_updates(self, groups: List[List[Any]]) -> List[int]:
+        """
+        Applies per-point groups of update operations (e.g. [vectors, payload]); returns the
+        indices of the groups that failed. Qdrant runs a batch's operations in order and stops
+        at the first failing one, so a point's payload never lands without its vectors.
+        """
+        failed: List[int] = []
+        try:
+            self.client.batch_update_points(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                update_operations=[operation for group in groups for operation in group],
+                wait=True,
             )
-            points.append(point)
-            
-        self._upsert_with_retry(points)
+        except Exception as e:
+            # Typically points deleted by a re-ingest in the meantime; they were replaced by new pending ones.
+            # Updates are idempotent, so the groups already applied are simply applied again.
+            logger.warning(f"In-place update of {len(groups)} point(s) failed, applying point by point: {e}")
+            for i, group in enumerate(groups):
+                try:
+                    for operation in group:
+                        self.client.batch_update_points(
+                            collection_name=settings.QDRANT_COLLECTION_NAME,
+                            update_operations=[operation],
+                            wait=True,
+                        )
+                except Exception as point_error:
+                    logger.warning(f"Skipping in-place update: {point_error}")
+                    failed.append(i)
+        self.bump_version()
+        return failed
+
+    @staticmethod
+    def _set_payload_operation(chunk: ProcessedChunk):
+        from qdrant_client.models import SetPayload, SetPayloadOperation
+
+        payload = dict(chunk.metadata)
+        if chunk.summary is not None:
+            payload["summary"] = chunk.summary
+        return SetPayloadOperation(set_payload=SetPayload(payload=payload, points=[chunk.chunk_id]))
+
+    def update_embeddings(self, chunks: List[ProcessedChunk], embeddings: Embeddings) -> List[ProcessedChunk]:
+        if not chunks:
+            return []
+        from qdrant_client.models import PointVectors, UpdateVectors, UpdateVectorsOperation
+
+        self.validate_data_quality(chunks, embeddings)
+        columns = self._vectors(embeddings, 0, len(chunks))
+        if isinstance(columns, dict):
+            vectors = [{name: rows[i] for name, rows in columns.items()} for i in range(len(chunks))]
+        else:
+            vectors = columns
+        # One vector operation per point, each followed by its payload: a missing point only fails itself
+        groups = [
+            [
+                UpdateVectorsOperation(update_vectors=UpdateVectors(points=[PointVectors(id=chunk.chunk_id, vector=vector)])),
+                self._set_payload_operation(chunk),
+            ]
+            for chunk, vector in zip(chunks, vectors)
+        ]
+        failed = [chunks[i] for i in self._apply_updates(groups)]
+        logger.info(f"Re-embedded {len(chunks) - len(failed)} point(s) in place in '{settings.QDRANT_COLLECTION_NAME}'.")
+        return failed
+
+    def update_metadata(self, chunks: List[ProcessedChunk]) -> List[ProcessedChunk]:
+        if not chunks:
+            return []
+        return [chunks[i] for i in self._apply_updates([[self._set_payload_operation(chunk)] for chunk in chunks])]
 
     @retry(
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -201,18 +651,32 @@ class QdrantStorageManager(BaseStorageManager):
         retry=retry_if_exception_type(Exception),
         reraise=True
     )
-    def _upsert_with_retry(self, points):
+    def _upsert_with_retry(self, points, wait: bool = True):
         try:
             self.client.upsert(
                 collection_name=settings.QDRANT_COLLECTION_NAME,
-                points=points
+                points=points,
+                wait=wait
             )
-            logger.info(f"Successfully upserted {len(points)} vectors to Qdrant collection '{settings.QDRANT_COLLECTION_NAME}'.")
+            logger.debug(f"Successfully upserted {len(points.ids)} vectors to Qdrant collection '{settings.QDRANT_COLLECTION_NAME}'.")
         except Exception as e:
             logger.warning(f"Qdrant upsert failed, retrying... Error: {e}")
             raise
 
 
+def version_collection_name(collection_name: str) -> str:
+    return f"{collection_name}_meta"
+
+
+def read_collection_version(client, collection_name: str = settings.QDRANT_COLLECTION_NAME) -> int:
+    """Current data version of a Qdrant collection (0 before its first write)."""
+    version_collection = version_collection_name(collection_name)
+    if not client.collection_exists(version_collection):
+        return 0
+    points = client.retrieve(collection_name=version_collection, ids=[0], with_payload=True)
+    return int(points[0].payload.get("version", 0)) if points else 0
+
+
 def get_storage_manager(storage_type: str = settings.STORAGE_TYPE) -> BaseStorageManager:
     """Factory to return the appropriate Storage Manager."""
     if storage_type == "parquet":
@@ -0,0 +1,72 @@
+import re
+from typing import List, Optional, Sequence
+import numpy as np
+
+UUID4_REGEX = r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$"
+
+_HYPHEN_POSITIONS = [8, 13, 18, 23]
+_HEX_POSITIONS = [i for i in range(36) if i not in _HYPHEN_POSITIONS]
+_HEX_LOOKUP = np.zeros(256, dtype=bool)
+_HEX_LOOKUP[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = True
+_VARIANT_LOOKUP = np.zeros(256, dtype=bool)
+_VARIANT_LOOKUP[np.frombuffer(b"89ab", dtype=np.uint8)] = True
+
+
+class DataQualityError(Exception):
+    """Raised when a batch violates the chunk/vector data contract."""
+
+
+def invalid_uuid4_mask(ids: Sequence[str]) -> np.ndarray:
+    """
+    Vectorized UUIDv4 format check (same contract as UUID4_REGEX).
+    Ids are packed into a fixed-width byte matrix and checked column-wise.
+    """
+    n = len(ids)
+    try:
+        packed = np.array(ids, dtype="S37")
+    except (UnicodeEncodeError, TypeError, ValueError):
+        # Non-ASCII or non-string ids: fall back to the regex
+        pattern = re.compile(UUID4_REGEX)
+        return np.array([not (isinstance(i, str) and pattern.match(i)) for i in ids], dtype=bool)
+
+    invalid = np.char.str_len(packed) != 36
+    chars = packed.astype("S36").view(np.uint8).reshape(n, 36)
+    invalid |= (chars[:, _HYPHEN_POSITIONS] != ord("-")).any(axis=1)
+    invalid |= ~_HEX_LOOKUP[chars[:, _HEX_POSITIONS]].all(axis=1)
+    invalid |= chars[:, 14] != ord("4")
+    invalid |= ~_VARIANT_LOOKUP[chars[:, 19]]
+    return invalid
+
+
+def validate_batch(
+    chunk_ids: Sequence[str],
+    texts: Sequence[Optional[str]],
+    vectors: np.ndarray,
+    dimension: int,
+) -> List[str]:
+    """
+    Runs the pipeline data contract directly on arrays and returns the list of violations
+    (empty when the batch is valid):
+      1. text must not be null
+      2. every vector has exactly `dimension` components
+      3. chunk_id is a valid UUIDv4
+      4. chunk_id is unique within the batch
+    """
+    failures: List[str] = []
+    n = len(chunk_ids)
+
+    null_texts = sum(1 for t in texts if t is None)
+    if null_texts:
+        failures.append(f"{null_texts} chunk(s) with null text")
+
+    if vectors.ndim != 2 or vectors.shape[0] != n or vectors.shape[1] != dimension:
+        failures.append(f"vector shape {vectors.shape} does not match ({n}, {dimension})")
+
+    bad_ids = int(invalid_uuid4_mask(chunk_ids).sum()) if n else 0
+    if bad_ids:
+        failures.append(f"{bad_ids} chunk_id(s) are not valid UUIDv4")
+
+    if n and len(np.unique(np.asarray(chunk_ids, dtype=object).astype(str))) != n:
+        failures.append("chunk_id values are not unique")
+
+    return failures
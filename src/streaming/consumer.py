@@ -1,16 +1,28 @@
 import os
-import json
 import logging
 import argparse
+import time
+import signal
 import traceback
-from kafka import KafkaConsumer, KafkaProducer
+import multiprocessing
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from kafka import ConsumerRebalanceListener
+from kafka.structs import OffsetAndMetadata, TopicPartition
 
 from src.config.settings import settings
+from src.ingestion.manifest import source_key
 from src.ingestion.multimodal_loader import MultimodalLoader
+from src.ingestion.ocr import init_ocr_worker
 from src.processing.factory import StrategyFactory
 from src.embedding.embedder import get_embedder, BaseEmbedder
 from src.storage.manager import get_storage_manager, BaseStorageManager
 from src.processing.enricher import SummaryEnricher
+from src.processing.deferred_enrichment import DeferredEnricher, mark_pending
+from src.ingestion.models import ProcessedChunk
+from src.streaming.transport import BaseTransport, get_transport, replay_dead_letters
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("RedpandaConsumer")
@@ -28,7 +40,7 @@ class ProcessContext:
     Holds all expensive, re-usable singletons for the consumer process.
     Initialised once at startup; each message handler receives it by reference.
     """
-    def __init__(self, use_hyde: bool = False) -> None:
+    def __init__(self, use_hyde: bool = False, defer_hyde: bool = False) -> None:
         logger.info("Initialising ProcessContext (one-time startup)...")
 
         self.use_hyde = use_hyde
@@ -37,11 +49,35 @@ class ProcessContext:
         self.storage: BaseStorageManager = get_storage_manager(settings.STORAGE_TYPE)
         self.enricher = SummaryEnricher(use_enrichment=use_hyde)
 
+        # Deferred HyDE: store raw-content vectors now, summarize in the background later
+        self.defer_hyde = use_hyde and defer_hyde
+        if self.defer_hyde and not self.storage.supports_updates:
+            logger.warning(f"Storage '{settings.STORAGE_TYPE}' cannot update chunks in place; running HyDE inline.")
+            self.defer_hyde = False
+
         logger.info("ProcessContext ready.")
 
 
-def process_single_file(file_path: str, ctx: ProcessContext) -> None:
-    """Process one PDF through the full pipeline using pre-warmed singletons."""
+def enrich_chunks(chunks: List[ProcessedChunk], ctx: ProcessContext) -> List[ProcessedChunk]:
+    """HyDE step: summarizes now, or only marks the chunks as pending in deferred mode."""
+    if ctx.defer_hyde:
+        return mark_pending(chunks)
+    return ctx.enricher.enrich(chunks)
+
+
+def start_deferred_enrichment(ctx: ProcessContext) -> Optional[DeferredEnricher]:
+    """Starts the background HyDE worker of this process when running in deferred mode."""
+    if not ctx.defer_hyde:
+        return None
+    try:
+        return DeferredEnricher(ctx.storage, ctx.embedder, ctx.enricher).start()
+    except ValueError as e:
+        logger.error(f"Deferred HyDE worker not started, chunks stay pending: {e}")
+        return None
+
+
+def prepare_file(file_path: str, ctx: ProcessContext) -> List[ProcessedChunk]:
+    """Ingests, chunks and (optionally) enriches one PDF; returns chunks ready to embed."""
     logger.info(f"Processing: {file_path}")
 
     # 1. Ingestion
@@ -55,8 +91,11 @@ def process_single_file(file_path: str, ctx: ProcessContext) -> None:
 
     # 3. Optional HyDE enrichment
     if ctx.use_hyde:
-        chunks = ctx.enricher.enrich(chunks)
+        chunks = enrich_chunks(chunks, ctx)
+    return chunks
 
+
+def embed_and_store(chunks: List[ProcessedChunk], ctx: ProcessContext) -> None:
     # 4. Embedding  (use summary text if HyDE is on)
     texts_to_embed = [
         c.summary if c.summary and ctx.use_hyde else c.content for c in chunks
@@ -66,74 +105,600 @@ def process_single_file(file_path: str, ctx: ProcessContext) -> None:
     # 5. Storage
     ctx.storage.save_embeddings(chunks, embeddings)
 
+
+def process_single_file(file_path: str, ctx: ProcessContext) -> None:
+    """Process one PDF through the full pipeline using pre-warmed singletons."""
+    chunks = prepare_file(file_path, ctx)
+    embed_and_store(chunks, ctx)
     logger.info(f"Stored {len(chunks)} chunks for {os.path.basename(file_path)}.")
 
 
-def consume_events(use_hyde: bool = False) -> None:
-    logger.info(f"Connecting to Redpanda at {KAFKA_BROKER} → topic '{TOPIC_NAME}'")
+def _init_ingest_worker(processes: int) -> None:
+    # Ctrl+C is handled by the consumer, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_ocr_worker(processes)
+
+
+def _ingest_pool(workers: int) -> ProcessPoolExecutor:
+    """Long-lived pool parsing the PDFs of every batch of one consumer."""
+    # spawn: workers must not inherit the consumer's model, sockets and background threads
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_ingest_worker,
+        initargs=(workers,),
+    )
+
+
+def _replace_pool(pool: Optional[ProcessPoolExecutor], workers: int) -> ProcessPoolExecutor:
+    if pool is not None:
+        pool.shutdown(wait=False)
+    return _ingest_pool(workers)
+
+
+def process_batch(
+    events: List[Dict[str, Any]],
+    ctx: ProcessContext,
+    workers: int = settings.KAFKA_BATCH_INGEST_WORKERS,
+    pool: Optional[Executor] = None,
+) -> Dict[int, Tuple[Exception, str]]:
+    """
+    Processes a batch of events together: the files are ingested in parallel by a process
+    pool (pypdf and tesseract are CPU-bound, so threads would serialize on the GIL), all
+    their chunks are embedded in one model call and written with one storage call. Pass
+    the consumer's long-lived `pool`; without one the loader starts a pool for this call.
+
+    Returns {event index: (error, traceback)} for the events that failed. A file that cannot
+    be ingested only fails its own event. If the pooled embed/store fails, the files are
+    retried one by one so that only the offending ones are reported.
+    """
+    failures: Dict[int, Tuple[Exception, str]] = {}
+    files = [(i, e.get("file_path", "")) for i, e in enumerate(events) if e.get("event_type") == "PDF_CREATED"]
+    if not files:
+        return failures
+
+    # Documents come back in completion order, keyed by their normalized source path
+    waiting: Dict[str, List[int]] = {}
+    for i, path in files:
+        waiting.setdefault(source_key(path), []).append(i)
+    paths = dict(files)
+
+    loader = MultimodalLoader(os.path.dirname(files[0][1]), workers=min(workers, len(files)))
+    prepared: Dict[int, List[ProcessedChunk]] = {}
+    for doc in loader.iter_documents([path for _, path in files], executor=pool):
+        i = waiting[doc.metadata["source"]].pop(0)
+        try:
+            # HyDE runs once over the pooled chunks below, in full summarizer batches
+            prepared[i] = ctx.chunker.split([doc])
+        except Exception as exc:
+            logger.error(f"Failed to chunk {paths[i]}: {exc}")
+            failures[i] = (exc, traceback.format_exc())
+
+    for i, path in files:
+        if i not in prepared and i not in failures:
+            err = ValueError(f"Failed to ingest {path}")
+            logger.error(str(err))
+            failures[i] = (err, "".join(traceback.format_exception_only(type(err), err)))
+
+    ready = [(i, path, prepared[i]) for i, path in files if prepared.get(i)]
+
+    pooled = [chunk for _, _, chunks in ready for chunk in chunks]
+    if not pooled:
+        return failures
+    if ctx.use_hyde:
+        try:
+            # Enriches in place: the per-file chunk lists below see the summaries too
+            enrich_chunks(pooled, ctx)
+        except Exception as exc:
+            # Raw chunks are still searchable; losing the whole batch to the DLQ is worse
+            logger.error(f"HyDE enrichment of {len(ready)} file(s) failed ({exc}); storing them without summaries.")
+            for chunk in pooled:
+                chunk.summary = None
+
+    try:
+        embed_and_store(pooled, ctx)
+        logger.info(f"Stored {len(pooled)} chunks from {len(ready)} file(s) in one batch.")
+    except Exception as exc:
+        logger.error(f"Batched embed/store of {len(ready)} file(s) failed ({exc}); retrying file by file.")
+        for i, path, chunks in ready:
+            try:
+                embed_and_store(chunks, ctx)
+                logger.info(f"Stored {len(chunks)} chunks for {os.path.basename(path)}.")
+            except Exception as file_exc:
+                logger.error(f"Failed to store {path}: {file_exc}")
+                failures[i] = (file_exc, traceback.format_exc())
+    return failures
+
+
+def _dlq_message(message: Any, error: Any, tb: str) -> Dict[str, Any]:
+    return {
+        "original_event": message.value,
+        "error": str(error),
+        "traceback": tb,
+        "failed_at_offset": message.offset,
+    }
+
+
+class DeadLetterPublisher:
+    """
+    Non-blocking DLQ producer: sends are batched (linger + compression) and delivery is
+    reported through callbacks, so a burst of poison messages costs no broker round trip
+    each. Callers flush() before committing offsets of dead-lettered messages.
+    """
+    def __init__(
+        self,
+        topic: str = f"{TOPIC_NAME}_dlq",
+        linger_ms: int = settings.KAFKA_DLQ_LINGER_MS,
+        compression: str = settings.KAFKA_DLQ_COMPRESSION,
+        transport: Optional[BaseTransport] = None,
+    ):
+        self.topic = topic
+        self.producer = (transport or get_transport()).producer(
+            linger_ms=linger_ms,
+            compression_type=compression or None,
+        )
+        self.pending = 0
+        self.delivered = 0
+        self.failed = 0
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.pending += 1
+        offset = message.get("failed_at_offset")
+        future = self.producer.send(self.topic, value=message)
+        future.add_callback(self._on_delivered)
+        future.add_errback(self._on_failed, offset)
+
+    def _on_delivered(self, _metadata: Any) -> None:
+        self.delivered += 1
+
+    def _on_failed(self, offset: Any, exc: Exception) -> None:
+        self.failed += 1
+        logger.error(f"DLQ delivery failed for offset {offset}: {exc}")
+
+    def flush(self) -> None:
+        if self.pending:
+            self.producer.flush()
+            logger.info(f"{self.pending} poison message(s) forwarded to DLQ topic '{self.topic}'")
+            self.pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.producer.close()
+
+
+class CommitScheduler:
+    """
+    Coalesces offset commits: progress is committed with commit_async() at most every
+    interval_ms instead of once per message. Pending DLQ sends are flushed first, so a
+    message's offset is never committed before its dead letter is durable. commit_sync()
+    is used on shutdown and rebalance.
+
+    Only offsets reported through processed() are committed (not the consumer position),
+    so messages fetched but not yet handled at shutdown are redelivered.
+    """
+    def __init__(self, consumer: Any, dlq: DeadLetterPublisher,
+                 interval_ms: int = settings.KAFKA_COMMIT_INTERVAL_MS):
+        self.consumer = consumer
+        self.dlq = dlq
+        self.interval = interval_ms / 1000
+        self._pending: Dict[TopicPartition, OffsetAndMetadata] = {}
+        self._last_commit = time.monotonic()
+
+    def processed(self, tp: TopicPartition, offset: int) -> None:
+        self._pending[tp] = OffsetAndMetadata(offset + 1, "")
+
+    def _take(self) -> Dict[TopicPartition, OffsetAndMetadata]:
+        self.dlq.flush()
+        offsets, self._pending = self._pending, {}
+        self._last_commit = time.monotonic()
+        return offsets
+
+    def maybe_commit(self) -> None:
+        if self._pending and time.monotonic() - self._last_commit >= self.interval:
+            self.consumer.commit_async(offsets=self._take(), callback=self._on_commit)
+
+    def _on_commit(self, offsets: Any, response: Any) -> None:
+        if isinstance(response, Exception):
+            # A later commit (or the final sync commit) covers these offsets
+            logger.warning(f"Async offset commit failed: {response}")
+
+    def commit_sync(self) -> None:
+        if self._pending:
+            self.consumer.commit(offsets=self._take())
+
+
+class _CommitSyncOnRevoke(ConsumerRebalanceListener):
+    def __init__(self, scheduler: "CommitScheduler"):
+        self.scheduler = scheduler
+
+    def on_partitions_revoked(self, revoked):
+        self.scheduler.commit_sync()
+
+    def on_partitions_assigned(self, assigned):
+        pass
+
+
+def poll_batch(consumer: Any, max_records: int, timeout_ms: int) -> List[Any]:
+    """
+    Collects up to max_records messages, waiting at most timeout_ms for the batch to fill.
+    A single poll() returns as soon as anything is available, so it is repeated until the
+    batch is full or the deadline passes. Returns an empty list when nothing arrived.
+    """
+    messages: List[Any] = []
+    deadline = time.monotonic() + timeout_ms / 1000
+    while len(messages) < max_records:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            break
+        records = consumer.poll(timeout_ms=remaining_ms, max_records=max_records - len(messages))
+        for partition_messages in records.values():
+            messages.extend(partition_messages)
+    return messages
+
+
+def consume_events(use_hyde: bool = False, transport: Optional[BaseTransport] = None, defer_hyde: bool = False) -> None:
+    transport = transport or get_transport()
+    logger.info(f"Connecting to {transport} → topic '{TOPIC_NAME}'")
 
     # ------------------------------------------------------------------
     # One-time initialisation of all expensive pipeline components
     # ------------------------------------------------------------------
-    ctx = ProcessContext(use_hyde=use_hyde)
+    ctx = ProcessContext(use_hyde=use_hyde, defer_hyde=defer_hyde)
+    deferred = start_deferred_enrichment(ctx)
 
     # Reliability: Manual Commits, no auto-commit
-    consumer = KafkaConsumer(
-        TOPIC_NAME,
-        bootstrap_servers=KAFKA_BROKER,
-        group_id=GROUP_ID,
-        auto_offset_reset='earliest',
-        enable_auto_commit=False,
-        value_deserializer=lambda x: json.loads(x.decode('utf-8')),
-    )
+    consumer = transport.consumer(GROUP_ID)
 
     # Reliability: Dead-Letter Queue producer
-    dlq_producer = KafkaProducer(
-        bootstrap_servers=KAFKA_BROKER,
-        value_serializer=lambda v: json.dumps(v).encode('utf-8'),
-    )
-    dlq_topic = f"{TOPIC_NAME}_dlq"
+    dlq = DeadLetterPublisher(transport=transport)
+    commits = CommitScheduler(consumer, dlq)
+    consumer.subscribe([TOPIC_NAME], listener=_CommitSyncOnRevoke(commits))
 
     logger.info("Consumer ready — listening with strict reliability mode...")
     try:
-        for message in consumer:
-            data = message.value
+        while True:
+            # Bounded poll so coalesced commits also go out while the topic is idle
+            records = consumer.poll(timeout_ms=settings.KAFKA_COMMIT_INTERVAL_MS)
+            for tp, message in ((tp, m) for tp, partition_messages in records.items() for m in partition_messages):
+                data = message.value
+                try:
+                    if data.get("event_type") == "PDF_CREATED":
+                        file_path = data.get("file_path", "")
+                        logger.info(f"Event received: {data}")
+                        process_single_file(file_path, ctx)
+
+                except Exception as exc:
+                    logger.error(f"Failed at offset {message.offset}: {exc}")
+
+                    # Poison-message → DLQ (never block the consumer on bad messages);
+                    # its offset is committed anyway so we don't replay it forever
+                    dlq.send(_dlq_message(message, exc, traceback.format_exc()))
+
+                # Commit only after handling (coalesced, see CommitScheduler)
+                commits.processed(tp, message.offset)
+            commits.maybe_commit()
+
+    except KeyboardInterrupt:
+        logger.info("Shutting down consumer gracefully...")
+    finally:
+        commits.commit_sync()
+        consumer.close()
+        dlq.close()
+        if deferred is not None:
+            deferred.stop()
+
+
+def consume_batches(
+    use_hyde: bool = False,
+    max_records: int = settings.KAFKA_BATCH_MAX_RECORDS,
+    timeout_ms: int = settings.KAFKA_BATCH_TIMEOUT_MS,
+    workers: int = settings.KAFKA_BATCH_INGEST_WORKERS,
+    transport: Optional[BaseTransport] = None,
+    defer_hyde: bool = False,
+) -> None:
+    """
+    Batch variant of consume_events for bulk drops of many small PDFs: up to max_records
+    events (or whatever arrived within timeout_ms) are processed together by process_batch,
+    so the model sees full-size batches and storage gets one write per batch. Offsets are
+    committed only once the whole batch is stored and its failures are in the DLQ.
+    """
+    transport = transport or get_transport()
+    logger.info(
+        f"Connecting to {transport} → topic '{TOPIC_NAME}' "
+        f"(batch mode: {max_records} records / {timeout_ms} ms)"
+    )
+    ctx = ProcessContext(use_hyde=use_hyde, defer_hyde=defer_hyde)
+    deferred = start_deferred_enrichment(ctx)
+
+    consumer = transport.consumer(GROUP_ID, max_poll_records=max_records)
+    consumer.subscribe([TOPIC_NAME])
+    dlq = DeadLetterPublisher(transport=transport)
+
+    pool = _ingest_pool(workers) if workers > 1 else None
+
+    logger.info("Consumer ready — listening in batch mode...")
+    try:
+        while True:
+            messages = poll_batch(consumer, max_records, timeout_ms)
+            if not messages:
+                continue
+
+            events = [m.value for m in messages]
             try:
-                if data.get("event_type") == "PDF_CREATED":
-                    file_path = data.get("file_path", "")
-                    logger.info(f"Event received: {data}")
-                    process_single_file(file_path, ctx)
+                failures = process_batch(events, ctx, workers, pool)
+            except BrokenProcessPool:
+                # A file crashed a parser process: retry the batch once on a fresh pool
+                logger.error("Ingestion pool broke; restarting it and retrying the batch.")
+                pool = _replace_pool(pool, workers)
+                try:
+                    failures = process_batch(events, ctx, workers, pool)
+                except BrokenProcessPool as broken:
+                    pool = _replace_pool(pool, workers)
+                    tb = traceback.format_exc()
+                    failures = {i: (broken, tb) for i in range(len(events))}
+            for i, (exc, tb) in failures.items():
+                dlq.send(_dlq_message(messages[i], exc, tb))
+            dlq.flush()
+
+            # Stored or dead-lettered: the whole batch is done
+            consumer.commit()
+            logger.info(f"Committed batch of {len(messages)} event(s) ({len(failures)} failed).")
+
+    except KeyboardInterrupt:
+        logger.info("Shutting down consumer gracefully...")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        consumer.close()
+        dlq.close()
+        if deferred is not None:
+            deferred.stop()
+
+
+# =============================================================================
+# Supervisor mode: worker process pool with ordered per-partition commits
+# =============================================================================
+class OffsetTracker:
+    """
+    Tracks dispatched and finished offsets per partition. Messages may finish in any order;
+    only the offset after the highest *contiguous* finished message is committable, so a
+    crash never skips a message that was still being processed (at-least-once).
+    """
+    def __init__(self):
+        self._pending: Dict[TopicPartition, Deque[int]] = {}
+        self._done: Dict[TopicPartition, Set[int]] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        # Bumped when a partition is revoked, so late completions from before are ignored
+        self._generation: Dict[TopicPartition, int] = {}
+
+    def dispatched(self, tp: TopicPartition, offset: int) -> int:
+        """Records a dispatched message; returns the generation to pass back to finished()."""
+        self._pending.setdefault(tp, deque()).append(offset)
+        self._done.setdefault(tp, set())
+        return self._generation.get(tp, 0)
+
+    def finished(self, tp: TopicPartition, offset: int, generation: int = 0) -> None:
+        # Completions of revoked partitions are dropped; the new owner replays them
+        if tp in self._done and generation == self._generation.get(tp, 0):
+            self._done[tp].add(offset)
 
-                # Manual commit only after successful handling
-                consumer.commit()
-                logger.debug(f"Committed offset {message.offset}")
+    def committable(self, partitions: Optional[Iterable[TopicPartition]] = None) -> Dict[TopicPartition, OffsetAndMetadata]:
+        """
+        Offsets that advanced since the last call, ready for consumer.commit(offsets=...).
+        With partitions, only those are taken; the others keep their progress for later.
+        """
+        offsets = {}
+        selected = self._pending if partitions is None else {tp: self._pending[tp] for tp in partitions if tp in self._pending}
+        for tp, pending in selected.items():
+            done = self._done[tp]
+            last = None
+            while pending and pending[0] in done:
+                last = pending.popleft()
+                done.discard(last)
+            if last is not None and last + 1 > self._committed.get(tp, -1):
+                self._committed[tp] = last + 1
+                offsets[tp] = OffsetAndMetadata(last + 1, "")
+        return offsets
 
+    def forget(self, partitions: List[TopicPartition]) -> None:
+        for tp in partitions:
+            self._pending.pop(tp, None)
+            self._done.pop(tp, None)
+            self._committed.pop(tp, None)
+            self._generation[tp] = self._generation.get(tp, 0) + 1
+
+
+# One ProcessContext per worker process, created by the pool initializer
+_worker_ctx: Optional[ProcessContext] = None
+
+
+def _init_worker(use_hyde: bool, defer_hyde: bool = False, processes: int = 1) -> None:
+    global _worker_ctx
+    # Ctrl+C is handled by the supervisor, which lets in-flight messages finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    init_ocr_worker(processes)
+    _worker_ctx = ProcessContext(use_hyde=use_hyde, defer_hyde=defer_hyde)
+
+
+def _process_event(data: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """Runs in a worker process. Returns (error, traceback) instead of raising so nothing unpicklable crosses back."""
+    assert _worker_ctx is not None, "worker process was not started through _init_worker"
+    try:
+        if data.get("event_type") == "PDF_CREATED":
+            process_single_file(data.get("file_path", ""), _worker_ctx)
+        return None
+    except Exception as exc:
+        return str(exc), traceback.format_exc()
+
+
+def _worker_pool(workers: int, use_hyde: bool, defer_hyde: bool) -> ProcessPoolExecutor:
+    # spawn: workers must not inherit the consumer's sockets and background threads
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(use_hyde, defer_hyde, workers),
+    )
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    """Commits finished work of partitions being taken away, then stops tracking them."""
+    def __init__(self, consumer: Any, tracker: OffsetTracker):
+        self.consumer = consumer
+        self.tracker = tracker
+
+    def on_partitions_revoked(self, revoked):
+        offsets = self.tracker.committable(revoked)
+        if offsets:
+            self.consumer.commit(offsets=offsets)
+        self.tracker.forget(list(revoked))
+
+    def on_partitions_assigned(self, assigned):
+        pass
+
+
+def consume_with_workers(
+    use_hyde: bool = False,
+    workers: int = settings.KAFKA_CONSUMER_WORKERS,
+    max_in_flight: int = settings.KAFKA_MAX_IN_FLIGHT,
+    transport: Optional[BaseTransport] = None,
+    defer_hyde: bool = False,
+    max_worker_crashes: int = settings.KAFKA_MAX_WORKER_CRASHES,
+) -> None:
+    """
+    Supervisor variant of consume_events: this process only polls, dispatches and commits,
+    while `workers` processes (each with its own ProcessContext) run OCR, chunking and
+    encoding, so messages of one partition are processed in parallel.
+
+    At most max_in_flight messages are outstanding; when full, partitions are paused (the
+    consumer keeps polling to stay in the group) until workers catch up. Offsets are
+    committed per partition up to the highest contiguous finished message, and failed
+    messages go to the DLQ before they count as finished.
+
+    A worker process dying (segfault, OOM kill) breaks the whole pool and fails every
+    message in flight on it. The pool is rebuilt and those messages are resubmitted; one
+    that has been in flight for max_worker_crashes broken pools is dead-lettered instead,
+    so a poison message cannot stall its partition's commits forever.
+    """
+    max_in_flight = max_in_flight or 2 * workers
+    transport = transport or get_transport()
+    logger.info(
+        f"Connecting to {transport} → topic '{TOPIC_NAME}' "
+        f"(supervisor mode: {workers} workers, {max_in_flight} in flight)"
+    )
+    if use_hyde and defer_hyde:
+        logger.info("Deferred HyDE: workers store raw vectors; run `python -m src.processing.deferred_enrichment` to summarize.")
+
+    tracker = OffsetTracker()
+    consumer = transport.consumer(GROUP_ID)
+    consumer.subscribe([TOPIC_NAME], listener=_CommitOnRevoke(consumer, tracker))
+    dlq = DeadLetterPublisher(transport=transport)
+
+    executor = _worker_pool(workers, use_hyde, defer_hyde)
+    # future -> (message, tracker generation at dispatch, pool it runs on)
+    in_flight: Dict[Future, Tuple[Any, int, Any]] = {}
+    # (topic, partition, offset) -> broken pools the message was in flight on
+    crashes: Dict[Tuple[str, int, int], int] = {}
+
+    def replace_pool(broken: Any) -> None:
+        nonlocal executor
+        if executor is broken:
+            logger.error("A worker process died; starting a new worker pool.")
+            broken.shutdown(wait=False, cancel_futures=True)
+            executor = _worker_pool(workers, use_hyde, defer_hyde)
+
+    def submit(message: Any, generation: int) -> None:
+        try:
+            future = executor.submit(_process_event, message.value)
+        except BrokenProcessPool:
+            replace_pool(executor)
+            future = executor.submit(_process_event, message.value)
+        in_flight[future] = (message, generation, executor)
+
+    def settle(timeout: Optional[float]) -> None:
+        done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            message, generation, pool = in_flight.pop(future)
+            key = (message.topic, message.partition, message.offset)
+            try:
+                error = future.result()
+            except BrokenProcessPool as exc:
+                replace_pool(pool)
+                crashes[key] = crashes.get(key, 0) + 1
+                if crashes[key] < max_worker_crashes:
+                    logger.warning(f"Worker pool broke at offset {message.offset}, resubmitting: {exc}")
+                    submit(message, generation)
+                    continue
+                error = (f"Worker process died {max_worker_crashes} time(s) processing this message", "")
             except Exception as exc:
-                logger.error(f"Failed at offset {message.offset}: {exc}")
-
-                # Poison-message → DLQ (never block the consumer on bad messages)
-                dlq_message = {
-                    "original_event": data,
-                    "error": str(exc),
-                    "traceback": traceback.format_exc(),
-                    "failed_at_offset": message.offset,
-                }
-                dlq_producer.send(dlq_topic, value=dlq_message)
-                dlq_producer.flush()
-                logger.info(f"Poison message forwarded to DLQ topic '{dlq_topic}'")
-
-                # Commit anyway so we don't replay poison messages forever
-                consumer.commit()
+                # e.g. an unpicklable event; never leave an offset pending forever
+                error = (str(exc), traceback.format_exc())
+            crashes.pop(key, None)
+            if error is not None:
+                logger.error(f"Failed at offset {message.offset}: {error[0]}")
+                dlq.send(_dlq_message(message, *error))
+            tracker.finished(TopicPartition(message.topic, message.partition), message.offset, generation)
+        # Dead-lettered messages must be durable before their offsets are committed
+        dlq.flush()
+        offsets = tracker.committable()
+        if offsets:
+            consumer.commit(offsets=offsets)
+
+    def dispatch(records: Dict[TopicPartition, List[Any]]) -> None:
+        for tp, messages in records.items():
+            for message in messages:
+                submit(message, tracker.dispatched(tp, message.offset))
+
+    logger.info("Consumer ready — dispatching to worker processes...")
+    try:
+        while True:
+            capacity = max_in_flight - len(in_flight)
+            if capacity <= 0:
+                # Re-paused every round: partitions assigned by a rebalance start unpaused
+                consumer.pause(*consumer.assignment())
+                # Keeps the group membership alive. A rebalance inside this poll can still
+                # return records of newly assigned partitions: they are dispatched, never
+                # dropped, so in-flight overshoots by at most one record per rebalance.
+                dispatch(consumer.poll(timeout_ms=0, max_records=1))
+                settle(timeout=1.0)
+                continue
+            if consumer.paused():
+                consumer.resume(*consumer.paused())
+
+            dispatch(consumer.poll(timeout_ms=100 if in_flight else 1000, max_records=capacity))
+            if in_flight:
+                settle(timeout=0)
 
     except KeyboardInterrupt:
-        logger.info("Shutting down consumer gracefully...")
+        logger.info(f"Shutting down consumer gracefully, waiting for {len(in_flight)} in-flight message(s)...")
+        while in_flight:
+            settle(timeout=None)
     finally:
+        executor.shutdown(wait=True, cancel_futures=True)
         consumer.close()
-        dlq_producer.close()
+        dlq.close()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--hyde", action="store_true", help="Enable HyDE LLM enrichment")
+    parser.add_argument("--defer-hyde", action="store_true",
+                        help="Store raw-content vectors first and add HyDE summaries in the background (implies --hyde)")
+    parser.add_argument("--batch", action="store_true", help="Consume and ingest events in batches")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Process events in this many worker processes (supervisor mode)")
+    parser.add_argument("--transport", choices=["kafka", "sqlite"], default=settings.STREAMING_TRANSPORT,
+                        help="Redpanda broker or local SQLite queue")
+    parser.add_argument("--replay-dlq", action="store_true",
+                        help="Re-publish dead-lettered events to the main topic and exit")
     args = parser.parse_args()
-    consume_events(use_hyde=args.hyde)
+    transport = get_transport(args.transport)
+    use_hyde = args.hyde or args.defer_hyde
+    if args.replay_dlq:
+        replay_dead_letters(transport)
+    elif args.workers > 0:
+        consume_with_workers(use_hyde=use_hyde, workers=args.workers, transport=transport, defer_hyde=args.defer_hyde)
+    elif args.batch:
+        consume_batches(use_hyde=use_hyde, transport=transport, defer_hyde=args.defer_hyde)
+    else:
+        consume_events(use_hyde=use_hyde, transport=transport, defer_hyde=args.defer_hyde)
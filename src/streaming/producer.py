@@ -1,13 +1,14 @@
 import os
 import time
-import json
 import logging
 import argparse
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from kafka import KafkaProducer
-
 from src.config.settings import settings
+from src.streaming.transport import get_transport
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("RedpandaProducer")
@@ -15,51 +16,209 @@ logger = logging.getLogger("RedpandaProducer")
 KAFKA_BROKER = settings.KAFKA_BROKER
 TOPIC_NAME = settings.KAFKA_TOPIC_NAME
 
-# Initialize Kafka Producer
-producer = KafkaProducer(
-    bootstrap_servers=KAFKA_BROKER,
-    value_serializer=lambda v: json.dumps(v).encode('utf-8')
-)
+# Published (size, mtime) remembered per path to drop duplicate events for an unchanged file
+PUBLISHED_HISTORY_SIZE = 100_000
+# How long to wait for the broker to acknowledge an event once the batch was flushed
+DELIVERY_TIMEOUT_SECONDS = 10
+
+_producer: Optional[Any] = None
+
+
+def get_producer() -> Any:
+    """Producer of the configured transport, created on first use (importing this module does not connect)."""
+    global _producer
+    if _producer is None:
+        _producer = get_transport().producer(
+            linger_ms=settings.KAFKA_PRODUCER_LINGER_MS,
+            compression_type=settings.KAFKA_PRODUCER_COMPRESSION or None,
+        )
+    return _producer
+
+
+def is_pdf(path: str) -> bool:
+    return path.lower().endswith('.pdf')
+
+
+class StableFileTracker:
+    """
+    Debounces file events: a path is only reported once its size and mtime have not changed
+    for stable_seconds. Repeated events for a pending path just reset its clock, and a file
+    already published with the same size and mtime is not reported again.
+    """
+    def __init__(self, stable_seconds: float = settings.WATCH_STABLE_SECONDS):
+        self.stable_seconds = stable_seconds
+        # path -> ((size, mtime) last seen, monotonic time it was first seen like that)
+        self._pending: Dict[str, Tuple[Optional[Tuple[int, float]], float]] = {}
+        self._published: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        # path -> (size, mtime) handed out by ready() but not yet confirmed as published
+        self._settled: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat(path: str) -> Optional[Tuple[int, float]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime
+
+    def touch(self, path: str) -> None:
+        with self._lock:
+            self._pending[path] = (None, time.monotonic())
+
+    def discard(self, path: str) -> None:
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def ready(self) -> List[str]:
+        """
+        Pending paths that have stopped changing, removed from the pending set. They only count
+        as published once mark_published is called, so a failed send can be retried.
+        """
+        with self._lock:
+            snapshot = list(self._pending.items())
+        # Stat without the lock so the observer thread is not blocked on slow filesystems
+        stats = [(path, entry, self._stat(path)) for path, entry in snapshot]
+
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for path, entry, current in stats:
+                if self._pending.get(path) != entry:
+                    # Touched or discarded while we were stat-ing; look again next round
+                    continue
+                seen, since = entry
+                if current is None:
+                    # Deleted or moved away before it settled
+                    del self._pending[path]
+                elif current != seen:
+                    self._pending[path] = (current, now)
+                elif now - since >= self.stable_seconds:
+                    del self._pending[path]
+                    if self._published.get(path) == current:
+                        continue
+                    self._settled[path] = current
+                    ready.append(path)
+        return ready
+
+    def mark_published(self, paths: List[str]) -> None:
+        """Remembers the settled (size, mtime) of paths whose events were sent and flushed."""
+        with self._lock:
+            for path in paths:
+                current = self._settled.pop(path, None)
+                if current is None:
+                    continue
+                self._published[path] = current
+                self._published.move_to_end(path)
+                if len(self._published) > PUBLISHED_HISTORY_SIZE:
+                    self._published.popitem(last=False)
+
+    def retry(self, paths: List[str]) -> None:
+        """Puts paths whose events failed to publish back into the pending set."""
+        with self._lock:
+            for path in paths:
+                self._settled.pop(path, None)
+                self._pending.setdefault(path, (None, time.monotonic()))
+
 
 class PDFHandler(FileSystemEventHandler):
+    """Feeds created, modified and moved-in PDFs into the stability tracker."""
+    def __init__(self, tracker: StableFileTracker):
+        self.tracker = tracker
+
     def on_created(self, event):
-        if not event.is_directory and event.src_path.endswith('.pdf'):
+        if not event.is_directory and is_pdf(event.src_path):
             logger.info(f"New PDF detected: {event.src_path}")
-            self.publish_to_kafka(event.src_path)
+            self.tracker.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and is_pdf(event.src_path):
+            self.tracker.touch(event.src_path)
+
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        self.tracker.discard(event.src_path)
+        # Covers renames to .pdf and the temp-file-then-rename pattern of copy tools
+        if is_pdf(event.dest_path):
+            logger.info(f"PDF moved in: {event.dest_path}")
+            self.tracker.touch(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.tracker.discard(event.src_path)
+
 
-    def publish_to_kafka(self, file_path):
+def publish_batch(file_paths: List[str], tracker: Optional[StableFileTracker] = None) -> int:
+    """
+    Publishes one event per file and flushes once for the whole batch. Returns events delivered.
+    With a tracker, files are marked published only once the broker acknowledged their event;
+    the rest go back to its pending set to be published again.
+    """
+    if not file_paths:
+        return 0
+    producer = get_producer()
+    futures: List[Tuple[str, Any]] = []
+    failed: List[str] = []
+    for file_path in file_paths:
+        message = {
+            "event_type": "PDF_CREATED",
+            "file_path": file_path,
+            "filename": os.path.basename(file_path),
+            "timestamp": time.time()
+        }
         try:
-            filename = os.path.basename(file_path)
-            message = {
-                "event_type": "PDF_CREATED",
-                "file_path": file_path,
-                "filename": filename,
-                "timestamp": time.time()
-            }
-            producer.send(TOPIC_NAME, value=message)
-            producer.flush()
-            logger.info(f"Successfully published event for {filename} to {TOPIC_NAME}")
+            futures.append((file_path, producer.send(TOPIC_NAME, value=message)))
         except Exception as e:
-            logger.error(f"Failed to publish to Kafka: {e}")
+            logger.error(f"Failed to publish {file_path} to Kafka: {e}")
+            failed.append(file_path)
+    try:
+        producer.flush()
+    except Exception as e:
+        logger.error(f"Failed to flush events to Kafka: {e}")
+        failed.extend(file_path for file_path, _ in futures)
+        futures = []
+    # flush() does not raise for records the broker rejected; their futures do
+    delivered: List[str] = []
+    for file_path, future in futures:
+        try:
+            future.get(timeout=DELIVERY_TIMEOUT_SECONDS)
+            delivered.append(file_path)
+        except Exception as e:
+            logger.error(f"Failed to deliver the event for {file_path} to Kafka: {e}")
+            failed.append(file_path)
+    if tracker is not None:
+        tracker.mark_published(delivered)
+        tracker.retry(failed)
+    logger.info(f"Published {len(delivered)} event(s) to {TOPIC_NAME}")
+    return len(delivered)
+
+
+def watch_directory(directory: str, stable_seconds: float = settings.WATCH_STABLE_SECONDS):
+    logger.info(f"Starting directory watcher on: {directory} (recursive, {stable_seconds}s stability window)")
+    logger.info(f"Connecting to {get_transport()}")
 
-def watch_directory(directory: str):
-    logger.info(f"Starting directory watcher on: {directory}")
-    logger.info(f"Connecting to Redpanda at {KAFKA_BROKER}")
-    
     if not os.path.exists(directory):
         os.makedirs(directory)
-        
-    event_handler = PDFHandler()
+
+    tracker = StableFileTracker(stable_seconds)
+    event_handler = PDFHandler(tracker)
     observer = Observer()
-    observer.schedule(event_handler, path=directory, recursive=False)
+    observer.schedule(event_handler, path=directory, recursive=True)
     observer.start()
-    
+
     try:
         while True:
-            time.sleep(1)
+            time.sleep(settings.WATCH_POLL_SECONDS)
+            publish_batch(tracker.ready(), tracker)
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    if _producer is not None:
+        _producer.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -0,0 +1,491 @@
+import os
+import time
+import uuid
+import json
+import sqlite3
+import logging
+import threading
+from collections import namedtuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from kafka import KafkaConsumer, KafkaProducer
+from kafka.structs import OffsetAndMetadata, TopicPartition
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Same attribute names as kafka-python's ConsumerRecord / RecordMetadata for the fields the pipeline uses
+LocalRecord = namedtuple("LocalRecord", ["topic", "partition", "offset", "timestamp", "key", "value"])
+LocalRecordMetadata = namedtuple("LocalRecordMetadata", ["topic", "partition", "offset"])
+
+# How often a blocking poll() re-checks the queue file for new messages
+POLL_INTERVAL_SECONDS = 0.05
+
+
+def _serialize(value: Any) -> bytes:
+    return json.dumps(value).encode('utf-8')
+
+
+def _deserialize(value: bytes) -> Any:
+    return json.loads(value.decode('utf-8'))
+
+
+class BaseTransport:
+    """
+    Creates the consumer and producer used by the streaming layer. Both expose the subset
+    of the kafka-python API the pipeline relies on (subscribe/poll/commit/commit_async/
+    pause/resume/seek on the consumer; send/flush/close on the producer), with JSON values.
+    """
+    def consumer(self, group_id: str = settings.KAFKA_GROUP_ID, **options: Any) -> Any:
+        raise NotImplementedError
+
+    def producer(self, **options: Any) -> Any:
+        raise NotImplementedError
+
+
+class KafkaTransport(BaseTransport):
+    """Redpanda / Kafka broker through kafka-python. Offsets are always committed manually."""
+    def __init__(self, bootstrap_servers: str = settings.KAFKA_BROKER):
+        self.bootstrap_servers = bootstrap_servers
+
+    def __str__(self) -> str:
+        return f"Redpanda at {self.bootstrap_servers}"
+
+    def consumer(self, group_id: str = settings.KAFKA_GROUP_ID, **options: Any) -> KafkaConsumer:
+        return KafkaConsumer(
+            bootstrap_servers=self.bootstrap_servers,
+            group_id=group_id,
+            auto_offset_reset=options.pop("auto_offset_reset", 'earliest'),
+            enable_auto_commit=False,
+            value_deserializer=_deserialize,
+            **options,
+        )
+
+    def producer(self, **options: Any) -> KafkaProducer:
+        return KafkaProducer(
+            bootstrap_servers=self.bootstrap_servers,
+            value_serializer=_serialize,
+            **options,
+        )
+
+
+# =============================================================================
+# Local durable queue: one SQLite file, no broker
+# =============================================================================
+class SQLiteQueue:
+    """
+    Append-only, partitioned message log with per-group committed offsets and group
+    membership, in a single SQLite file (WAL mode, so several processes can share it).
+    """
+    def __init__(self, path: str = settings.STREAMING_QUEUE_PATH, partitions: int = settings.STREAMING_QUEUE_PARTITIONS):
+        self.path = path
+        self.default_partitions = partitions
+        output_dir = os.path.dirname(path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS topics (topic TEXT PRIMARY KEY, partitions INTEGER NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages (topic TEXT NOT NULL, partition INTEGER NOT NULL, "
+            "offset INTEGER NOT NULL, timestamp REAL NOT NULL, key BLOB, value BLOB NOT NULL, "
+            "PRIMARY KEY (topic, partition, offset))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS offsets (group_id TEXT NOT NULL, topic TEXT NOT NULL, "
+            "partition INTEGER NOT NULL, offset INTEGER NOT NULL, PRIMARY KEY (group_id, topic, partition))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS members (group_id TEXT NOT NULL, member_id TEXT NOT NULL, "
+            "heartbeat REAL NOT NULL, PRIMARY KEY (group_id, member_id))"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def partitions_for(self, topic: str) -> int:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO topics (topic, partitions) VALUES (?, ?)", (topic, self.default_partitions)
+            )
+            (partitions,) = self._conn.execute("SELECT partitions FROM topics WHERE topic = ?", (topic,)).fetchone()
+        return partitions
+
+    def append(self, records: List[Tuple[str, int, Optional[bytes], bytes]]) -> List[int]:
+        """Appends (topic, partition, key, value) records in one transaction; returns their offsets."""
+        offsets = []
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                next_offsets: Dict[Tuple[str, int], int] = {}
+                for topic, partition, key, value in records:
+                    tp = (topic, partition)
+                    if tp not in next_offsets:
+                        (last,) = self._conn.execute(
+                            "SELECT MAX(offset) FROM messages WHERE topic = ? AND partition = ?", tp
+                        ).fetchone()
+                        next_offsets[tp] = -1 if last is None else last
+                    next_offsets[tp] += 1
+                    offsets.append(next_offsets[tp])
+                self._conn.executemany(
+                    "INSERT INTO messages (topic, partition, offset, timestamp, key, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(t, p, o, now, k, v) for (t, p, k, v), o in zip(records, offsets)],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return offsets
+
+    def fetch(self, topic: str, partition: int, offset: int, limit: int) -> List[Tuple[int, float, Optional[bytes], bytes]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT offset, timestamp, key, value FROM messages WHERE topic = ? AND partition = ? AND offset >= ? "
+                "ORDER BY offset LIMIT ?",
+                (topic, partition, offset, limit),
+            ).fetchall()
+
+    def end_offset(self, topic: str, partition: int) -> int:
+        with self._lock:
+            (last,) = self._conn.execute(
+                "SELECT MAX(offset) FROM messages WHERE topic = ? AND partition = ?", (topic, partition)
+            ).fetchone()
+        return 0 if last is None else last + 1
+
+    def committed(self, group_id: str, topic: str, partition: int) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset FROM offsets WHERE group_id = ? AND topic = ? AND partition = ?",
+                (group_id, topic, partition),
+            ).fetchone()
+        return row[0] if row else None
+
+    def commit(self, group_id: str, offsets: Dict[TopicPartition, int]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO offsets (group_id, topic, partition, offset) VALUES (?, ?, ?, ?)",
+                [(group_id, tp.topic, tp.partition, offset) for tp, offset in offsets.items()],
+            )
+
+    def heartbeat(self, group_id: str, member_id: str, session_timeout: float) -> List[str]:
+        """Refreshes this member and returns the sorted ids of the group's live members."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO members (group_id, member_id, heartbeat) VALUES (?, ?, ?)",
+                (group_id, member_id, now),
+            )
+            self._conn.execute(
+                "DELETE FROM members WHERE group_id = ? AND heartbeat < ?", (group_id, now - session_timeout)
+            )
+            rows = self._conn.execute(
+                "SELECT member_id FROM members WHERE group_id = ? ORDER BY member_id", (group_id,)
+            ).fetchall()
+        return [member for (member,) in rows]
+
+    def leave(self, group_id: str, member_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM members WHERE group_id = ? AND member_id = ?", (group_id, member_id))
+
+
+class _SendFuture:
+    """Minimal stand-in for kafka-python's FutureRecordMetadata, resolved on flush."""
+    def __init__(self):
+        self._callbacks: List[Tuple[Callable, Tuple]] = []
+        self._errbacks: List[Tuple[Callable, Tuple]] = []
+        self.value: Any = None
+        self.exception: Optional[BaseException] = None
+        self.is_done = False
+
+    def add_callback(self, fn: Callable, *args: Any) -> "_SendFuture":
+        if self.is_done and self.exception is None:
+            fn(*args, self.value)
+        else:
+            self._callbacks.append((fn, args))
+        return self
+
+    def add_errback(self, fn: Callable, *args: Any) -> "_SendFuture":
+        if self.is_done and self.exception is not None:
+            fn(*args, self.exception)
+        else:
+            self._errbacks.append((fn, args))
+        return self
+
+    def success(self, value: Any) -> None:
+        self.value, self.is_done = value, True
+        for fn, args in self._callbacks:
+            fn(*args, value)
+
+    def failure(self, exc: BaseException) -> None:
+        self.exception, self.is_done = exc, True
+        for fn, args in self._errbacks:
+            fn(*args, exc)
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        if self.exception is not None:
+            raise self.exception
+        return self.value
+
+
+class SQLiteProducer:
+    """
+    Buffers sends and appends them in one transaction per flush (or every batch_size
+    sends). Like a lingering Kafka producer, messages are visible to consumers only after
+    flush() or close(). Kafka-only options (linger_ms, compression_type, ...) are ignored.
+    """
+    def __init__(self, queue: SQLiteQueue, batch_size: int = 500, **_kafka_options: Any):
+        self.queue = queue
+        self.batch_size = batch_size
+        self._buffer: List[Tuple[str, int, Optional[bytes], bytes]] = []
+        self._futures: List[_SendFuture] = []
+        self._round_robin = 0
+        self._lock = threading.Lock()
+
+    def send(self, topic: str, value: Any = None, key: Optional[bytes] = None, partition: Optional[int] = None) -> _SendFuture:
+        if partition is None:
+            partitions = self.queue.partitions_for(topic)
+            if key is not None:
+                partition = int.from_bytes(key[:8].ljust(8, b"\0"), "little") % partitions
+            else:
+                partition = self._round_robin % partitions
+                self._round_robin += 1
+        future = _SendFuture()
+        with self._lock:
+            self._buffer.append((topic, partition, key, _serialize(value)))
+            self._futures.append(future)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+        return future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        with self._lock:
+            records, futures = self._buffer, self._futures
+            self._buffer, self._futures = [], []
+        if not records:
+            return
+        try:
+            offsets = self.queue.append(records)
+        except Exception as e:
+            logger.error(f"Failed to append {len(records)} message(s) to {self.queue.path}: {e}")
+            for future in futures:
+                future.failure(e)
+            return
+        for (topic, partition, _, _), offset, future in zip(records, offsets, futures):
+            future.success(LocalRecordMetadata(topic, partition, offset))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.flush()
+
+
+class SQLiteConsumer:
+    """
+    Group consumer over a SQLiteQueue. Members of a group heartbeat into the queue file and
+    split the partitions of the subscribed topics by sorted member id; membership is
+    re-checked on every poll, with the rebalance listener told about revoked and newly
+    assigned partitions. Offsets are committed per group, so a restarted consumer resumes
+    where its group left off.
+
+    Like kafka-python, heartbeats are sent from a background thread once subscribed, so a
+    member stays in the group while it spends minutes on one message between polls.
+    """
+    def __init__(
+        self,
+        queue: SQLiteQueue,
+        group_id: str,
+        auto_offset_reset: str = 'earliest',
+        max_poll_records: int = 500,
+        session_timeout_ms: int = settings.STREAMING_SESSION_TIMEOUT_MS,
+        heartbeat_interval_ms: int = settings.STREAMING_HEARTBEAT_INTERVAL_MS,
+        **_kafka_options: Any,
+    ):
+        self.queue = queue
+        self.group_id = group_id
+        self.auto_offset_reset = auto_offset_reset
+        self.max_poll_records = max_poll_records
+        self.session_timeout = session_timeout_ms / 1000
+        self.heartbeat_interval = heartbeat_interval_ms / 1000
+        self.member_id = uuid.uuid4().hex
+        self._topics: List[str] = []
+        self._listener: Any = None
+        self._assignment: Set[TopicPartition] = set()
+        self._positions: Dict[TopicPartition, int] = {}
+        self._paused: Set[TopicPartition] = set()
+        self._heartbeat_stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+    def subscribe(self, topics: Iterable[str], listener: Any = None) -> None:
+        self._topics = list(topics)
+        self._listener = listener
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat_loop, name=f"sqlite-heartbeat-{self.member_id[:8]}", daemon=True
+            )
+            self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._heartbeat_stop.wait(self.heartbeat_interval):
+            try:
+                self.queue.heartbeat(self.group_id, self.member_id, self.session_timeout)
+            except Exception as e:
+                logger.warning(f"Heartbeat of member {self.member_id[:8]} failed: {e}")
+
+    def assignment(self) -> Set[TopicPartition]:
+        return set(self._assignment)
+
+    def _rebalance(self) -> None:
+        members = self.queue.heartbeat(self.group_id, self.member_id, self.session_timeout)
+        index, size = members.index(self.member_id), len(members)
+        assigned = {
+            TopicPartition(topic, p)
+            for topic in self._topics
+            for p in range(self.queue.partitions_for(topic))
+            if p % size == index
+        }
+        if assigned == self._assignment:
+            return
+        revoked, added = self._assignment - assigned, assigned - self._assignment
+        if revoked and self._listener is not None:
+            self._listener.on_partitions_revoked(revoked)
+        self._assignment = assigned
+        for tp in revoked:
+            self._positions.pop(tp, None)
+            self._paused.discard(tp)
+        logger.info(f"Group '{self.group_id}' member {self.member_id[:8]}: assigned {len(assigned)} partition(s).")
+        if added and self._listener is not None:
+            self._listener.on_partitions_assigned(added)
+
+    def position(self, tp: TopicPartition) -> int:
+        if tp not in self._positions:
+            committed = self.queue.committed(self.group_id, tp.topic, tp.partition)
+            if committed is not None:
+                self._positions[tp] = committed
+            elif self.auto_offset_reset == 'latest':
+                self._positions[tp] = self.queue.end_offset(tp.topic, tp.partition)
+            else:
+                self._positions[tp] = 0
+        return self._positions[tp]
+
+    def poll(self, timeout_ms: int = 0, max_records: Optional[int] = None) -> Dict[TopicPartition, List[LocalRecord]]:
+        deadline = time.monotonic() + timeout_ms / 1000
+        limit = max_records or self.max_poll_records
+        while True:
+            self._rebalance()
+            records: Dict[TopicPartition, List[LocalRecord]] = {}
+            remaining = limit
+            for tp in sorted(self._assignment - self._paused):
+                if remaining <= 0:
+                    break
+                rows = self.queue.fetch(tp.topic, tp.partition, self.position(tp), remaining)
+                if rows:
+                    records[tp] = [
+                        LocalRecord(tp.topic, tp.partition, offset, timestamp, key, _deserialize(value))
+                        for offset, timestamp, key, value in rows
+                    ]
+                    self._positions[tp] = rows[-1][0] + 1
+                    remaining -= len(rows)
+            if records or time.monotonic() >= deadline:
+                return records
+            time.sleep(min(POLL_INTERVAL_SECONDS, max(0.0, deadline - time.monotonic())))
+
+    def commit(self, offsets: Optional[Dict[TopicPartition, OffsetAndMetadata]] = None) -> None:
+        if offsets is None:
+            to_commit = {tp: self._positions[tp] for tp in self._assignment if tp in self._positions}
+        else:
+            to_commit = {tp: om.offset for tp, om in offsets.items()}
+        if to_commit:
+            self.queue.commit(self.group_id, to_commit)
+
+    def commit_async(self, offsets: Optional[Dict[TopicPartition, OffsetAndMetadata]] = None,
+                     callback: Optional[Callable[[Any, Any], None]] = None) -> None:
+        # A local commit is one small write, so it simply runs inline
+        try:
+            self.commit(offsets)
+            result: Any = None
+        except Exception as e:
+            result = e
+        if callback is not None:
+            callback(offsets, result)
+
+    def pause(self, *partitions: TopicPartition) -> None:
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition) -> None:
+        self._paused.difference_update(partitions)
+
+    def paused(self) -> Set[TopicPartition]:
+        return set(self._paused)
+
+    def seek(self, partition: TopicPartition, offset: int) -> None:
+        self._positions[partition] = offset
+
+    def seek_to_beginning(self, *partitions: TopicPartition) -> None:
+        for tp in partitions or tuple(self._assignment):
+            self._positions[tp] = 0
+
+    def close(self, autocommit: bool = False) -> None:
+        self._heartbeat_stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        self.queue.leave(self.group_id, self.member_id)
+
+
+class SQLiteTransport(BaseTransport):
+    """Durable local queue (one SQLite file) for running and load-testing the event path without a broker."""
+    def __init__(self, path: str = settings.STREAMING_QUEUE_PATH, partitions: int = settings.STREAMING_QUEUE_PARTITIONS):
+        self.path = path
+        self.partitions = partitions
+
+    def __str__(self) -> str:
+        return f"local queue {self.path}"
+
+    def consumer(self, group_id: str = settings.KAFKA_GROUP_ID, **options: Any) -> SQLiteConsumer:
+        return SQLiteConsumer(SQLiteQueue(self.path, self.partitions), group_id, **options)
+
+    def producer(self, **options: Any) -> SQLiteProducer:
+        return SQLiteProducer(SQLiteQueue(self.path, self.partitions), **options)
+
+
+def get_transport(type: str = settings.STREAMING_TRANSPORT) -> BaseTransport:
+    if type == "kafka":
+        return KafkaTransport()
+    elif type == "sqlite":
+        return SQLiteTransport()
+    else:
+        raise ValueError(f"Unknown streaming transport: {type}")
+
+
+def replay_dead_letters(
+    transport: BaseTransport,
+    dlq_topic: str = f"{settings.KAFKA_TOPIC_NAME}_dlq",
+    target_topic: str = settings.KAFKA_TOPIC_NAME,
+    group_id: Optional[str] = None,
+    idle_timeout_ms: int = 2000,
+) -> int:
+    """
+    Re-publishes the original events of dead-lettered messages to target_topic (e.g. after
+    fixing the bug that poisoned them). Progress is tracked under its own consumer group,
+    so each dead letter is replayed once. Returns the number of events replayed.
+    """
+    consumer = transport.consumer(group_id or f"{dlq_topic}_replay")
+    consumer.subscribe([dlq_topic])
+    producer = transport.producer()
+    replayed = 0
+    try:
+        while True:
+            records = consumer.poll(timeout_ms=idle_timeout_ms)
+            if not records:
+                break
+            for messages in records.values():
+                for message in messages:
+                    producer.send(target_topic, value=message.value.get("original_event", message.value))
+                    replayed += 1
+            producer.flush()
+            consumer.commit()
+    finally:
+        producer.close()
+        consumer.close()
+    logger.info(f"Replayed {replayed} dead letter(s) from '{dlq_topic}' to '{target_topic}'.")
+    return replayed
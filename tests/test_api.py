@@ -4,6 +4,7 @@ All tests run against the FastAPI TestClient — no live server required.
 """
 
 import os
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 
@@ -85,3 +86,176 @@ def test_search_accepts_correct_api_key():
     # Should pass auth (not 403) but fail because storage is parquet not qdrant
     assert resp.status_code in (200, 503, 500)
     assert resp.status_code != 403
+
+
+def test_search_uses_local_index_for_parquet_backend():
+    from unittest.mock import MagicMock
+    from src.embedding.embedder import MockEmbedder
+
+    app.state.embedder = MockEmbedder(dimension=8)
+    app.state.local_index = MagicMock()
+    app.state.local_index.search.return_value = [
+        {"chunk_id": "c1", "text": "hello", "score": 0.9, "metadata": {"source": "a.pdf"}}
+    ]
+    try:
+        with patch("src.api.app.settings.STORAGE_TYPE", "parquet"):
+            resp = client.post(
+                "/search",
+                json={"query": "hello", "top_k": 1},
+                headers={"X-API-Key": "test-secret-key"},
+            )
+    finally:
+        del app.state.local_index
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["chunk_id"] == "c1"
+
+
+def test_metrics_expose_query_cache_stats():
+    from src.embedding.cache import QueryCachedEmbedder
+    from src.embedding.embedder import MockEmbedder
+
+    app.state.embedder = QueryCachedEmbedder(MockEmbedder(dimension=8), max_items=10)
+    app.state.embedder.embed_documents(["hello", "hello"])
+
+    body = client.get("/metrics").text
+    assert "query_embedding_cache_hits_total 1.0" in body
+    assert "query_embedding_cache_size 1.0" in body
+
+
+def test_async_search_uses_micro_batcher_and_local_index():
+    from unittest.mock import MagicMock
+    from src.embedding.embedder import MockEmbedder
+
+    app.state.embedder = MockEmbedder(dimension=8)
+    app.state.local_index = MagicMock()
+    app.state.local_index.search.return_value = [
+        {"chunk_id": "c2", "text": "async", "score": 0.8, "metadata": {}}
+    ]
+    try:
+        with patch("src.api.app.settings.STORAGE_TYPE", "parquet"):
+            resp = client.post(
+                "/search/async",
+                json={"query": "hello", "top_k": 1},
+                headers={"X-API-Key": "test-secret-key"},
+            )
+    finally:
+        del app.state.local_index
+
+    assert resp.status_code == 200
+    assert resp.json()[0]["chunk_id"] == "c2"
+    assert app.state.batcher.queries == 1
+
+
+def test_batch_search_returns_results_per_query_from_qdrant():
+    from qdrant_client import QdrantClient, models
+    from src.embedding.embedder import MockEmbedder
+
+    embedder = MockEmbedder(dimension=8)
+    texts = ["alpha", "beta", "gamma"]
+    qdrant = QdrantClient(":memory:")
+    qdrant.create_collection("batch_test", vectors_config=models.VectorParams(size=8, distance=models.Distance.COSINE))
+    qdrant.upsert("batch_test", points=models.Batch(
+        ids=list(range(3)), vectors=embedder.embed_documents(texts).tolist(), payloads=[{"text": t} for t in texts]
+    ))
+    app.state.embedder = embedder
+    app.state.qdrant_client = qdrant
+
+    with (
+        patch("src.api.app.settings.STORAGE_TYPE", "qdrant"),
+        patch("src.api.app.settings.QDRANT_COLLECTION_NAME", "batch_test"),
+    ):
+        resp = client.post(
+            "/search/batch",
+            json={"queries": [{"query": "gamma", "top_k": 1}, {"query": "alpha", "top_k": 2}]},
+            headers={"X-API-Key": "test-secret-key"},
+        )
+
+    assert resp.status_code == 200
+    results = resp.json()
+    assert [len(r) for r in results] == [1, 2]
+    assert results[0][0]["text"] == "gamma"
+    assert results[1][0]["text"] == "alpha"
+
+
+def test_batch_rate_limit_cost_scales_with_query_count():
+    from types import SimpleNamespace
+    from src.api.app import _batch_cost
+
+    with patch("src.api.app.settings.SEARCH_BATCH_QUERIES_PER_COST", 10):
+        assert _batch_cost(SimpleNamespace(state=SimpleNamespace(batch_size=1))) == 1
+        assert _batch_cost(SimpleNamespace(state=SimpleNamespace(batch_size=25))) == 3
+
+
+def test_search_response_cache_skips_embedder_until_version_changes():
+    from unittest.mock import MagicMock
+    from src.api.response_cache import SearchResponseCache
+    from src.embedding.embedder import MockEmbedder
+
+    version = {"value": 1}
+    embedder = MockEmbedder(dimension=8)
+    embedder.embed_documents = MagicMock(wraps=embedder.embed_documents)
+    app.state.embedder = embedder
+    app.state.local_index = MagicMock()
+    app.state.local_index.search.return_value = [
+        {"chunk_id": "c3", "text": "cached", "score": 0.7, "metadata": {}}
+    ]
+    app.state.response_cache = SearchResponseCache(lambda: version["value"], max_items=10, refresh_seconds=0)
+
+    def search(query):
+        return client.post("/search", json={"query": query, "top_k": 1}, headers={"X-API-Key": "test-secret-key"})
+
+    try:
+        with patch("src.api.app.settings.STORAGE_TYPE", "parquet"):
+            assert search("Cached  query").status_code == 200
+            # Whitespace-only differences hit the same entry
+            assert search(" Cached query").json()[0]["chunk_id"] == "c3"
+            assert embedder.embed_documents.call_count == 1
+
+            version["value"] = 2
+            search("Cached query")
+            assert embedder.embed_documents.call_count == 2
+            assert app.state.response_cache.stats["invalidations"] == 1
+    finally:
+        del app.state.local_index
+        del app.state.response_cache
+
+
+def test_response_cache_hit_makes_no_qdrant_calls():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+    from src.api.response_cache import SearchResponseCache
+    from src.storage.manager import read_collection_version
+
+    qdrant = MagicMock()
+    qdrant.collection_exists.return_value = True
+    qdrant.retrieve.return_value = [SimpleNamespace(payload={"version": 7})]
+    cache = SearchResponseCache(lambda: read_collection_version(qdrant, "docs"), max_items=10)
+
+    _, version = cache.get("q")
+    cache.put("q", ["result"], version)
+    qdrant.reset_mock()
+
+    assert cache.get("q") == (["result"], 7)
+    assert qdrant.method_calls == []
+
+
+def test_response_cache_reads_version_outside_the_lock_and_never_serves_stale():
+    from src.api.response_cache import SearchResponseCache
+
+    version = {"value": 1}
+    lock_held = []
+
+    def read_version():
+        lock_held.append(cache._lock.locked())
+        return version["value"]
+
+    cache = SearchResponseCache(read_version, max_items=10, refresh_seconds=0)
+    _, v = cache.get("q")
+    cache.put("q", ["result"], v)
+    assert cache.get("q")[0] == ["result"]
+
+    # Without a refresh window every lookup re-reads the version, so a write is visible immediately
+    version["value"] = 2
+    assert cache.get("q") == (None, 2)
+    assert lock_held and not any(lock_held)
@@ -0,0 +1,79 @@
+"""
+Tests for the async query micro-batcher.
+"""
+
+import asyncio
+from typing import List
+import numpy as np
+from src.api.batching import MicroBatcher
+
+
+class RecordingEmbed:
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        self.calls.append(list(texts))
+        return np.array([[len(t)] for t in texts], dtype=np.float32)
+
+
+async def _submit_all(batcher: MicroBatcher, texts: List[str]):
+    try:
+        return await asyncio.gather(*(batcher.submit(t) for t in texts))
+    finally:
+        await batcher.stop()
+
+
+def test_concurrent_queries_share_one_model_call():
+    embed = RecordingEmbed()
+    texts = [f"q{'x' * i}" for i in range(10)]
+
+    results = asyncio.run(_submit_all(MicroBatcher(embed, max_batch_size=32, max_wait_ms=50), texts))
+
+    assert embed.calls == [texts]
+    assert [batch[i][0] for batch, i in results] == [len(t) for t in texts]
+
+
+def test_batches_are_capped_at_max_size():
+    embed = RecordingEmbed()
+
+    asyncio.run(_submit_all(MicroBatcher(embed, max_batch_size=2, max_wait_ms=50), ["a", "b", "c", "d", "e"]))
+
+    assert [len(call) for call in embed.calls] == [2, 2, 1]
+
+
+def test_model_errors_reach_every_caller_and_batcher_keeps_running():
+    calls = []
+
+    def flaky(texts):
+        calls.append(texts)
+        if len(calls) == 1:
+            raise RuntimeError("model crashed")
+        return np.zeros((len(texts), 1), dtype=np.float32)
+
+    async def scenario():
+        batcher = MicroBatcher(flaky, max_wait_ms=20)
+        try:
+            results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+            assert all(isinstance(r, RuntimeError) for r in results)
+            _, index = await batcher.submit("c")
+            return index
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_close_answers_queued_queries_before_stopping_the_worker():
+    embed = RecordingEmbed()
+
+    async def scenario():
+        batcher = MicroBatcher(embed, max_batch_size=2, max_wait_ms=20)
+        pending = [asyncio.ensure_future(batcher.submit(t)) for t in ["a", "b", "c"]]
+        await asyncio.sleep(0)
+        await batcher.close()
+        assert batcher._worker is None
+        return [index for _, index in await asyncio.gather(*pending)]
+
+    assert asyncio.run(scenario()) == [0, 1, 0]
+    assert [len(call) for call in embed.calls] == [2, 1]
@@ -82,3 +82,441 @@ def test_process_single_file_calls_storage_save():
         process_single_file("/some/file.pdf", fake_ctx)
 
         fake_ctx.storage.save_embeddings.assert_called_once_with([fake_chunk], [[0.1] * 768])
+
+
+# -------------------------------------------------------------------------
+# Batch mode — pooled embedding / storage and per-file failures
+# -------------------------------------------------------------------------
+def _batch_ctx():
+    ctx = MagicMock()
+    ctx.use_hyde = False
+    ctx.chunker.split.side_effect = lambda docs: [
+        ProcessedChunk(parent_doc_id=docs[0].id, content=f"{docs[0].filename} {i}", chunk_index=i) for i in range(2)
+    ]
+    ctx.embedder.embed_documents.side_effect = lambda texts: [[0.1]] * len(texts)
+    return ctx
+
+
+def _load(path):
+    if "bad" in path:
+        return None
+    return IngestedDocument(filename=path.rsplit("/", 1)[-1], content="text", metadata={"source": path})
+
+
+def _iter_documents(files, executor=None):
+    # Completion order, as the loader's process pool yields them
+    return (doc for doc in map(_load, reversed(files)) if doc)
+
+
+def test_process_batch_pools_files_into_one_embed_and_store():
+    ctx = _batch_ctx()
+    events = [{"event_type": "PDF_CREATED", "file_path": f"/in/{name}.pdf"} for name in ("a", "bad", "c")]
+    events.append({"event_type": "OTHER"})
+
+    with patch("src.streaming.consumer.MultimodalLoader") as mock_loader_class:
+        mock_loader_class.return_value.iter_documents.side_effect = _iter_documents
+        from src.streaming.consumer import process_batch
+
+        failures = process_batch(events, ctx, workers=3)
+
+    # Files are parsed by the loader's process pool, not one by one in this process
+    assert mock_loader_class.call_args.kwargs["workers"] == 3
+    mock_loader_class.return_value.load_single_document.assert_not_called()
+    assert list(failures) == [1]
+    ctx.embedder.embed_documents.assert_called_once()
+    stored_chunks = ctx.storage.save_embeddings.call_args[0][0]
+    assert sorted(c.content for c in stored_chunks) == ["a.pdf 0", "a.pdf 1", "c.pdf 0", "c.pdf 1"]
+
+
+def test_process_batch_isolates_storage_failures_per_file():
+    ctx = _batch_ctx()
+
+    def save(chunks, embeddings):
+        if any(c.content.startswith("b.pdf") for c in chunks):
+            raise ValueError("bad vectors")
+
+    ctx.storage.save_embeddings.side_effect = save
+    events = [{"event_type": "PDF_CREATED", "file_path": f"/in/{name}.pdf"} for name in ("a", "b")]
+
+    with patch("src.streaming.consumer.MultimodalLoader") as mock_loader_class:
+        mock_loader_class.return_value.iter_documents.side_effect = _iter_documents
+        from src.streaming.consumer import process_batch
+
+        failures = process_batch(events, ctx)
+
+    assert list(failures) == [1]
+    # One pooled attempt, then one retry per file
+    assert ctx.storage.save_embeddings.call_count == 3
+
+
+def test_process_batch_stores_unenriched_chunks_when_hyde_fails():
+    ctx = _batch_ctx()
+    ctx.use_hyde, ctx.defer_hyde = True, False
+    ctx.enricher.enrich.side_effect = RuntimeError("summarizer out of memory")
+    events = [{"event_type": "PDF_CREATED", "file_path": f"/in/{name}.pdf"} for name in ("a", "b")]
+
+    with patch("src.streaming.consumer.MultimodalLoader") as mock_loader_class:
+        mock_loader_class.return_value.iter_documents.side_effect = _iter_documents
+        from src.streaming.consumer import process_batch
+
+        failures = process_batch(events, ctx)
+
+    assert failures == {}
+    stored_chunks = ctx.storage.save_embeddings.call_args[0][0]
+    assert len(stored_chunks) == 4 and all(c.summary is None for c in stored_chunks)
+
+
+def _run_batches(process_batch_effect, polls):
+    from types import SimpleNamespace
+    from src.streaming.consumer import consume_batches
+
+    transport = MagicMock()
+    batches = [[SimpleNamespace(offset=i, value={"event_type": "PDF_CREATED", "file_path": f"/in/{i}.pdf"})] for i in range(polls)]
+    with (
+        patch("src.streaming.consumer.ProcessContext"),
+        patch("src.streaming.consumer.poll_batch", side_effect=batches + [KeyboardInterrupt()]),
+        patch("src.streaming.consumer.process_batch", side_effect=process_batch_effect) as process_batch,
+        patch("src.streaming.consumer._ingest_pool", side_effect=lambda workers: MagicMock()) as ingest_pool,
+    ):
+        consume_batches(workers=4, transport=transport)
+    return transport.consumer.return_value, process_batch, ingest_pool
+
+
+def test_consume_batches_reuses_one_ingest_pool_for_every_batch():
+    consumer, process_batch, ingest_pool = _run_batches(lambda *args: {}, polls=3)
+
+    ingest_pool.assert_called_once_with(4)
+    pools = {id(call.args[3]) for call in process_batch.call_args_list}
+    assert process_batch.call_count == 3 and len(pools) == 1
+    process_batch.call_args.args[3].shutdown.assert_called_once()
+    assert consumer.commit.call_count == 3
+
+
+def test_consume_batches_restarts_a_broken_pool_and_retries_the_batch():
+    from concurrent.futures.process import BrokenProcessPool
+
+    consumer, process_batch, ingest_pool = _run_batches([BrokenProcessPool("worker died"), {}], polls=1)
+
+    assert ingest_pool.call_count == 2
+    first, retry = (call.args[3] for call in process_batch.call_args_list)
+    assert first is not retry
+    first.shutdown.assert_called_once_with(wait=False)
+    consumer.commit.assert_called_once()
+
+
+def test_poll_batch_keeps_polling_until_full():
+    from src.streaming.consumer import poll_batch
+
+    consumer = MagicMock()
+    consumer.poll.side_effect = [{"tp": [1, 2]}, {}, {"tp": [3]}]
+
+    assert poll_batch(consumer, max_records=3, timeout_ms=10_000) == [1, 2, 3]
+    assert consumer.poll.call_args_list[-1].kwargs["max_records"] == 1
+
+
+# -------------------------------------------------------------------------
+# Supervisor mode — ordered per-partition offset commits
+# -------------------------------------------------------------------------
+def test_offset_tracker_commits_only_contiguous_finished_offsets():
+    from kafka.structs import TopicPartition
+    from src.streaming.consumer import OffsetTracker
+
+    tracker = OffsetTracker()
+    tp0, tp1 = TopicPartition("raw", 0), TopicPartition("raw", 1)
+    for offset in (10, 11, 12):
+        tracker.dispatched(tp0, offset)
+    tracker.dispatched(tp1, 5)
+
+    tracker.finished(tp0, 12)
+    tracker.finished(tp1, 5)
+    assert {tp: om.offset for tp, om in tracker.committable().items()} == {tp1: 6}
+
+    tracker.finished(tp0, 10)
+    assert {tp: om.offset for tp, om in tracker.committable().items()} == {tp0: 11}
+
+    tracker.finished(tp0, 11)
+    assert {tp: om.offset for tp, om in tracker.committable().items()} == {tp0: 13}
+    assert tracker.committable() == {}
+
+
+def test_offset_tracker_ignores_completions_from_before_a_revoke():
+    from kafka.structs import TopicPartition
+    from src.streaming.consumer import OffsetTracker
+
+    tracker = OffsetTracker()
+    tp = TopicPartition("raw", 0)
+    old_generation = tracker.dispatched(tp, 0)
+    tracker.forget([tp])
+
+    # Reassigned: offset 0 is replayed while the old worker is still finishing it
+    new_generation = tracker.dispatched(tp, 0)
+    tracker.finished(tp, 0, old_generation)
+    assert tracker.committable() == {}
+
+    tracker.finished(tp, 0, new_generation)
+    assert tracker.committable()[tp].offset == 1
+
+
+def test_revoke_commits_only_revoked_partitions_and_keeps_the_rest():
+    from kafka.structs import TopicPartition
+    from src.streaming.consumer import OffsetTracker, _CommitOnRevoke
+
+    tracker = OffsetTracker()
+    kept, revoked = TopicPartition("raw", 0), TopicPartition("raw", 1)
+    for tp in (kept, revoked):
+        tracker.dispatched(tp, 3)
+        tracker.finished(tp, 3)
+    consumer = MagicMock()
+
+    _CommitOnRevoke(consumer, tracker).on_partitions_revoked([revoked])
+
+    assert {tp: om.offset for tp, om in consumer.commit.call_args.kwargs["offsets"].items()} == {revoked: 4}
+    # Progress on the partition still owned is committed later, not lost
+    assert {tp: om.offset for tp, om in tracker.committable().items()} == {kept: 4}
+
+
+def test_worker_returns_errors_instead_of_raising():
+    import src.streaming.consumer as consumer
+
+    with (
+        patch.object(consumer, "_worker_ctx", MagicMock()),
+        patch.object(consumer, "process_single_file", side_effect=ValueError("corrupt pdf")),
+    ):
+        error, tb = consumer._process_event({"event_type": "PDF_CREATED", "file_path": "/x.pdf"})
+        assert error == "corrupt pdf" and "ValueError" in tb
+        assert consumer._process_event({"event_type": "OTHER"}) is None
+
+
+class _FakeConsumer:
+    """Scripted consumer for the supervisor loop: polls is a list of callables returning records."""
+    def __init__(self, polls):
+        self.polls = list(polls)
+        self.assigned = set()
+        self.paused_partitions = set()
+        self.commits = []
+        self.listener = None
+
+    def subscribe(self, topics, listener=None):
+        self.listener = listener
+
+    def assignment(self):
+        return set(self.assigned)
+
+    def pause(self, *partitions):
+        self.paused_partitions |= set(partitions)
+
+    def resume(self, *partitions):
+        self.paused_partitions -= set(partitions)
+
+    def paused(self):
+        return set(self.paused_partitions)
+
+    def poll(self, timeout_ms=0, max_records=None):
+        if not self.polls:
+            raise KeyboardInterrupt()
+        return self.polls.pop(0)(self, timeout_ms)
+
+    def commit(self, offsets=None):
+        self.commits.append(offsets)
+
+    def close(self):
+        pass
+
+
+def _event(tp, offset, name):
+    from types import SimpleNamespace
+
+    return SimpleNamespace(topic=tp.topic, partition=tp.partition, offset=offset,
+                           value={"event_type": "PDF_CREATED", "file_path": f"/in/{name}.pdf"})
+
+
+def _run_supervisor(consumer, process, pool=None, **kwargs):
+    from concurrent.futures import ThreadPoolExecutor
+    import src.streaming.consumer as consumer_module
+
+    transport = MagicMock()
+    transport.consumer.return_value = consumer
+    with (
+        patch.object(consumer_module, "_worker_pool", side_effect=pool or (lambda *a: ThreadPoolExecutor(2))),
+        # Thread workers skip _init_worker, so they share a stand-in context
+        patch.object(consumer_module, "_worker_ctx", MagicMock()),
+        patch.object(consumer_module, "process_single_file", side_effect=process),
+    ):
+        consumer_module.consume_with_workers(workers=1, transport=transport, **kwargs)
+    return transport
+
+
+def test_supervisor_dispatches_records_polled_while_paused():
+    import threading
+    from kafka.structs import TopicPartition
+
+    tp0, tp1 = TopicPartition("raw", 0), TopicPartition("raw", 1)
+    first_blocked = threading.Event()
+    processed = []
+
+    def first_poll(consumer, timeout_ms):
+        consumer.assigned = {tp0}
+        return {tp0: [_event(tp0, 0, "a")]}
+
+    def paused_poll(consumer, timeout_ms):
+        # At capacity; a rebalance hands over tp1, which is not paused yet
+        assert timeout_ms == 0 and tp0 in consumer.paused_partitions
+        consumer.assigned = {tp0, tp1}
+        first_blocked.set()
+        return {tp1: [_event(tp1, 7, "b")]}
+
+    def process(file_path, ctx):
+        if file_path.endswith("a.pdf"):
+            first_blocked.wait(5)
+        processed.append(file_path)
+
+    consumer = _FakeConsumer([first_poll, paused_poll])
+    _run_supervisor(consumer, process, max_in_flight=1)
+
+    assert sorted(processed) == ["/in/a.pdf", "/in/b.pdf"]
+    committed = {tp: om.offset for offsets in consumer.commits for tp, om in offsets.items()}
+    assert committed == {tp0: 1, tp1: 8}
+
+
+class _BreakingPool:
+    """Runs events inline; a 'poison' event kills its worker, which breaks the pool."""
+    def __init__(self):
+        self.broken = False
+
+    def submit(self, fn, value):
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+
+        if self.broken:
+            raise BrokenProcessPool("pool already broken")
+        future = Future()
+        if "poison" in value["file_path"]:
+            self.broken = True
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        else:
+            future.set_result(fn(value))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_supervisor_rebuilds_a_broken_pool_and_dead_letters_the_poison_message():
+    from kafka.structs import TopicPartition
+
+    tp = TopicPartition("raw", 0)
+    pools = []
+
+    def new_pool(*args):
+        pools.append(_BreakingPool())
+        return pools[-1]
+
+    def first_poll(consumer, timeout_ms):
+        consumer.assigned = {tp}
+        return {tp: [_event(tp, 0, "poison")]}
+
+    def second_poll(consumer, timeout_ms):
+        return {tp: [_event(tp, 1, "good")]}
+
+    processed = []
+    consumer = _FakeConsumer([first_poll, second_poll])
+    transport = _run_supervisor(
+        consumer, lambda file_path, ctx: processed.append(file_path), pool=new_pool, max_worker_crashes=2
+    )
+
+    # Broke the first pool, was resubmitted to a second one, broke it too, then dead-lettered
+    assert len(pools) == 3
+    dead = [c.kwargs["value"] for c in transport.producer.return_value.send.call_args_list]
+    assert [d["original_event"]["file_path"] for d in dead] == ["/in/poison.pdf"]
+    assert processed == ["/in/good.pdf"]
+    committed = [om.offset for offsets in consumer.commits for tp_, om in offsets.items()]
+    assert committed[-1] == 2
+
+
+# -------------------------------------------------------------------------
+# Non-blocking DLQ and coalesced commits
+# -------------------------------------------------------------------------
+def test_consume_events_coalesces_commits_and_batches_dlq_sends():
+    from types import SimpleNamespace
+
+    messages = [
+        SimpleNamespace(offset=i, value={"event_type": "PDF_CREATED", "file_path": f"/in/{i}.pdf"})
+        for i in range(5)
+    ]
+    transport = MagicMock()
+    consumer, producer = transport.consumer.return_value, transport.producer.return_value
+    consumer.poll.side_effect = [{"tp": messages}, KeyboardInterrupt()]
+
+    with (
+        patch("src.streaming.consumer.ProcessContext"),
+        patch("src.streaming.consumer.process_single_file", side_effect=ValueError("corrupt pdf")),
+    ):
+        from src.streaming.consumer import consume_events
+
+        consume_events(transport=transport)
+
+    assert producer.send.call_count == 5
+    # One flush before the final commit, not one per poison message
+    assert producer.flush.call_count == 1
+    # First commit waits for the interval; shutdown commits synchronously once
+    consumer.commit_async.assert_not_called()
+    assert consumer.commit.call_args.kwargs["offsets"]["tp"].offset == 5
+
+
+def test_commit_scheduler_flushes_dlq_before_async_commit():
+    from src.streaming.consumer import CommitScheduler
+
+    calls = []
+    consumer, dlq = MagicMock(), MagicMock()
+    dlq.flush.side_effect = lambda: calls.append("flush")
+    consumer.commit_async.side_effect = lambda offsets, callback: calls.append(("commit", offsets["tp"].offset))
+
+    scheduler = CommitScheduler(consumer, dlq, interval_ms=0)
+    scheduler.maybe_commit()
+    assert calls == []
+
+    scheduler.processed("tp", 3)
+    scheduler.processed("tp", 4)
+    scheduler.maybe_commit()
+    assert calls == ["flush", ("commit", 5)]
+
+
+def test_commit_scheduler_never_commits_the_poll_position():
+    from src.streaming.consumer import CommitScheduler
+
+    consumer = MagicMock(spec=["commit", "commit_async"])
+    scheduler = CommitScheduler(consumer, MagicMock(), interval_ms=0)
+
+    # Nothing processed: no commit at all, since a bare commit would commit the position
+    scheduler.maybe_commit()
+    scheduler.commit_sync()
+    consumer.commit.assert_not_called()
+    consumer.commit_async.assert_not_called()
+
+    scheduler.processed("tp", 7)
+    scheduler.maybe_commit()
+    scheduler.processed("tp", 8)
+    scheduler.commit_sync()
+    assert consumer.commit_async.call_args.kwargs["offsets"]["tp"].offset == 8
+    assert consumer.commit.call_args.kwargs["offsets"]["tp"].offset == 9
+
+
+def test_deferred_hyde_stores_raw_vectors_marked_pending():
+    fake_doc = IngestedDocument(filename="t.pdf", content="hello world")
+    fake_chunk = ProcessedChunk(parent_doc_id=fake_doc.id, content="hello world", chunk_index=0)
+
+    fake_ctx = MagicMock()
+    fake_ctx.use_hyde = True
+    fake_ctx.defer_hyde = True
+    fake_ctx.chunker.split.return_value = [fake_chunk]
+    fake_ctx.embedder.embed_documents.return_value = [[0.1] * 768]
+
+    with patch("src.streaming.consumer.MultimodalLoader") as mock_loader_class:
+        mock_loader_class.return_value.load_single_document.return_value = fake_doc
+        from src.streaming.consumer import process_single_file
+
+        process_single_file("/some/file.pdf", fake_ctx)
+
+    fake_ctx.enricher.enrich.assert_not_called()
+    fake_ctx.embedder.embed_documents.assert_called_once_with(["hello world"])
+    assert fake_chunk.metadata == {"has_summary": False, "summary_pending": True}
@@ -0,0 +1,47 @@
+"""
+Tests for the vectorized MockEmbedder.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.embedding.embedder import MockEmbedder
+
+
+def test_mock_vectors_are_float32_unit_length():
+    vectors = MockEmbedder(dimension=33).embed_documents(["a", "bb", "ccc"])
+
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (3, 33)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+
+
+def test_mock_vectors_depend_on_content_not_length():
+    embedder = MockEmbedder(dimension=64)
+
+    first = embedder.embed_documents(["apple", "mango", "apple"])
+    second = MockEmbedder(dimension=64).embed_documents(["apple"])
+
+    assert not np.allclose(first[0], first[1])
+    np.testing.assert_array_equal(first[0], first[2])
+    np.testing.assert_array_equal(first[0], second[0])
+
+
+def test_mock_vectors_do_not_depend_on_batch_composition():
+    embedder = MockEmbedder(dimension=16)
+    texts = [f"chunk {i}" for i in range(50)]
+
+    full = embedder.embed_documents(texts)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parts = list(pool.map(embedder.embed_documents, [texts[i:i + 10] for i in range(0, 50, 10)]))
+
+    np.testing.assert_array_equal(full, np.concatenate(parts))
+
+
+def test_clustered_mock_vectors_group_around_centroids():
+    embedder = MockEmbedder(dimension=64, n_clusters=4, cluster_spread=0.3)
+    vectors = embedder.embed_documents([f"doc {i}" for i in range(400)])
+
+    # Each vector's best centroid should be far closer than the rest
+    similarities = np.sort(vectors @ embedder._centroids.T, axis=1)
+    assert (similarities[:, -1] > 0.9).all()
+    assert (similarities[:, -2] < 0.5).all()
@@ -0,0 +1,90 @@
+"""
+Tests for the content-addressed embedding cache.
+"""
+
+from typing import List
+import numpy as np
+from src.embedding.embedder import BaseEmbedder
+from src.embedding.cache import CachedEmbedder, SQLiteCache
+
+
+class CountingEmbedder(BaseEmbedder):
+    def __init__(self):
+        self.calls: List[List[str]] = []
+
+    @property
+    def model_id(self) -> str:
+        return "counting"
+
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        self.calls.append(list(texts))
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def test_only_unique_misses_reach_the_model(tmp_path):
+    inner = CountingEmbedder()
+    cached = CachedEmbedder(inner, path=str(tmp_path / "cache.sqlite"))
+
+    vectors = cached.embed_documents(["alpha", "beta", "alpha", "gamma"])
+
+    assert inner.calls == [["alpha", "beta", "gamma"]]
+    assert vectors.dtype == np.float32
+    np.testing.assert_array_equal(vectors, inner.embed_documents(["alpha", "beta", "alpha", "gamma"]))
+
+
+def test_repeated_texts_are_served_from_memory_then_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    inner = CountingEmbedder()
+    cached = CachedEmbedder(inner, path=path)
+    cached.embed_documents(["alpha", "beta"])
+
+    cached.embed_documents(["beta", "delta", "alpha"])
+    assert inner.calls[-1] == ["delta"]
+    assert cached.stats == {"memory_hits": 2, "disk_hits": 0, "misses": 3}
+
+    # A fresh process only has the on-disk tier
+    fresh_inner = CountingEmbedder()
+    fresh = CachedEmbedder(fresh_inner, path=path)
+    np.testing.assert_array_equal(fresh.embed_documents(["alpha", "delta"]), [[5.0, 97.0], [5.0, 100.0]])
+    assert fresh_inner.calls == []
+    assert fresh.stats["disk_hits"] == 2
+
+
+def test_disk_store_is_bounded(tmp_path):
+    store = SQLiteCache(str(tmp_path / "kv.sqlite"), max_items=10)
+
+    store.put_many((f"k{i}", i) for i in range(25))
+
+    assert len(store) <= 10
+    assert store.get_many(["k24"]) == {"k24": 24}
+
+
+def test_query_cache_normalizes_text_and_counts_hits():
+    from src.embedding.cache import QueryCachedEmbedder
+
+    inner = CountingEmbedder()
+    cached = QueryCachedEmbedder(inner, max_items=10)
+
+    first = cached.embed_documents(["  leadership   skills "])
+    second = cached.embed_documents(["leadership skills", "budget"])
+
+    assert inner.calls == [["leadership skills"], ["budget"]]
+    np.testing.assert_array_equal(first[0], second[0])
+    assert cached.stats == {"hits": 1, "misses": 2}
+    assert len(cached) == 2
+
+
+def test_query_cache_entries_expire_after_ttl():
+    from unittest.mock import patch
+    from src.embedding.cache import QueryCachedEmbedder
+
+    inner = CountingEmbedder()
+    cached = QueryCachedEmbedder(inner, max_items=10, ttl_seconds=60)
+    with patch("src.embedding.cache.time.monotonic", return_value=1000.0):
+        cached.embed_documents(["alpha"])
+    with patch("src.embedding.cache.time.monotonic", return_value=1030.0):
+        cached.embed_documents(["alpha"])
+    with patch("src.embedding.cache.time.monotonic", return_value=1061.0):
+        cached.embed_documents(["alpha"])
+
+    assert inner.calls == [["alpha"], ["alpha"]]
@@ -0,0 +1,194 @@
+"""
+Tests for batched, cached HyDE summarization and the extractive engines.
+A fake `transformers` module stands in for the HuggingFace summarizer.
+"""
+
+import sys
+from types import ModuleType
+from unittest.mock import MagicMock, patch
+from src.ingestion.models import ProcessedChunk
+
+
+def _fake_transformers(summarizer):
+    module = ModuleType("transformers")
+    module.pipeline = MagicMock(return_value=summarizer)
+    return module
+
+
+def _summarizer():
+    def summarize(texts, **kwargs):
+        if isinstance(texts, str):
+            return [{"summary_text": f"summary of {texts[:12]}"}]
+        return [{"summary_text": f" summary of {t[:12]} "} for t in texts]
+    return MagicMock(side_effect=summarize)
+
+
+def _chunk(text, i=0):
+    return ProcessedChunk(parent_doc_id="doc", content=text, chunk_index=i)
+
+
+def _enricher(summarizer, tmp_path, **kwargs):
+    from src.processing.enricher import SummaryEnricher
+
+    with patch.dict(sys.modules, {"transformers": _fake_transformers(summarizer)}):
+        return SummaryEnricher(use_enrichment=True, cache_path=str(tmp_path / "summaries.sqlite"), **kwargs)
+
+
+def test_long_texts_are_summarized_in_length_sorted_batches(tmp_path):
+    summarizer = _summarizer()
+    enricher = _enricher(summarizer, tmp_path, batch_size=2, min_chars=20)
+    texts = ["a" * 30, "short", "b" * 90, "c" * 60, "a" * 30]
+    chunks = enricher.enrich([_chunk(t, i) for i, t in enumerate(texts)])
+
+    # 3 unique long texts -> 2 calls, longest first; the short one never reaches the model
+    batches = [call.args[0] for call in summarizer.call_args_list]
+    assert batches == [["b" * 90, "c" * 60], ["a" * 30]]
+    assert chunks[1].summary == "short" and chunks[1].metadata["has_summary"]
+    assert chunks[0].summary == chunks[4].summary == "summary of aaaaaaaaaaaa"
+
+
+def test_summaries_are_cached_across_runs(tmp_path):
+    texts = ["x" * 200, "y" * 200]
+    _enricher(_summarizer(), tmp_path).enrich([_chunk(t) for t in texts])
+
+    summarizer = _summarizer()
+    enricher = _enricher(summarizer, tmp_path)
+    chunks = enricher.enrich([_chunk(t) for t in texts + ["z" * 200]])
+
+    assert summarizer.call_count == 1
+    assert summarizer.call_args.args[0] == ["z" * 200]
+    assert enricher.stats["cached"] == 2
+    assert all(c.metadata["has_summary"] for c in chunks)
+
+
+def test_failing_text_only_fails_its_own_chunk(tmp_path):
+    def summarize(texts, **kwargs):
+        items = [texts] if isinstance(texts, str) else texts
+        if any(t.startswith("bad") for t in items):
+            raise RuntimeError("model error")
+        return [{"summary_text": "ok"} for _ in items]
+
+    enricher = _enricher(MagicMock(side_effect=summarize), tmp_path)
+    chunks = enricher.enrich([_chunk("bad" + "x" * 200), _chunk("good" + "x" * 200)])
+
+    assert [c.metadata["has_summary"] for c in chunks] == [False, True]
+    assert chunks[1].summary == "ok"
+    # Failures are not cached
+    assert enricher.cache.get_many([enricher._key("bad" + "x" * 200)]) == {}
+
+
+# ---------------------------------------------------------------------------
+# Deferred HyDE: raw vectors first, summaries re-embedded in place later
+# ---------------------------------------------------------------------------
+def test_deferred_enrichment_updates_stored_points_in_place(tmp_path):
+    import numpy as np
+    from qdrant_client import QdrantClient
+    from src.config.settings import settings
+    from src.embedding.embedder import MockEmbedder
+    from src.processing.deferred_enrichment import DeferredEnricher, mark_pending
+    from src.storage.manager import QdrantStorageManager
+
+    embedder = MockEmbedder(dimension=8)
+    with (
+        patch("qdrant_client.QdrantClient", return_value=QdrantClient(":memory:")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 8),
+    ):
+        storage = QdrantStorageManager()
+        chunks = mark_pending([_chunk("p" * 200, 0), _chunk("tiny", 1)])
+        storage.save_embeddings(chunks, embedder.embed_documents([c.content for c in chunks]))
+
+        worker = DeferredEnricher(storage, embedder, _enricher(_summarizer(), tmp_path), batch_size=10)
+        assert worker.run_once() == 2
+        assert worker.run_once() == 0
+
+    points = storage.client.retrieve(
+        settings.QDRANT_COLLECTION_NAME, ids=[c.chunk_id for c in chunks], with_payload=True, with_vectors=True
+    )
+    by_id = {p.id: p for p in points}
+    long_point = by_id[chunks[0].chunk_id]
+    assert long_point.payload["has_summary"] is True
+    assert long_point.payload["summary_pending"] is False
+    assert long_point.payload["summary"] == "summary of pppppppppppp"
+    assert long_point.payload["text"] == "p" * 200
+    np.testing.assert_allclose(long_point.vector, embedder.embed_documents(["summary of pppppppppppp"])[0], rtol=1e-5)
+
+
+def test_deferred_enrichment_requires_in_place_updates(tmp_path):
+    import pytest
+    from src.processing.deferred_enrichment import DeferredEnricher
+
+    storage = MagicMock(supports_updates=False)
+    with pytest.raises(ValueError, match="in-place updates"):
+        DeferredEnricher(storage, MagicMock(), _enricher(_summarizer(), tmp_path))
+
+
+TOPICAL_TEXT = (
+    "Gradient boosting trains an ensemble of decision trees. "
+    "The cafeteria serves lunch at noon. "
+    "Each new tree in the ensemble corrects the errors of the previous trees. "
+    "Boosting with shallow decision trees often beats a single deep tree."
+)
+
+
+def test_extractive_engines_keep_central_sentences_in_reading_order():
+    from src.processing.extractive import ExtractiveSummarizer
+
+    for method in ("tfidf", "textrank"):
+        summary, short = ExtractiveSummarizer(method, sentences=2).summarize([TOPICAL_TEXT, "One sentence only."])
+        assert "cafeteria" not in summary
+        sentences = ExtractiveSummarizer.split_sentences(summary)
+        assert len(sentences) == 2
+        assert sentences == [s for s in ExtractiveSummarizer.split_sentences(TOPICAL_TEXT) if s in sentences]
+        assert short == "One sentence only."
+
+
+def test_extractive_engine_needs_no_transformers(tmp_path):
+    from src.processing.enricher import SummaryEnricher
+
+    with patch.dict(sys.modules, {"transformers": None}):
+        enricher = SummaryEnricher(use_enrichment=True, cache_path=str(tmp_path / "summaries.sqlite"), engine="textrank", min_chars=20)
+    assert enricher.use_enrichment and enricher.model_name == "extractive-textrank-2"
+
+    chunk = enricher.enrich([_chunk(TOPICAL_TEXT)])[0]
+    assert chunk.metadata["has_summary"] and "cafeteria" not in chunk.summary
+    assert enricher.cache.get_many([enricher._key(TOPICAL_TEXT)])
+
+
+def test_deferred_enrichment_gives_up_on_a_batch_that_keeps_failing(tmp_path):
+    import pytest
+    from src.processing.deferred_enrichment import DeferredEnricher, mark_pending
+
+    chunks = mark_pending([_chunk("p" * 200, 0), _chunk("q" * 200, 1)])
+    storage = MagicMock(supports_updates=True)
+    storage.pending_enrichment.side_effect = lambda limit: [c.model_copy(deep=True) for c in chunks]
+    storage.update_metadata.return_value = []
+    embedder = MagicMock()
+    embedder.embed_documents.side_effect = RuntimeError("embedding service down")
+    worker = DeferredEnricher(storage, embedder, _enricher(_summarizer(), tmp_path), max_attempts=2)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            worker.run_once()
+    storage.update_metadata.assert_not_called()
+
+    # Third pass: both chunks are dropped from the pending set instead of failing again
+    assert worker.run_once() == 2
+    assert embedder.embed_documents.call_count == 2
+    given_up = storage.update_metadata.call_args.args[0]
+    assert [c.chunk_id for c in given_up] == [c.chunk_id for c in chunks]
+    assert all(not c.metadata["summary_pending"] and not c.metadata["has_summary"] for c in given_up)
+    assert worker.given_up == 2
+
+
+def test_base_storage_update_hooks_are_no_ops():
+    from src.storage.manager import BaseStorageManager
+
+    class Storage(BaseStorageManager):
+        def save_embeddings(self, chunks, embeddings):
+            pass
+
+    storage = Storage()
+    chunk = _chunk("text")
+    assert not storage.supports_updates
+    assert storage.pending_enrichment(10) == []
+    assert storage.update_metadata([chunk]) == [chunk]
@@ -0,0 +1,110 @@
+"""
+Tests for MultimodalLoader directory scanning, parallel ingestion and OCR routing.
+PDF parsing is stubbed out — no tesseract/poppler required.
+"""
+
+import os
+from unittest.mock import MagicMock, patch
+from src.ingestion.models import IngestedDocument
+from src.ingestion.multimodal_loader import MultimodalLoader
+from src.ingestion.ocr import PageOCREngine
+
+
+class StubLoader(MultimodalLoader):
+    """Module-level so it can be pickled into worker processes."""
+    def load_single_document(self, file_path: str) -> IngestedDocument | None:
+        name = os.path.basename(file_path)
+        if name.startswith("bad"):
+            raise RuntimeError("corrupt pdf")
+        if name.startswith("empty"):
+            return None
+        return IngestedDocument(filename=name, content=f"content of {name}")
+
+
+def _make_files(tmp_path, names):
+    for name in names:
+        (tmp_path / name).write_bytes(b"%PDF-1.4")
+    return [str(tmp_path / n) for n in names]
+
+
+def test_list_files_only_returns_pdfs(tmp_path):
+    _make_files(tmp_path, ["a.pdf", "b.pdf"])
+    (tmp_path / "notes.txt").write_text("ignore me")
+
+    files = MultimodalLoader(str(tmp_path)).list_files()
+
+    assert [os.path.basename(f) for f in files] == ["a.pdf", "b.pdf"]
+
+
+def test_parallel_load_matches_serial(tmp_path):
+    names = [f"doc_{i}.pdf" for i in range(12)] + ["empty.pdf"]
+    _make_files(tmp_path, names)
+
+    serial = StubLoader(str(tmp_path), workers=1).load_documents()
+    parallel = StubLoader(str(tmp_path), workers=3).load_documents()
+
+    assert len(serial) == 12
+    assert sorted(d.filename for d in parallel) == sorted(d.filename for d in serial)
+
+
+def test_parallel_load_isolates_worker_failures(tmp_path):
+    _make_files(tmp_path, ["bad.pdf", "good_1.pdf", "good_2.pdf"])
+
+    docs = StubLoader(str(tmp_path), workers=2).load_documents()
+
+    assert sorted(d.filename for d in docs) == ["good_1.pdf", "good_2.pdf"]
+
+
+# ---------------------------------------------------------------------------
+# Page-level OCR routing
+# ---------------------------------------------------------------------------
+def test_ocr_windows_are_contiguous_and_bounded():
+    engine = PageOCREngine(workers=2, window_size=3)
+
+    windows = engine._windows([7, 1, 2, 3, 4, 5, 9])
+
+    assert windows == [[1, 2, 3], [4, 5], [7], [9]]
+
+
+def test_ocr_workers_split_the_cores_among_pool_processes(monkeypatch):
+    import pickle
+    import src.ingestion.ocr as ocr
+
+    monkeypatch.setattr(ocr.settings, "OCR_WORKERS", 0)
+    monkeypatch.setattr(ocr.os, "cpu_count", lambda: 8)
+    monkeypatch.delenv("OMP_THREAD_LIMIT", raising=False)
+    monkeypatch.setattr(ocr, "_pool_processes", 1)
+
+    engine = PageOCREngine()
+    assert engine.workers == 8
+    # Importing or using the engine outside a pool leaves the environment alone
+    assert "OMP_THREAD_LIMIT" not in ocr.os.environ
+
+    # Inside a worker of a 4-process pool, the pickled engine gets its share of the cores
+    ocr.init_ocr_worker(4)
+    assert pickle.loads(pickle.dumps(engine)).workers == 2
+    assert ocr.os.environ["OMP_THREAD_LIMIT"] == "1"
+
+    monkeypatch.setattr(ocr.settings, "OCR_WORKERS", 3)
+    assert engine.workers == 3 and PageOCREngine(workers=5).workers == 5
+
+
+def test_mixed_pdf_only_ocrs_textless_pages(tmp_path):
+    pdf_path = _make_files(tmp_path, ["mixed.pdf"])[0]
+    digital_text = "This page has a perfectly good text layer to extract."
+    pages = [MagicMock(), MagicMock(), MagicMock()]
+    pages[0].extract_text.return_value = digital_text
+    pages[1].extract_text.return_value = ""
+    pages[2].extract_text.return_value = digital_text
+
+    loader = MultimodalLoader(str(tmp_path))
+    loader.ocr_engine = MagicMock()
+    loader.ocr_engine.ocr_pages.return_value = {2: "scanned page text"}
+
+    with patch("src.ingestion.multimodal_loader.PdfReader") as mock_reader:
+        mock_reader.return_value.pages = pages
+        doc = loader.load_single_document(pdf_path)
+
+    loader.ocr_engine.ocr_pages.assert_called_once_with(pdf_path, [2])
+    assert doc.metadata["source_type"] == "mixed_pdf"
+    assert doc.content == f"{digital_text}\nscanned page text\n{digital_text}\n"
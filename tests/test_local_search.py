@@ -0,0 +1,183 @@
+"""
+Tests for the memory-mapped local vector search backend and its IVF index.
+"""
+
+import numpy as np
+from unittest.mock import patch
+from src.ingestion.models import ProcessedChunk
+from src.storage.manager import ParquetStorageManager
+from src.storage.local_search import LocalVectorIndex
+
+
+def _chunks(n, offset=0):
+    return [
+        ProcessedChunk(parent_doc_id="doc", content=f"chunk {offset + i}", chunk_index=i, metadata={"source": f"data/{(offset + i) % 3}.pdf"})
+        for i in range(n)
+    ]
+
+
+def _settings(tmp_path, dimension, **extra):
+    patches = [
+        patch("src.storage.manager.settings.OUTPUT_PATH", str(tmp_path / "dataset")),
+        patch("src.storage.manager.settings.LOCAL_INDEX_PATH", str(tmp_path / "index")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", dimension),
+    ]
+    patches += [patch(f"src.storage.manager.settings.{k}", v) for k, v in extra.items()]
+    return patches
+
+
+def _write(tmp_path, chunks, vectors, **extra):
+    patches = _settings(tmp_path, vectors.shape[1], **extra)
+    for p in patches:
+        p.start()
+    try:
+        ParquetStorageManager().save_embeddings(chunks, vectors)
+    finally:
+        for p in patches:
+            p.stop()
+
+
+def _exact(vectors, queries, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ normalized.T
+    return np.argsort(-scores, axis=1)[:, :k], np.sort(scores, axis=1)[:, ::-1][:, :k]
+
+
+def test_blocked_search_matches_brute_force(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 16)).astype(np.float32)
+    chunks = _chunks(300)
+    _write(tmp_path, chunks, vectors, LOCAL_INDEX_INCREMENTAL=False)
+    index = LocalVectorIndex.build(str(tmp_path / "dataset"), str(tmp_path / "index"), block_size=64)
+
+    queries = rng.standard_normal((5, 16)).astype(np.float32)
+    rows, scores = index.top_k(queries, 10)
+
+    expected_rows, expected_scores = _exact(vectors, queries, 10)
+    by_id = {c.chunk_id: i for i, c in enumerate(chunks)}
+    found = [[by_id[index.payload(r)["chunk_id"]] for r in q] for q in rows]
+    assert found == expected_rows.tolist()
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+
+
+def test_index_is_maintained_incrementally_and_rebuilt_after_deletes(tmp_path):
+    dataset, index_path = str(tmp_path / "dataset"), str(tmp_path / "index")
+    chunks = _chunks(4)
+    _write(tmp_path, chunks, np.eye(4, dtype=np.float32))
+    _write(tmp_path, _chunks(4, offset=4), np.eye(4, dtype=np.float32))
+
+    with patch.object(LocalVectorIndex, "build", side_effect=AssertionError("index should be in sync")):
+        index = LocalVectorIndex.load_or_build(dataset, index_path)
+    assert len(index) == 8
+    assert index.get(chunks[2].chunk_id)["text"] == "chunk 2"
+    assert index.get(chunks[2].chunk_id)["metadata"]["source"] == "data/2.pdf"
+    assert index.get("missing") is None
+    top = index.search(np.array([0, 0, 1, 0], dtype=np.float32), 2)
+    assert {hit["text"] for hit in top} == {"chunk 2", "chunk 6"}
+
+    with patch("src.storage.manager.settings.OUTPUT_PATH", dataset):
+        ParquetStorageManager().delete_sources(["data/0.pdf"])
+    rebuilt = LocalVectorIndex.load_or_build(dataset, index_path)
+    assert len(rebuilt) == 5
+    assert all(hit["metadata"]["source"] != "data/0.pdf" for hit in rebuilt.search(np.ones(4, dtype=np.float32), 8))
+
+
+def test_aborted_session_leaves_index_unchanged(tmp_path):
+    _write(tmp_path, _chunks(4), np.eye(4, dtype=np.float32))
+
+    patches = _settings(tmp_path, 4)
+    for p in patches:
+        p.start()
+    try:
+        manager = ParquetStorageManager()
+        try:
+            with manager:
+                manager.append(_chunks(4, offset=4), np.eye(4, dtype=np.float32))
+                raise RuntimeError("embedding failed")
+        except RuntimeError:
+            pass
+        manager.save_embeddings(_chunks(2, offset=8), np.eye(4, dtype=np.float32)[:2])
+    finally:
+        for p in patches:
+            p.stop()
+
+    index = LocalVectorIndex.load_or_build(str(tmp_path / "dataset"), str(tmp_path / "index"))
+    assert sorted(index.payload(r)["text"] for r in range(len(index))) == [f"chunk {i}" for i in (0, 1, 2, 3, 8, 9)]
+
+
+def test_ivf_recall_improves_with_nprobe_and_is_exact_when_probing_all_lists(tmp_path):
+    from src.embedding.embedder import MockEmbedder
+
+    embedder = MockEmbedder(dimension=32, n_clusters=20, cluster_spread=0.6)
+    vectors = embedder.embed_documents([f"doc {i}" for i in range(2000)])
+    ivf = dict(ANN_TRAIN_MIN_ROWS=1000, ANN_NLIST=16)
+    # First batch trains the lists, second batch is assigned incrementally
+    with patch.multiple("src.storage.manager.settings", **ivf):
+        _write(tmp_path, _chunks(1000), vectors[:1000])
+        _write(tmp_path, _chunks(1000, offset=1000), vectors[1000:])
+
+    index = LocalVectorIndex.load_or_build(str(tmp_path / "dataset"), str(tmp_path / "index"))
+    exact = LocalVectorIndex(str(tmp_path / "index"), mode="exact")
+    assert index.centroids is not None and exact.centroids is None
+
+    queries = embedder.embed_documents([f"query {i}" for i in range(20)])
+    truth, _ = exact.top_k(queries, 10)
+
+    def recall(nprobe):
+        rows, _ = index.top_k(queries, 10, nprobe=nprobe)
+        return np.mean([len(set(r) & set(t)) / 10 for r, t in zip(rows, truth)])
+
+    assert recall(1) <= recall(4) <= recall(16)
+    assert recall(16) == 1.0
+
+
+def test_loading_memory_maps_precomputed_lookups_without_sorting(tmp_path):
+    from src.embedding.embedder import MockEmbedder
+
+    embedder = MockEmbedder(dimension=16, n_clusters=8)
+    chunks = _chunks(400)
+    vectors = embedder.embed_documents([c.content for c in chunks])
+    with patch.multiple("src.storage.manager.settings", ANN_TRAIN_MIN_ROWS=200, ANN_NLIST=8):
+        _write(tmp_path, chunks[:200], vectors[:200])
+        _write(tmp_path, chunks[200:], vectors[200:])
+    reference = LocalVectorIndex(str(tmp_path / "index"))
+
+    with (
+        patch("src.storage.local_search.np.argsort", side_effect=AssertionError("sorted at load")),
+        patch("src.storage.local_search.inverted_lists", side_effect=AssertionError("grouped at load")),
+    ):
+        index = LocalVectorIndex(str(tmp_path / "index"))
+
+    assert isinstance(index.id_order, np.memmap) and isinstance(index._list_rows, np.memmap)
+    assert index.get(chunks[321].chunk_id)["text"] == "chunk 321"
+    sorted_ids = index.ids[index.id_order]
+    assert (sorted_ids[:-1] <= sorted_ids[1:]).all()
+    np.testing.assert_array_equal(index.top_k(vectors[:5], 5, nprobe=2)[0], reference.top_k(vectors[:5], 5, nprobe=2)[0])
+
+
+def test_appends_extend_lookups_and_walk_the_dataset_once_per_open_and_commit(tmp_path):
+    import src.storage.local_search as local_search
+    from src.embedding.embedder import MockEmbedder
+    from src.storage.ann import inverted_lists
+
+    embedder = MockEmbedder(dimension=16, n_clusters=8)
+    chunks = _chunks(600)
+    vectors = embedder.embed_documents([c.content for c in chunks])
+    with patch.multiple("src.storage.manager.settings", ANN_TRAIN_MIN_ROWS=200, ANN_NLIST=8):
+        _write(tmp_path, chunks[:200], vectors[:200])
+        walks = []
+        real_walk = local_search._published_files
+        with (
+            patch("src.storage.local_search.inverted_lists", side_effect=AssertionError("regrouped every row")),
+            patch("src.storage.local_search._published_files", side_effect=lambda *a, **k: walks.append(1) or real_walk(*a, **k)),
+        ):
+            _write(tmp_path, chunks[200:400], vectors[200:400])
+            _write(tmp_path, chunks[400:], vectors[400:])
+    assert len(walks) == 4
+
+    index = LocalVectorIndex(str(tmp_path / "index"))
+    np.testing.assert_array_equal(index.id_order, np.argsort(index.ids, kind="stable"))
+    labels = np.fromfile(str(tmp_path / "index" / "lists.i32"), dtype=np.int32)
+    expected_rows, expected_offsets = inverted_lists(labels, len(index.centroids))
+    np.testing.assert_array_equal(index._list_rows, expected_rows)
+    np.testing.assert_array_equal(index._list_offsets, expected_offsets)
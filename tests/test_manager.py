@@ -1,6 +1,7 @@
 import pytest
 from src.ingestion.models import ProcessedChunk
 from src.storage.manager import ParquetStorageManager
+from src.config.settings import settings
 
 def test_manager_mismatch_length():
     chunk1 = ProcessedChunk(parent_doc_id="doc1", content="chunk 1", chunk_index=0)
@@ -14,3 +15,152 @@ def test_manager_mismatch_length():
         manager.save_embeddings([chunk1, chunk2], embeddings)
     
     assert "Mismatch: 2 chunks vs 1 embeddings" in str(excinfo.value)
+
+
+def test_parquet_stores_float32_fixed_size_vectors(tmp_path):
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from unittest.mock import patch
+
+    chunks = [ProcessedChunk(parent_doc_id="doc1", content=f"chunk {i}", chunk_index=i) for i in range(3)]
+    embeddings = np.arange(3 * 4, dtype=np.float32).reshape(3, 4)
+    output_path = str(tmp_path / "embeddings")
+
+    manager = ParquetStorageManager()
+    with (
+        patch("src.storage.manager.settings.OUTPUT_PATH", output_path),
+        patch("src.storage.manager.settings.LOCAL_INDEX_PATH", str(tmp_path / "index")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 4),
+    ):
+        manager.save_embeddings(chunks, embeddings)
+
+    table = ds.dataset(output_path, format="parquet", partitioning="hive").to_table()
+    assert table.schema.field("vector").type == pa.list_(pa.float32(), 4)
+    np.testing.assert_array_equal(
+        table.column("vector").combine_chunks().flatten().to_numpy().reshape(3, 4), embeddings
+    )
+
+
+def test_parquet_appends_partitioned_files_and_deletes_sources(tmp_path):
+    import numpy as np
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from unittest.mock import patch
+
+    def chunks_for(source, n):
+        return [
+            ProcessedChunk(parent_doc_id=source, content=f"{source} {i}", chunk_index=i, metadata={"source": source})
+            for i in range(n)
+        ]
+
+    output_path = str(tmp_path / "embeddings")
+    manager = ParquetStorageManager(row_group_size=4, max_open_files=1)
+    with (
+        patch("src.storage.manager.settings.OUTPUT_PATH", output_path),
+        patch("src.storage.manager.settings.LOCAL_INDEX_PATH", str(tmp_path / "index")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 2),
+    ):
+        with manager:
+            batch = chunks_for("data/a.pdf", 5) + chunks_for("data/b.pdf", 3)
+            manager.append(batch, np.ones((8, 2), dtype=np.float32))
+            # Nothing is visible to readers until the session commits
+            assert ds.dataset(output_path, format="parquet").count_rows() == 0
+        # A later session (e.g. the consumer's next file) adds files instead of overwriting
+        manager.save_embeddings(chunks_for("data/c.pdf", 2), np.ones((2, 2), dtype=np.float32))
+
+        dataset = ds.dataset(output_path, format="parquet", partitioning="hive")
+        counts = dataset.to_table().group_by("source").aggregate([("chunk_id", "count")]).to_pydict()
+        assert dict(zip(counts["source"], counts["chunk_id_count"])) == {"data/a.pdf": 5, "data/b.pdf": 3, "data/c.pdf": 2}
+        assert all(pq.ParquetFile(f).metadata.row_group(0).num_rows <= 4 for f in dataset.files)
+
+        manager.delete_sources(["data/a.pdf", "data/c.pdf"])
+        remaining = ds.dataset(output_path, format="parquet", partitioning="hive").to_table()
+        assert set(remaining.column("source").to_pylist()) == {"data/b.pdf"}
+
+
+# ---------------------------------------------------------------------------
+# Qdrant bulk upload (in-memory local Qdrant, no server required)
+# ---------------------------------------------------------------------------
+def _qdrant_manager(dimension: int):
+    from unittest.mock import patch
+    from qdrant_client import QdrantClient
+    from src.storage.manager import QdrantStorageManager
+
+    with (
+        patch("qdrant_client.QdrantClient", return_value=QdrantClient(":memory:")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", dimension),
+    ):
+        return QdrantStorageManager()
+
+
+def test_bulk_upload_retries_only_failed_batches():
+    import numpy as np
+    from unittest.mock import patch
+    from src.storage.manager import QdrantStorageManager
+
+    manager = _qdrant_manager(4)
+    real_upsert = manager.client.upsert
+    attempts = []
+
+    def flaky_upsert(collection_name, points, wait=True):
+        attempts.append(points.ids[0])
+        if attempts.count(points.ids[0]) == 1 and points.ids[0] == chunks[4].chunk_id:
+            raise ConnectionError("transient")
+        return real_upsert(collection_name=collection_name, points=points, wait=wait)
+
+    chunks = [ProcessedChunk(parent_doc_id="doc1", content=f"chunk {i}", chunk_index=i) for i in range(10)]
+    embeddings = np.random.default_rng(0).random((10, 4), dtype=np.float32)
+    manager.client.upsert = flaky_upsert
+
+    with patch.object(QdrantStorageManager._upsert_with_retry.retry, "sleep", lambda _: None):
+        manager.bulk_upload(chunks, embeddings, batch_size=4, workers=2)
+
+    assert manager.client.count(settings.QDRANT_COLLECTION_NAME).count == 10
+    # Rows 4-7 were sent twice, the other batches once
+    assert sorted(attempts) == sorted([chunks[0].chunk_id, chunks[4].chunk_id, chunks[4].chunk_id, chunks[8].chunk_id])
+
+
+def test_writes_bump_the_collection_version():
+    import numpy as np
+    from unittest.mock import patch
+    from src.storage.manager import read_collection_version
+
+    manager = _qdrant_manager(4)
+    assert read_collection_version(manager.client) == 0
+
+    chunks = [ProcessedChunk(parent_doc_id="doc1", content=f"chunk {i}", chunk_index=i, metadata={"source": "a.pdf"}) for i in range(3)]
+    with patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 4):
+        manager.save_embeddings(chunks, np.random.default_rng(0).random((3, 4), dtype=np.float32))
+    after_save = read_collection_version(manager.client)
+    assert after_save > 0
+
+    manager.delete_sources(["a.pdf"])
+    assert read_collection_version(manager.client) > after_save
+
+
+def test_in_place_update_skips_only_a_deleted_point():
+    import numpy as np
+    from unittest.mock import patch
+    from qdrant_client.models import PointIdsList
+
+    manager = _qdrant_manager(4)
+    chunks = [ProcessedChunk(parent_doc_id="doc1", content=f"chunk {i}", chunk_index=i, metadata={"summary_pending": True}) for i in range(3)]
+    with patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 4):
+        manager.save_embeddings(chunks, np.zeros((3, 4), dtype=np.float32) + 0.5)
+        # Re-ingest race: one point disappears between the pending scan and the update
+        manager.client.delete(settings.QDRANT_COLLECTION_NAME, points_selector=PointIdsList(points=[chunks[1].chunk_id]))
+
+        for chunk in chunks:
+            chunk.summary = f"summary {chunk.chunk_index}"
+            chunk.metadata.update(summary_pending=False, has_summary=True)
+        new_vectors = np.eye(4, dtype=np.float32)[:3]
+        failed = manager.update_embeddings(chunks, new_vectors)
+
+    assert failed == [chunks[1]]
+    points = {p.id: p for p in manager.client.retrieve(settings.QDRANT_COLLECTION_NAME, ids=[c.chunk_id for c in chunks], with_payload=True, with_vectors=True)}
+    assert set(points) == {chunks[0].chunk_id, chunks[2].chunk_id}
+    for i in (0, 2):
+        point = points[chunks[i].chunk_id]
+        assert point.payload["has_summary"] is True and point.payload["summary"] == f"summary {i}"
+        np.testing.assert_allclose(point.vector, new_vectors[i])
@@ -0,0 +1,97 @@
+"""
+Tests for the incremental ingestion manifest.
+"""
+
+import os
+from src.ingestion.manifest import IngestionManifest
+from src.ingestion.multimodal_loader import MultimodalLoader
+
+FINGERPRINT = {"extractor": "a", "chunker": "b", "embedder": "c", "storage": "d"}
+
+
+def _write(path, data: bytes):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_recorded_file_is_skipped_until_modified(tmp_path):
+    pdf = _write(tmp_path / "a.pdf", b"v1")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+
+    assert manifest.filter_changed([pdf]) == [pdf]
+    manifest.record(pdf)
+    assert manifest.filter_changed([pdf]) == []
+
+    _write(tmp_path / "a.pdf", b"v2 with more bytes")
+    assert manifest.filter_changed([pdf]) == [pdf]
+
+
+def test_touched_file_with_same_content_is_unchanged(tmp_path):
+    pdf = _write(tmp_path / "a.pdf", b"same")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+    manifest.record(pdf)
+
+    stat = os.stat(pdf)
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    assert manifest.is_unchanged(pdf)
+
+
+def test_config_change_invalidates_entries(tmp_path):
+    pdf = _write(tmp_path / "a.pdf", b"v1")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+    manifest.record(pdf)
+    manifest.save()
+
+    reloaded = IngestionManifest(manifest.path, fingerprint={**FINGERPRINT, "chunker": "changed"})
+
+    assert reloaded.filter_changed([pdf]) == [pdf]
+
+
+def test_save_roundtrip_and_missing_files(tmp_path):
+    kept = _write(tmp_path / "kept.pdf", b"1")
+    gone = _write(tmp_path / "gone.pdf", b"2")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+    manifest.record(kept)
+    manifest.record(gone)
+    manifest.save()
+
+    reloaded = IngestionManifest(manifest.path, fingerprint=FINGERPRINT)
+
+    assert reloaded.is_unchanged(kept)
+    assert reloaded.missing([kept]) == [os.path.normpath(gone)]
+
+
+def test_loader_only_returns_pending_files(tmp_path):
+    old = _write(tmp_path / "old.pdf", b"1")
+    new = _write(tmp_path / "new.pdf", b"2")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+    manifest.record(old)
+
+    loader = MultimodalLoader(str(tmp_path), manifest=manifest)
+
+    assert loader.pending_files() == [new]
+
+
+def test_sources_and_manifest_keys_match_for_dot_prefixed_data_dir(tmp_path, monkeypatch):
+    from unittest.mock import MagicMock, patch
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "Data").mkdir()
+    _write(tmp_path / "Data" / "kept.pdf", b"1")
+    _write(tmp_path / "Data" / "gone.pdf", b"2")
+    loader = MultimodalLoader("./Data")
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), fingerprint=FINGERPRINT)
+
+    page = MagicMock()
+    page.extract_text.return_value = "a digital page with plenty of extractable text on it"
+    with patch("src.ingestion.multimodal_loader.PdfReader") as reader:
+        reader.return_value.pages = [page]
+        sources = [loader.load_single_document(path).metadata["source"] for path in loader.list_files()]
+    for path in loader.list_files():
+        manifest.record(path)
+
+    # Stored chunks carry the same spelling as the manifest keys used to delete them
+    assert sorted(sources) == sorted(manifest.entries) == ["Data/gone.pdf", "Data/kept.pdf"]
+    os.remove(tmp_path / "Data" / "gone.pdf")
+    assert manifest.missing(loader.list_files()) == ["Data/gone.pdf"]
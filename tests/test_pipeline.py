@@ -0,0 +1,145 @@
+"""
+Tests for the memory-bounded streaming pipeline and the staged executor.
+"""
+
+import pytest
+import numpy as np
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+from src.ingestion.models import IngestedDocument, ProcessedChunk
+from src.processing.strategies.fixed import FixedSizeStrategy
+from src.storage.manager import BaseStorageManager, ParquetStorageManager
+from src.pipeline.streaming import iter_chunk_batches, stream_to_storage
+from src.pipeline.staged import Stage, StagedExecutor, process_map
+
+
+def _doc(name: str, n_chars: int) -> IngestedDocument:
+    return IngestedDocument(filename=name, content="A" * n_chars, metadata={"source": f"Data/{name}"})
+
+
+class RecordingStorage(BaseStorageManager):
+    def __init__(self):
+        self.events: List[Any] = []
+
+    def save_embeddings(self, chunks: List[ProcessedChunk], embeddings: List[Any]):
+        self.events.append(("save", len(chunks)))
+
+    def open(self):
+        self.events.append("open")
+
+    def close(self):
+        self.events.append("close")
+
+
+def test_batches_are_fixed_size_and_report_completed_sources():
+    chunker = FixedSizeStrategy(chunk_size=10, overlap=0)
+    docs = [_doc("a.pdf", 30), _doc("b.pdf", 50), _doc("c.pdf", 10)]  # 3 + 5 + 1 chunks
+
+    batches = list(iter_chunk_batches(docs, chunker, batch_size=4))
+
+    assert [len(chunks) for chunks, _ in batches] == [4, 4, 1]
+    assert [done for _, done in batches] == [["Data/a.pdf"], ["Data/b.pdf"], ["Data/c.pdf"]]
+
+
+def test_documents_without_chunks_still_complete():
+    chunker = FixedSizeStrategy(chunk_size=10, overlap=0)
+
+    batches = list(iter_chunk_batches([_doc("empty.pdf", 0)], chunker, batch_size=4))
+
+    assert batches == [([], ["Data/empty.pdf"])]
+
+
+def test_stream_to_storage_appends_each_batch_in_one_session():
+    chunker = FixedSizeStrategy(chunk_size=10, overlap=0)
+    embedder = MagicMock()
+    embedder.embed_documents.side_effect = lambda texts: [[0.0]] * len(texts)
+    storage = RecordingStorage()
+    manifest = MagicMock()
+
+    total = stream_to_storage([_doc("a.pdf", 30), _doc("b.pdf", 50)], chunker, embedder, storage, manifest, batch_size=3)
+
+    assert total == 8
+    assert storage.events == ["open", ("save", 3), ("save", 3), ("save", 2), "close"]
+    assert [c.args[0] for c in manifest.record.call_args_list] == ["Data/a.pdf", "Data/b.pdf"]
+
+
+def _failing_embedder(fail_on_call: int):
+    calls = []
+
+    def embed(texts):
+        calls.append(texts)
+        if len(calls) == fail_on_call:
+            raise RuntimeError("embedding failed")
+        return np.ones((len(texts), 4), dtype=np.float32)
+    embedder = MagicMock()
+    embedder.embed_documents.side_effect = embed
+    return embedder
+
+
+def test_failed_parquet_session_records_no_sources(tmp_path):
+    chunker = FixedSizeStrategy(chunk_size=10, overlap=0)
+    manifest = MagicMock()
+    dataset = tmp_path / "dataset"
+
+    with (
+        patch("src.storage.manager.settings.OUTPUT_PATH", str(dataset)),
+        patch("src.storage.manager.settings.LOCAL_INDEX_PATH", str(tmp_path / "index")),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 4),
+    ):
+        storage = ParquetStorageManager()
+        # a.pdf is complete after batch 1, which is appended; batch 2 fails
+        with pytest.raises(RuntimeError):
+            stream_to_storage([_doc("a.pdf", 30), _doc("b.pdf", 50)], chunker, _failing_embedder(2), storage, manifest, batch_size=3)
+
+    # The aborted session published nothing, so nothing may be recorded as ingested
+    manifest.record.assert_not_called()
+    assert not list(dataset.rglob("*.parquet"))
+
+
+def test_failed_run_keeps_sources_already_durable():
+    chunker = FixedSizeStrategy(chunk_size=10, overlap=0)
+    manifest = MagicMock()
+
+    with pytest.raises(RuntimeError):
+        stream_to_storage([_doc("a.pdf", 30), _doc("b.pdf", 50)], chunker, _failing_embedder(2), RecordingStorage(), manifest, batch_size=3)
+
+    assert [c.args[0] for c in manifest.record.call_args_list] == ["Data/a.pdf"]
+
+
+# ---------------------------------------------------------------------------
+# Staged executor
+# ---------------------------------------------------------------------------
+def _double(item: int) -> int:
+    return item * 2
+
+
+def test_staged_executor_runs_all_stages_in_order():
+    collected: List[int] = []
+
+    def collect(items):
+        for item in items:
+            collected.append(item)
+            yield item
+
+    executor = StagedExecutor(
+        range(20),
+        [Stage("double", process_map(_double, workers=2)), Stage("sink", collect)],
+        queue_size=2,
+    )
+    stats = executor.run()
+
+    assert collected == [i * 2 for i in range(20)]
+    assert [(s.name, s.items_out) for s in stats] == [("ingest", 20), ("double", 20), ("sink", 20)]
+
+
+def test_staged_executor_propagates_stage_failures():
+    def explode(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("bad item")
+            yield item
+
+    executor = StagedExecutor(range(1000), [Stage("explode", explode)], queue_size=1)
+
+    with pytest.raises(RuntimeError, match="explode"):
+        executor.run()
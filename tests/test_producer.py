@@ -0,0 +1,131 @@
+"""
+Tests for the watchdog producer's debouncing and batched publishing.
+No live Kafka required: the producer is created lazily and patched here.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+
+def test_importing_producer_does_not_connect():
+    import src.streaming.producer as producer
+    assert producer._producer is None
+
+
+def test_tracker_waits_for_file_to_stop_changing(tmp_path):
+    from src.streaming.producer import StableFileTracker
+
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"partial")
+    tracker = StableFileTracker(stable_seconds=0)
+
+    tracker.touch(str(path))
+    assert tracker.ready() == []  # first observation only records size/mtime
+
+    path.write_bytes(b"partial + more data")
+    assert tracker.ready() == []  # still growing
+
+    assert tracker.ready() == [str(path)]
+    assert len(tracker) == 0
+
+
+def test_tracker_drops_duplicates_and_vanished_files(tmp_path):
+    from src.streaming.producer import StableFileTracker
+
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"done")
+    tracker = StableFileTracker(stable_seconds=0)
+
+    for _ in range(3):
+        tracker.touch(str(path))
+    tracker.ready()
+    assert tracker.ready() == [str(path)]
+    tracker.mark_published([str(path)])
+
+    # A modified event for the unchanged file is not published again
+    tracker.touch(str(path))
+    tracker.ready()
+    assert tracker.ready() == []
+
+    tracker.touch(str(tmp_path / "gone.pdf"))
+    assert tracker.ready() == [] and len(tracker) == 0
+
+
+def test_handler_follows_moves_into_pdf_names():
+    from src.streaming.producer import PDFHandler
+
+    tracker = MagicMock()
+    handler = PDFHandler(tracker)
+    handler.on_moved(SimpleNamespace(is_directory=False, src_path="/in/.a.pdf.part", dest_path="/in/sub/A.PDF"))
+
+    tracker.discard.assert_called_once_with("/in/.a.pdf.part")
+    tracker.touch.assert_called_once_with("/in/sub/A.PDF")
+
+
+def test_publish_batch_flushes_once():
+    import src.streaming.producer as producer
+
+    fake = MagicMock()
+    with patch.object(producer, "get_producer", return_value=fake):
+        assert producer.publish_batch(["/in/a.pdf", "/in/b.pdf", "/in/c.pdf"]) == 3
+
+    assert fake.send.call_count == 3
+    fake.flush.assert_called_once()
+
+
+def test_publish_batch_retries_files_whose_flush_failed(tmp_path):
+    import src.streaming.producer as producer
+
+    path = tmp_path / "a.pdf"
+    path.write_bytes(b"done")
+    tracker = producer.StableFileTracker(stable_seconds=0)
+    tracker.touch(str(path))
+    tracker.ready()
+
+    fake = MagicMock()
+    fake.flush.side_effect = RuntimeError("broker down")
+    with patch.object(producer, "get_producer", return_value=fake):
+        assert producer.publish_batch(tracker.ready(), tracker) == 0
+    assert len(tracker) == 1
+
+    # The unchanged file is published again once the broker is back, then deduplicated
+    fake.flush.side_effect = None
+    with patch.object(producer, "get_producer", return_value=fake):
+        tracker.ready()
+        assert producer.publish_batch(tracker.ready(), tracker) == 1
+    tracker.touch(str(path))
+    tracker.ready()
+    assert tracker.ready() == []
+
+
+def test_publish_batch_retries_files_whose_delivery_failed_after_flush(tmp_path):
+    import src.streaming.producer as producer
+
+    paths = [tmp_path / "a.pdf", tmp_path / "b.pdf"]
+    tracker = producer.StableFileTracker(stable_seconds=0)
+    for path in paths:
+        path.write_bytes(b"done")
+        tracker.touch(str(path))
+    tracker.ready()
+
+    rejected = MagicMock()
+    rejected.get.side_effect = RuntimeError("message too large")
+    fake = MagicMock()
+    fake.send.side_effect = lambda topic, value: rejected if value["filename"] == "b.pdf" else MagicMock()
+    with patch.object(producer, "get_producer", return_value=fake):
+        assert producer.publish_batch(sorted(tracker.ready()), tracker) == 1
+
+    # flush() returned normally, yet only a.pdf counts as published
+    tracker.ready()
+    assert tracker.ready() == [str(paths[1])]
+
+
+def test_tracker_stats_files_without_holding_the_lock(tmp_path):
+    from src.streaming.producer import StableFileTracker
+
+    tracker = StableFileTracker(stable_seconds=0)
+    tracker.touch(str(tmp_path / "a.pdf"))
+    held = []
+    with patch.object(StableFileTracker, "_stat", side_effect=lambda p: held.append(tracker._lock.locked())):
+        tracker.ready()
+    assert held == [False]
@@ -0,0 +1,129 @@
+"""
+Tests for the local SQLite queue transport: offsets, consumer groups, DLQ replay,
+and the consumer loop running end to end without a broker.
+"""
+
+from unittest.mock import MagicMock, patch
+from src.streaming.transport import SQLiteTransport, replay_dead_letters
+
+
+def _drain(consumer, timeout_ms=100):
+    values = []
+    while True:
+        records = consumer.poll(timeout_ms=timeout_ms)
+        if not records:
+            return values
+        values.extend(m.value for messages in records.values() for m in messages)
+
+
+def test_committed_offsets_are_per_group(tmp_path):
+    transport = SQLiteTransport(str(tmp_path / "queue.db"), partitions=2)
+    producer = transport.producer()
+    delivered = []
+    for i in range(6):
+        producer.send("events", value={"n": i}).add_callback(delivered.append)
+    assert delivered == []  # visible only after flush
+    producer.flush()
+    assert len(delivered) == 6
+
+    consumer = transport.consumer("group-a")
+    consumer.subscribe(["events"])
+    assert sorted(v["n"] for v in _drain(consumer)) == list(range(6))
+    consumer.commit()
+    consumer.close()
+
+    restarted = transport.consumer("group-a")
+    restarted.subscribe(["events"])
+    assert _drain(restarted) == []
+
+    # Another group starts from the beginning (replay)
+    other = transport.consumer("group-b")
+    other.subscribe(["events"])
+    assert len(_drain(other)) == 6
+
+
+def test_group_members_split_partitions(tmp_path):
+    transport = SQLiteTransport(str(tmp_path / "queue.db"), partitions=4)
+    listener = MagicMock()
+    first = transport.consumer("group")
+    first.subscribe(["events"], listener=listener)
+    first.poll()
+    assert len(first.assignment()) == 4
+
+    second = transport.consumer("group")
+    second.subscribe(["events"])
+    second.poll()
+    first.poll()
+
+    assert len(first.assignment()) == 2 and len(second.assignment()) == 2
+    assert not first.assignment() & second.assignment()
+    listener.on_partitions_revoked.assert_called_once()
+
+
+def test_busy_member_keeps_its_partitions_between_polls(tmp_path):
+    import time
+
+    transport = SQLiteTransport(str(tmp_path / "queue.db"), partitions=2)
+    busy = transport.consumer("group", session_timeout_ms=300, heartbeat_interval_ms=50)
+    busy.subscribe(["events"])
+    busy.poll()
+
+    # Processing one message takes longer than the session timeout
+    time.sleep(0.6)
+
+    peer = transport.consumer("group", session_timeout_ms=300, heartbeat_interval_ms=50)
+    peer.subscribe(["events"])
+    peer.poll()
+    busy.poll()
+    assert len(busy.assignment()) == 1 and len(peer.assignment()) == 1
+
+    # A closed member stops heartbeating and leaves at once
+    busy.close()
+    peer.poll()
+    assert len(peer.assignment()) == 2
+    peer.close()
+
+
+def test_replay_dead_letters_republishes_original_events_once(tmp_path):
+    transport = SQLiteTransport(str(tmp_path / "queue.db"), partitions=1)
+    producer = transport.producer()
+    producer.send("raw_dlq", value={"original_event": {"file_path": "/in/a.pdf"}, "error": "boom"})
+    producer.flush()
+
+    assert replay_dead_letters(transport, "raw_dlq", "raw", idle_timeout_ms=50) == 1
+    assert replay_dead_letters(transport, "raw_dlq", "raw", idle_timeout_ms=50) == 0
+
+    consumer = transport.consumer("check")
+    consumer.subscribe(["raw"])
+    assert _drain(consumer) == [{"file_path": "/in/a.pdf"}]
+
+
+def test_consume_events_runs_end_to_end_on_local_queue(tmp_path):
+    import src.streaming.consumer as consumer_module
+
+    transport = SQLiteTransport(str(tmp_path / "queue.db"), partitions=1)
+    producer = transport.producer()
+    for name in ("good", "bad", "stop", "after"):
+        producer.send(consumer_module.TOPIC_NAME, value={"event_type": "PDF_CREATED", "file_path": f"/in/{name}.pdf"})
+    producer.flush()
+
+    def process(file_path, ctx):
+        if "bad" in file_path:
+            raise ValueError("corrupt pdf")
+        if "stop" in file_path:
+            raise KeyboardInterrupt()
+
+    with (
+        patch.object(consumer_module, "ProcessContext"),
+        patch.object(consumer_module, "process_single_file", side_effect=process),
+    ):
+        consumer_module.consume_events(transport=transport)
+
+    dlq = transport.consumer("check")
+    dlq.subscribe([f"{consumer_module.TOPIC_NAME}_dlq"])
+    assert [m["original_event"]["file_path"] for m in _drain(dlq)] == ["/in/bad.pdf"]
+
+    # Interrupted at "stop": it and everything after it are redelivered
+    resumed = transport.consumer(consumer_module.GROUP_ID)
+    resumed.subscribe([consumer_module.TOPIC_NAME])
+    assert [m["file_path"] for m in _drain(resumed)] == ["/in/stop.pdf", "/in/after.pdf"]
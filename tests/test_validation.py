@@ -0,0 +1,61 @@
+"""
+Tests for the vectorized data-quality validator.
+"""
+
+import re
+import uuid
+import numpy as np
+import pytest
+from unittest.mock import patch
+from src.ingestion.models import ProcessedChunk
+from src.storage.manager import ParquetStorageManager
+from src.storage.validation import DataQualityError, UUID4_REGEX, invalid_uuid4_mask, validate_batch
+
+
+def test_uuid_mask_matches_regex_contract():
+    ids = [
+        str(uuid.uuid4()),
+        str(uuid.uuid4()).upper(),
+        str(uuid.uuid1()),
+        "not-a-uuid",
+        str(uuid.uuid4()) + "0",
+        str(uuid.uuid4()).replace("-", "_"),
+        "ü" * 36,
+        "",
+    ]
+    expected = [not re.match(UUID4_REGEX, i) for i in ids]
+
+    assert invalid_uuid4_mask(ids).tolist() == expected
+
+
+def test_valid_batch_has_no_failures():
+    ids = [str(uuid.uuid4()) for _ in range(5)]
+    vectors = np.zeros((5, 8), dtype=np.float32)
+
+    assert validate_batch(ids, ["text"] * 5, vectors, dimension=8) == []
+
+
+def test_each_contract_violation_is_reported():
+    first = str(uuid.uuid4())
+    ids = [first, first, "bad-id"]
+    vectors = np.zeros((3, 7), dtype=np.float32)
+
+    failures = validate_batch(ids, ["a", None, "c"], vectors, dimension=8)
+
+    assert len(failures) == 4
+    assert any("null text" in f for f in failures)
+    assert any("vector shape" in f for f in failures)
+    assert any("UUIDv4" in f for f in failures)
+    assert any("not unique" in f for f in failures)
+
+
+def test_manager_raises_data_quality_error_in_native_mode():
+    chunks = [ProcessedChunk(parent_doc_id="doc1", content=f"chunk {i}", chunk_index=i) for i in range(2)]
+    chunks[1].chunk_id = chunks[0].chunk_id
+
+    with (
+        patch("src.storage.manager.settings.DATA_QUALITY_MODE", "native"),
+        patch("src.storage.manager.settings.EMBEDDING_DIMENSION", 4),
+        pytest.raises(DataQualityError, match="not unique"),
+    ):
+        ParquetStorageManager().validate_data_quality(chunks, np.zeros((2, 4), dtype=np.float32))